@@ -0,0 +1,311 @@
+"""
+benchmark.py
+
+This script measures the hot paths of the robot delivery system on synthetic
+station maps and compares the results against a saved baseline.
+
+Features:
+- Seeded generators for open, maze-like and corridor-heavy maps of any size,
+  each with one cell per department.
+- Timings for `Environment.find_path`, `Environment.generate_map`, the
+  headless `Robot.deliver_batch` loop and `Fleet` dispatch.
+- Results written as JSON, one record per benchmark holding the best and
+  median time per call over several repeats.
+- Comparison against a baseline JSON file, flagging benchmarks that slowed
+  down by more than a tolerance and exiting with status 1 if any did.
+
+Usage:
+    python benchmark.py --sizes 50 200 --output results.json
+    python benchmark.py --baseline results.json
+
+Functions:
+    open_map: Generates an open map with scattered obstacles.
+    maze_map: Generates a maze-like map.
+    corridor_map: Generates a map of rooms joined by narrow doorways.
+    run_benchmarks: Times every benchmark on every map.
+    compare: Compares benchmark results against a baseline.
+    main: Parses the command line, runs the benchmarks and reports the results.
+"""
+
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from environment import Environment
+from fleet import Fleet
+from package import Package
+from robot import Robot
+
+
+DEPARTMENTS = ["Engineering", "Command", "Medical Bay", "Airlock", "Hydroponics", "Garage", "Docking"]
+
+
+def _place_departments(rows, rng):
+    """
+    Turn random open cells of a map into department cells, keeping the top-left cell open.
+
+    Args:
+        rows (list): Rows of the map as lists of characters, changed in place.
+        rng (random.Random): Random number generator.
+
+    Returns:
+        list: The rows joined into strings.
+    """
+    open_cells = [
+        (row, col) for row, line in enumerate(rows) for col, cell in enumerate(line)
+        if cell == '.' and (row, col) != (0, 0)
+    ]
+    for department, (row, col) in zip(DEPARTMENTS, rng.sample(open_cells, len(DEPARTMENTS))):
+        rows[row][col] = department[0]
+    return [''.join(line) for line in rows]
+
+
+def open_map(size, seed=0, density=0.2):
+    """
+    Generate an open map with scattered obstacles.
+
+    Args:
+        size (int): Number of rows and columns.
+        seed (int): Seed of the random number generator.
+        density (float): Share of cells that are obstacles.
+
+    Returns:
+        list: Rows of the map as strings.
+    """
+    rng = random.Random(seed)
+    rows = [['X' if rng.random() < density else '.' for _ in range(size)] for _ in range(size)]
+    rows[0][0] = '.'
+    return _place_departments(rows, rng)
+
+
+def maze_map(size, seed=0):
+    """
+    Generate a maze-like map, carved by a randomised depth-first search.
+
+    Every open cell of the maze is connected to every other by exactly one route.
+
+    Args:
+        size (int): Number of rows and columns.
+        seed (int): Seed of the random number generator.
+
+    Returns:
+        list: Rows of the map as strings.
+    """
+    rng = random.Random(seed)
+    rows = [['X'] * size for _ in range(size)]
+    rows[0][0] = '.'
+    stack = [(0, 0)]
+    while stack:
+        row, col = stack[-1]
+        neighbours = [
+            (row + d_row, col + d_col) for d_row, d_col in ((0, 2), (2, 0), (0, -2), (-2, 0))
+            if 0 <= row + d_row < size and 0 <= col + d_col < size and rows[row + d_row][col + d_col] == 'X'
+        ]
+        if not neighbours:
+            stack.pop()
+            continue
+        next_row, next_col = rng.choice(neighbours)
+        rows[(row + next_row) // 2][(col + next_col) // 2] = '.'
+        rows[next_row][next_col] = '.'
+        stack.append((next_row, next_col))
+    return _place_departments(rows, rng)
+
+
+def corridor_map(size, seed=0, room=8):
+    """
+    Generate a map of square rooms joined by one-cell doorways, with a
+    corridor along the top and left edges.
+
+    Args:
+        size (int): Number of rows and columns.
+        seed (int): Seed of the random number generator.
+        room (int): Width of a room, including one of its walls.
+
+    Returns:
+        list: Rows of the map as strings.
+    """
+    rng = random.Random(seed)
+    rows = [['.' if row % room and col % room else 'X' for col in range(size)] for row in range(size)]
+
+    # One doorway through every wall between two neighbouring rooms
+    for wall in range(room, size, room):
+        for span in range(1, size, room):
+            door = min(span + rng.randrange(room - 1), size - 1)
+            rows[wall][door] = '.'
+            rows[door][wall] = '.'
+
+    for index in range(size):
+        rows[0][index] = rows[index][0] = '.'
+    return _place_departments(rows, rng)
+
+
+MAP_GENERATORS = {
+    'open': open_map,
+    'maze': maze_map,
+    'corridor': corridor_map
+}
+
+
+def _time(function, repeat, min_seconds=0.02):
+    """
+    Time a function, calling it enough times per run for the run to be measurable.
+
+    Args:
+        function (callable): Function to call with no arguments.
+        repeat (int): Number of timing runs.
+        min_seconds (float): Shortest acceptable timing run; the calls per run
+            double until a run takes at least this long.
+
+    Returns:
+        dict: Best and median seconds per call, with the repeat and call counts.
+    """
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            function()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds:
+            break
+        number *= 2
+
+    timings = [elapsed / number]
+    for _ in range(repeat - 1):
+        started = time.perf_counter()
+        for _ in range(number):
+            function()
+        timings.append((time.perf_counter() - started) / number)
+    return {'best': min(timings), 'median': statistics.median(timings), 'repeat': repeat, 'number': number}
+
+
+def run_benchmarks(sizes, kinds=None, repeat=5, seed=0):
+    """
+    Time every benchmark on every generated map.
+
+    Args:
+        sizes (iterable): Map sizes, in rows and columns.
+        kinds (iterable, optional): Map kinds from MAP_GENERATORS. Defaults to all of them.
+        repeat (int): Number of timing runs per benchmark.
+        seed (int): Seed of the map generators and job streams.
+
+    Returns:
+        dict: Benchmark name, such as 'find_path/maze/200', mapped to its timings.
+    """
+    results = {}
+    for kind in kinds or MAP_GENERATORS:
+        for size in sizes:
+            layout = MAP_GENERATORS[kind](size, seed)
+            rng = random.Random(seed)
+            jobs = [(None, rng.choice(DEPARTMENTS)) for _ in range(200)]
+            environment = Environment(layout)
+            farthest = max(DEPARTMENTS, key=lambda department: environment.route_index.distance(
+                (0, 0), department) or 0)
+            target = environment.department_cells(farthest[0])[0]
+
+            def find_path():
+                # Coordinates are not covered by the route index, so this runs a full search
+                environment.find_path((0, 0), target)
+
+            def generate_map():
+                environment.generate_map((0, 0))
+
+            def deliver_batch(robot=Robot("Astrid", "RX-101", "SpaceCorp", environment)):
+                robot.position = (0, 0)
+                robot.deliver_batch(jobs)
+
+            def dispatch():
+                fleet = Fleet(environment, size=4, home=(0, 0))
+                for number, (_, department) in enumerate(jobs[:20]):
+                    fleet.submit(Package(number, department))
+                fleet.run(max_ticks=20 * size)
+
+            for name, function in (
+                ('find_path', find_path),
+                ('generate_map', generate_map),
+                ('deliver_batch', deliver_batch),
+                ('dispatch', dispatch)
+            ):
+                results[f'{name}/{kind}/{size}'] = _time(function, repeat)
+    return results
+
+
+def compare(results, baseline, tolerance=0.25):
+    """
+    Compare benchmark results against a baseline.
+
+    Best times are compared, since they are the least affected by other load
+    on the machine.
+
+    Args:
+        results (dict): Benchmark results, see `run_benchmarks`.
+        baseline (dict): Baseline results in the same format.
+        tolerance (float): Slowdown, as a fraction of the baseline time, still accepted.
+
+    Returns:
+        dict: Benchmark name mapped to its baseline and current best time, their
+            ratio and whether it regressed, for every benchmark in both.
+    """
+    comparison = {}
+    for name in sorted(results.keys() & baseline.keys()):
+        before = baseline[name]['best']
+        after = results[name]['best']
+        ratio = after / before if before else float('inf')
+        comparison[name] = {
+            'baseline': before,
+            'current': after,
+            'ratio': ratio,
+            'regressed': ratio > 1 + tolerance
+        }
+    return comparison
+
+
+def main(argv=None):
+    """
+    Parse the command line, run the benchmarks and report the results.
+
+    Args:
+        argv (list, optional): Command-line arguments. Defaults to sys.argv.
+
+    Returns:
+        int: Exit status, 1 if any benchmark regressed against the baseline and 0 otherwise.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark pathfinding, rendering and dispatch.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[50, 200], help="map sizes to benchmark")
+    parser.add_argument('--kinds', nargs='+', choices=sorted(MAP_GENERATORS), help="map kinds to benchmark")
+    parser.add_argument('--repeat', type=int, default=5, help="timing runs per benchmark")
+    parser.add_argument('--seed', type=int, default=0, help="seed of the generated maps and jobs")
+    parser.add_argument('--output', help="file to write the results to, as JSON")
+    parser.add_argument('--baseline', help="JSON results to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="slowdown accepted before a benchmark counts as regressed")
+    args = parser.parse_args(argv)
+
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': run_benchmarks(args.sizes, args.kinds, args.repeat, args.seed)
+    }
+
+    regressed = False
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        report['comparison'] = compare(report['results'], baseline['results'], args.tolerance)
+        regressed = any(entry['regressed'] for entry in report['comparison'].values())
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            output_file.write(text + '\n')
+    else:
+        print(text)
+
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
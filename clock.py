@@ -0,0 +1,249 @@
+"""
+clock.py
+
+This module defines the clocks that robots and simulators consult instead of
+calling `time.sleep` directly, so that the same delivery code can run in
+real time, faster than real time, or with no waiting at all.
+
+Features:
+- A real-time clock that sleeps for the full requested time.
+- An accelerated clock that sleeps for the requested time divided by a speed
+  multiplier, while reporting simulated time at the normal rate.
+- A discrete-event clock that advances instantly, with events scheduled at
+  simulated times and fired in order as the clock passes them.
+- Every clock reports the simulated seconds elapsed since it was created.
+- Every clock can also be awaited from asyncio code, so that robots driven
+  by one event loop wait without blocking each other.
+
+Classes:
+    Clock: Base class describing the clock interface.
+    RealTimeClock: Sleeps in real time.
+    AcceleratedClock: Sleeps in real time scaled down by a speed multiplier.
+    SimulatedClock: Discrete-event clock that advances instantly.
+"""
+
+
+import asyncio
+import heapq
+import itertools
+import time
+
+
+class Clock:
+    """
+    Base class describing the clock interface.
+    """
+
+    def now(self):
+        """
+        Get the simulated time.
+
+        Returns:
+            float: Simulated seconds elapsed since the clock was created.
+        """
+        raise NotImplementedError
+
+    def sleep(self, seconds):
+        """
+        Let a number of simulated seconds pass.
+
+        Args:
+            seconds (float): Simulated seconds to wait.
+        """
+        raise NotImplementedError
+
+    async def sleep_async(self, seconds):
+        """
+        Let a number of simulated seconds pass without blocking the event loop.
+
+        Args:
+            seconds (float): Simulated seconds to wait.
+        """
+        raise NotImplementedError
+
+
+class RealTimeClock(Clock):
+    """
+    Clock that sleeps in real time, one simulated second per wall-clock second.
+    """
+
+    def __init__(self):
+        """
+        Initialise the clock at simulated time zero.
+        """
+        self._started = time.monotonic()
+
+    def now(self):
+        """
+        Get the simulated time.
+
+        Returns:
+            float: Wall-clock seconds elapsed since the clock was created.
+        """
+        return time.monotonic() - self._started
+
+    def sleep(self, seconds):
+        """
+        Sleep for a number of seconds.
+
+        Args:
+            seconds (float): Seconds to wait.
+        """
+        time.sleep(seconds)
+
+    async def sleep_async(self, seconds):
+        """
+        Wait for a number of seconds while other tasks run.
+
+        Args:
+            seconds (float): Seconds to wait.
+        """
+        await asyncio.sleep(seconds)
+
+
+class AcceleratedClock(Clock):
+    """
+    Clock that runs a fixed number of times faster than real time.
+
+    Attributes:
+        speed (float): Simulated seconds that pass per wall-clock second.
+    """
+
+    def __init__(self, speed):
+        """
+        Initialise the clock at simulated time zero.
+
+        Args:
+            speed (float): Simulated seconds that pass per wall-clock second.
+
+        Raises:
+            ValueError: If the speed is not positive.
+        """
+        if speed <= 0:
+            raise ValueError("Clock speed must be positive")
+        self.speed = speed
+        self._started = time.monotonic()
+
+    def now(self):
+        """
+        Get the simulated time.
+
+        Returns:
+            float: Wall-clock seconds elapsed since the clock was created,
+                multiplied by the speed.
+        """
+        return (time.monotonic() - self._started) * self.speed
+
+    def sleep(self, seconds):
+        """
+        Sleep for a number of simulated seconds, scaled down by the speed.
+
+        Args:
+            seconds (float): Simulated seconds to wait.
+        """
+        time.sleep(seconds / self.speed)
+
+    async def sleep_async(self, seconds):
+        """
+        Wait for a number of simulated seconds, scaled down by the speed, while other tasks run.
+
+        Args:
+            seconds (float): Simulated seconds to wait.
+        """
+        await asyncio.sleep(seconds / self.speed)
+
+
+class SimulatedClock(Clock):
+    """
+    Discrete-event clock that advances instantly.
+
+    Sleeping moves the clock forward without waiting. Events scheduled at a
+    simulated time are fired, in time order, as the clock passes that time;
+    events scheduled for the same time fire in the order they were scheduled.
+    """
+
+    def __init__(self):
+        """
+        Initialise the clock at simulated time zero with no events.
+        """
+        self._now = 0.0
+        self._events = []
+        self._order = itertools.count()
+
+    def now(self):
+        """
+        Get the simulated time.
+
+        Returns:
+            float: Simulated seconds elapsed since the clock was created.
+        """
+        return self._now
+
+    @property
+    def pending(self):
+        """
+        Get the number of events that have not fired yet.
+
+        Returns:
+            int: Number of pending events.
+        """
+        return len(self._events)
+
+    def schedule(self, delay, callback, *args):
+        """
+        Schedule a callback to fire once a number of simulated seconds have passed.
+
+        Args:
+            delay (float): Simulated seconds from now until the event fires.
+            callback (callable): Function to call when the event fires.
+            *args: Arguments passed to the callback.
+
+        Raises:
+            ValueError: If the delay is negative.
+        """
+        if delay < 0:
+            raise ValueError("Events cannot be scheduled in the past")
+        heapq.heappush(self._events, (self._now + delay, next(self._order), callback, args))
+
+    def sleep(self, seconds):
+        """
+        Advance the clock instantly, firing every event that falls due.
+
+        Args:
+            seconds (float): Simulated seconds to advance.
+        """
+        self.advance_to(self._now + seconds)
+
+    async def sleep_async(self, seconds):
+        """
+        Advance the clock instantly, then let other tasks run before returning.
+
+        Args:
+            seconds (float): Simulated seconds to advance.
+        """
+        self.sleep(seconds)
+        await asyncio.sleep(0)
+
+    def advance_to(self, when):
+        """
+        Advance the clock instantly to a simulated time, firing every event due by then.
+
+        Each event fires with the clock set to its own time, so callbacks may
+        read `now` and schedule further events.
+
+        Args:
+            when (float): Simulated time to advance to.
+        """
+        events = self._events
+        while events and events[0][0] <= when:
+            due, _, callback, args = heapq.heappop(events)
+            self._now = max(self._now, due)
+            callback(*args)
+        self._now = max(self._now, when)
+
+    def run(self):
+        """
+        Fire every pending event in time order, including events scheduled while running.
+        """
+        while self._events:
+            self.advance_to(self._events[0][0])
@@ -0,0 +1,378 @@
+"""
+control.py
+
+This module lets one asyncio event loop supervise many robots at once, and
+lets local programs drive them through a socket.
+
+Features:
+- A supervisor that runs any number of headless robots as tasks on one event
+  loop, each working through its own queue of delivery commands, with no
+  thread per robot.
+- Commands queued while a robot is out are delivered together on its next
+  tour, Perishable packages first.
+- A control endpoint on a local TCP port or Unix socket that accepts one JSON
+  command per line and answers each with one JSON line.
+- A matching client, for scripts and tests that drive the endpoint.
+- An optional package registry that issues unique package IDs and keeps the
+  history of every package delivered.
+
+Protocol:
+    {"command": "robots"}
+    {"command": "deliver", "robot": "Astrid", "department": "Airlock", "package_type": "Fragile"}
+    {"command": "status"}
+    {"command": "wait"}
+
+Every answer holds "ok", true or false; failed commands also hold an "error".
+
+Classes:
+    Supervisor: Runs headless robots concurrently on one event loop.
+    ControlServer: Local socket endpoint that drives a supervisor.
+    ControlClient: Client of a control endpoint.
+"""
+
+
+import asyncio
+import json
+from clock import RealTimeClock
+from package import Package
+from robot import Robot
+
+
+class Supervisor:
+    """
+    Runs headless robots concurrently on one event loop.
+
+    Attributes:
+        environment (Environment): The environment shared by every robot.
+        clock (Clock): Clock that paces every robot.
+        robots (dict): Robot name mapped to the robot.
+        delivered (dict): Robot name mapped to the number of packages it delivered.
+        failed (dict): Robot name mapped to the number of packages it could not deliver.
+        errors (dict): Robot name mapped to the error that cut its last tour
+            short, or None.
+        registry (PackageRegistry): Registry that issues package IDs and records
+            deliveries, or None for random IDs.
+    """
+
+    def __init__(self, environment, clock=None, registry=None):
+        """
+        Initialise a supervisor with no robots.
+
+        Args:
+            environment (Environment): The environment shared by every robot.
+            clock (Clock, optional): Clock that paces every robot. Defaults to a real-time clock.
+            registry (PackageRegistry, optional): Registry that issues package IDs
+                and records deliveries.
+        """
+        self.environment = environment
+        self.clock = clock or RealTimeClock()
+        self.registry = registry
+        self.robots = {}
+        self.delivered = {}
+        self.failed = {}
+        self.errors = {}
+        self._queues = {}
+        self._tasks = {}
+        self._busy = set()
+
+    def add_robot(self, name, position=(6, 0), model="RX-101", manufacturer="SpaceCorp"):
+        """
+        Add a robot and start its task. Must be called while the event loop is running.
+
+        Args:
+            name (str): Name of the robot, unique within the supervisor.
+            position (tuple): Starting coordinates (row, col).
+            model (str): The model identifier of the robot.
+            manufacturer (str): The manufacturer of the robot.
+
+        Returns:
+            Robot: The new robot.
+
+        Raises:
+            ValueError: If a robot of that name already exists.
+        """
+        if name in self.robots:
+            raise ValueError(f"A robot named {name} already exists")
+        robot = Robot(name, model, manufacturer, self.environment, self.clock, headless=True)
+        robot.position = tuple(position)
+        self.robots[name] = robot
+        self.delivered[name] = 0
+        self.failed[name] = 0
+        self.errors[name] = None
+        self._queues[name] = asyncio.Queue()
+        self._tasks[name] = asyncio.create_task(self._serve(robot, self._queues[name]))
+        return robot
+
+    def submit(self, name, department, package_type=None):
+        """
+        Queue a delivery command for a robot.
+
+        Args:
+            name (str): Name of the robot.
+            department (str): Destination department.
+            package_type (type or str, optional): Package class or its name, see
+                `Robot.deliver_batch`.
+
+        Returns:
+            Package: The package queued.
+
+        Raises:
+            KeyError: If there is no robot of that name.
+            TypeError: If the department is not a string, or the package type is
+                not a string or a Package class.
+            ValueError: If the package type is not known.
+        """
+        queue = self._queues[name]
+        if not isinstance(department, str):
+            raise TypeError(f"Department must be a string, not {type(department).__name__}")
+        if not (package_type is None or isinstance(package_type, str)
+                or isinstance(package_type, type) and issubclass(package_type, Package)):
+            raise TypeError(f"Unknown package type: {package_type!r}")
+        package = Robot._create_package(department, package_type, self.registry)
+        queue.put_nowait(package)
+        return package
+
+    async def _serve(self, robot, queue):
+        """
+        Deliver the packages queued for a robot until it is stopped.
+
+        Args:
+            robot (Robot): The robot.
+            queue (asyncio.Queue): Packages for the robot, None to stop it.
+        """
+        while True:
+            batch = [await queue.get()]
+            while batch[-1] is not None and not queue.empty():
+                batch.append(queue.get_nowait())
+            packages = [package for package in batch if package is not None]
+
+            if packages:
+                self._busy.add(robot.name)
+                robot.inventory.extend(packages)
+                try:
+                    delivered = await robot.deliver_inventory_async()
+                    self.errors[robot.name] = None
+                except (ValueError, RuntimeError) as error:
+                    # The tour stopped part way: whatever left the inventory was delivered
+                    self.errors[robot.name] = f"{type(error).__name__}: {error}"
+                    remaining = set(map(id, robot.inventory))
+                    delivered = [package for package in packages if id(package) not in remaining]
+                self.delivered[robot.name] += len(delivered)
+                self.failed[robot.name] += len(robot.inventory)
+                if self.registry is not None:
+                    for package in delivered:
+                        self.registry.complete(package, self.clock.now())
+                    for package in robot.inventory:
+                        self.registry.discard(package)
+                robot.inventory.clear()
+                self._busy.discard(robot.name)
+
+            for _ in batch:
+                queue.task_done()
+            if batch[-1] is None:
+                return
+
+    def status(self):
+        """
+        Summarise the state of every robot.
+
+        Returns:
+            dict: Robot name mapped to its position, whether it is out on a
+                delivery, the number of packages queued for it, its delivered
+                and failed counts and the error that cut its last tour short,
+                if any.
+        """
+        return {
+            name: {
+                'position': list(robot.position),
+                'busy': name in self._busy,
+                'queued': self._queues[name].qsize(),
+                'delivered': self.delivered[name],
+                'failed': self.failed[name],
+                'error': self.errors[name]
+            }
+            for name, robot in self.robots.items()
+        }
+
+    async def join(self):
+        """
+        Wait until every robot has worked through every command queued so far.
+        """
+        await asyncio.gather(*(queue.join() for queue in self._queues.values()))
+
+    async def stop(self):
+        """
+        Stop every robot once it has worked through its queue.
+        """
+        for queue in self._queues.values():
+            queue.put_nowait(None)
+        await asyncio.gather(*self._tasks.values())
+
+
+class ControlServer:
+    """
+    Local socket endpoint that drives a supervisor.
+
+    Attributes:
+        supervisor (Supervisor): The supervisor the commands are sent to.
+    """
+
+    def __init__(self, supervisor):
+        """
+        Initialise the endpoint without opening it.
+
+        Args:
+            supervisor (Supervisor): The supervisor the commands are sent to.
+        """
+        self.supervisor = supervisor
+        self._server = None
+
+    async def start(self, host='127.0.0.1', port=0, path=None):
+        """
+        Start accepting connections.
+
+        Args:
+            host (str): Address of the TCP endpoint. Defaults to the loopback address.
+            port (int): Port of the TCP endpoint, 0 to pick a free one.
+            path (str, optional): Path of a Unix socket to listen on instead of TCP.
+
+        Returns:
+            tuple or str: Host and port of the TCP endpoint, or the socket path.
+        """
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self._handle, path)
+        else:
+            self._server = await asyncio.start_server(self._handle, host, port)
+        return self.address
+
+    @property
+    def address(self):
+        """
+        Get the address the endpoint listens on.
+
+        Returns:
+            tuple or str: Host and port of the TCP endpoint, the socket path, or
+                None if the endpoint is not started.
+        """
+        if self._server is None or not self._server.sockets:
+            return None
+        address = self._server.sockets[0].getsockname()
+        return address[:2] if isinstance(address, tuple) else address
+
+    async def close(self):
+        """
+        Stop accepting connections and wait for the endpoint to close.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader, writer):
+        """
+        Answer the commands of one connection until it closes.
+
+        Args:
+            reader (asyncio.StreamReader): Incoming side of the connection.
+            writer (asyncio.StreamWriter): Outgoing side of the connection.
+        """
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                answer = await self.execute(line)
+                writer.write(json.dumps(answer).encode() + b'\n')
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def execute(self, line):
+        """
+        Run one command.
+
+        Args:
+            line (bytes or str): The command as a JSON object.
+
+        Returns:
+            dict: The answer, holding "ok" and either the result or an "error".
+        """
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                return {'ok': False, 'error': "A command must be a JSON object"}
+            command = request.get('command')
+            supervisor = self.supervisor
+            if command == 'robots':
+                return {'ok': True, 'robots': sorted(supervisor.robots)}
+            if command == 'status':
+                return {'ok': True, 'robots': supervisor.status()}
+            if command == 'deliver':
+                package = supervisor.submit(request['robot'], request['department'], request.get('package_type'))
+                return {'ok': True, 'package': package.package_id, 'type': type(package).__name__}
+            if command == 'wait':
+                await supervisor.join()
+                return {'ok': True}
+            return {'ok': False, 'error': f"Unknown command: {command}"}
+        except KeyError as error:
+            return {'ok': False, 'error': f"Missing or unknown {error}"}
+        except (ValueError, TypeError, AttributeError) as error:
+            return {'ok': False, 'error': str(error)}
+
+
+class ControlClient:
+    """
+    Client of a control endpoint.
+    """
+
+    def __init__(self, reader, writer):
+        """
+        Wrap an open connection. Use `connect` to open one.
+
+        Args:
+            reader (asyncio.StreamReader): Incoming side of the connection.
+            writer (asyncio.StreamWriter): Outgoing side of the connection.
+        """
+        self._reader = reader
+        self._writer = writer
+
+    @classmethod
+    async def connect(cls, host='127.0.0.1', port=None, path=None):
+        """
+        Connect to a control endpoint.
+
+        Args:
+            host (str): Address of the TCP endpoint.
+            port (int, optional): Port of the TCP endpoint.
+            path (str, optional): Path of the Unix socket, used instead of TCP.
+
+        Returns:
+            ControlClient: The connected client.
+        """
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def request(self, command, **fields):
+        """
+        Send a command and wait for its answer.
+
+        Args:
+            command (str): Name of the command.
+            **fields: Other fields of the command.
+
+        Returns:
+            dict: The answer.
+        """
+        self._writer.write(json.dumps(dict(fields, command=command)).encode() + b'\n')
+        await self._writer.drain()
+        return json.loads(await self._reader.readline())
+
+    async def close(self):
+        """
+        Close the connection.
+        """
+        self._writer.close()
+        await self._writer.wait_closed()
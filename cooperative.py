@@ -0,0 +1,293 @@
+"""
+cooperative.py
+
+This module plans collision-free routes for many robots sharing a map, with
+Windowed Hierarchical Cooperative A* (WHCA*, Silver, 2005).
+
+Features:
+- A reservation table of the cells robots will hold at each tick, and of the
+  moves they will make, so that no two robots plan to hold the same corridor
+  cell at the same tick or to swap cells head-on.
+- A space-time A* search in which a robot may wait in place as well as move,
+  and takes as many ticks per move as the package it carries demands.
+- The exact distances of the route index as the heuristic, so the search
+  goes straight for the destination whenever the way is clear.
+- Windowed planning: reservations are only honoured for a fixed number of
+  ticks ahead, and the rest of the route follows the route index. Robots
+  replan before their window runs out, so searches stay small however long
+  the route.
+- Shared cells, such as departments, that any number of robots may hold at
+  once and that are never reserved.
+- The states expanded by each plan are recorded to the environment's
+  telemetry when it is enabled.
+
+Classes:
+    ReservationTable: Cells and moves reserved by robots, by tick.
+    CooperativePlanner: Space-time planner that respects other robots' reservations.
+"""
+
+
+import heapq
+
+
+DEFAULT_WINDOW = 32
+
+
+class ReservationTable:
+    """
+    Cells and moves reserved by robots, by tick.
+
+    Attributes:
+        shared (set): Cells that are never reserved, as any number of robots may hold them.
+    """
+
+    def __init__(self, shared=()):
+        """
+        Initialise an empty table.
+
+        Args:
+            shared (iterable): Coordinates (row, col) of the cells that are never reserved.
+        """
+        self.shared = set(shared)
+        self._cells = {}
+        self._moves = {}
+        self._owned = {}
+
+    def __len__(self):
+        """
+        Get the number of reserved cell ticks.
+
+        Returns:
+            int: Number of (cell, tick) reservations.
+        """
+        return len(self._cells)
+
+    def is_free(self, cell, tick, owner):
+        """
+        Check whether a robot may hold a cell at a tick.
+
+        Args:
+            cell (tuple): Coordinates (row, col) of the cell.
+            tick (int): The tick.
+            owner (hashable): Identifier of the robot asking.
+
+        Returns:
+            bool: True if the cell is shared, unreserved or reserved by the robot itself.
+        """
+        return cell in self.shared or self._cells.get((cell, tick), owner) == owner
+
+    def can_move(self, source, target, tick, owner):
+        """
+        Check whether a robot may move from one cell to another, arriving at a tick.
+
+        Args:
+            source (tuple): Coordinates (row, col) of the cell left.
+            target (tuple): Coordinates (row, col) of the cell entered.
+            tick (int): Tick at which the robot arrives in the target cell.
+            owner (hashable): Identifier of the robot asking.
+
+        Returns:
+            bool: True if the target is free at that tick and no other robot
+                moves the other way between the same corridor cells at the same time.
+        """
+        if not self.is_free(target, tick, owner):
+            return False
+        # Robots pass each other freely inside a shared cell
+        return (source in self.shared or target in self.shared
+                or self._moves.get((target, source, tick), owner) == owner)
+
+    def reserve(self, owner, timeline, start):
+        """
+        Reserve the cells and moves of a timeline.
+
+        Cells and moves already reserved by other robots keep their owners.
+
+        Args:
+            owner (hashable): Identifier of the robot.
+            timeline (list): Cell held at each tick, the first at the start tick.
+            start (int): Tick of the first cell.
+        """
+        owned = self._owned.setdefault(owner, [])
+        previous = None
+        for tick, cell in enumerate(timeline, start):
+            if cell not in self.shared and self._cells.setdefault((cell, tick), owner) == owner:
+                owned.append((self._cells, (cell, tick)))
+            if (previous is not None and previous != cell
+                    and self._moves.setdefault((previous, cell, tick), owner) == owner):
+                owned.append((self._moves, (previous, cell, tick)))
+            previous = cell
+
+    def release(self, owner):
+        """
+        Drop every reservation of a robot.
+
+        Args:
+            owner (hashable): Identifier of the robot.
+        """
+        for table, key in self._owned.pop(owner, ()):
+            if table.get(key) == owner:
+                del table[key]
+
+
+class CooperativePlanner:
+    """
+    Space-time planner that respects other robots' reservations.
+
+    Robots plan one at a time. Each plan reserves the cells the robot will
+    hold within the window, and later plans route around them, waiting in
+    place where that is quicker than a detour.
+
+    Attributes:
+        environment (Environment): The environment the robots share.
+        window (int): Ticks ahead within which reservations are honoured and made.
+        reservations (ReservationTable): Reservations of every robot.
+        expanded (int): Number of states expanded by the most recent plan.
+        stuck (bool): Whether the most recent plan found no way forward within the window.
+    """
+
+    def __init__(self, environment, shared=(), window=DEFAULT_WINDOW):
+        """
+        Initialise the planner with no reservations.
+
+        Args:
+            environment (Environment): The environment the robots share.
+            shared (iterable): Coordinates (row, col) of the cells any number of robots may hold.
+            window (int): Ticks ahead within which reservations are honoured and made.
+
+        Raises:
+            ValueError: If the window is shorter than one tick.
+        """
+        if window < 1:
+            raise ValueError("The planning window must be at least one tick")
+        self.environment = environment
+        self.window = window
+        self.reservations = ReservationTable(shared)
+        self.expanded = 0
+        self.stuck = False
+
+    def plan(self, owner, start, destination, tick, dwell=1, waited=0):
+        """
+        Plan a robot's route and reserve it for the window ahead.
+
+        The robot's previous reservations are dropped first.
+
+        Args:
+            owner (hashable): Identifier of the robot.
+            start (tuple): The robot's coordinates (row, col) at the tick.
+            destination (str): Destination department.
+            tick (int): Current tick.
+            dwell (int): Ticks the robot takes per move.
+            waited (int): Ticks the robot has already spent in its cell towards its next move.
+
+        Returns:
+            list: Cell the robot holds at each tick from the current one until
+                it reaches the destination, or None if the destination cannot
+                be reached. If the way is blocked within the window, the robot
+                holds its cell for the window and the plan only covers one tick.
+        """
+        reservations = self.reservations
+        reservations.release(owner)
+        index = self.environment.route_index
+        if index.distance(start, destination) is None:
+            return None
+
+        timeline = self._search(owner, start, destination, tick, dwell, waited)
+        self.stuck = timeline is None
+        telemetry = self.environment.telemetry
+        if telemetry is not None:
+            telemetry.observe('plan.expanded', self.expanded)
+        if timeline is None:
+            reservations.reserve(owner, [start] * (self.window + 1), tick)
+            return [start, start]
+        reservations.reserve(owner, timeline[:self.window + 1], tick)
+        return timeline
+
+    def _search(self, owner, start, destination, tick, dwell, waited):
+        """
+        Search space and time for the quickest route that respects the reservations.
+
+        Args:
+            owner (hashable): Identifier of the robot.
+            start (tuple): The robot's coordinates (row, col) at the tick.
+            destination (str): Destination department.
+            tick (int): Current tick.
+            dwell (int): Ticks the robot takes per move.
+            waited (int): Ticks the robot has already spent in its cell towards its next move.
+
+        Returns:
+            list: Cell held at each tick until the destination, or None if every
+                way is blocked within the window.
+        """
+        index = self.environment.route_index
+        is_valid = self.environment.is_valid_position
+        reservations = self.reservations
+        horizon = tick + self.window
+        steps_left = {}
+
+        def remaining(cell):
+            if cell not in steps_left:
+                steps_left[cell] = index.distance(cell, destination)
+            return steps_left[cell]
+
+        self.expanded = 0
+        parent = {(start, tick): None}
+        heap = [(remaining(start) * dwell, remaining(start), tick, start)]
+        while heap:
+            _, left, time, cell = heapq.heappop(heap)
+            if left == 0 or time >= horizon:
+                return self._timeline((cell, time), parent, destination, dwell)
+            self.expanded += 1
+
+            # Waiting holds the cell for one more tick; moving holds it until the robot arrives next door
+            successors = []
+            if reservations.is_free(cell, time + 1, owner):
+                successors.append((cell, time + 1))
+            arrival = time + dwell
+            if cell == start:
+                arrival = max(time + 1, arrival - waited - (time - tick))
+            if all(reservations.is_free(cell, later, owner) for later in range(time + 1, arrival)):
+                row, col = cell
+                for neighbour in ((row, col + 1), (row + 1, col), (row, col - 1), (row - 1, col)):
+                    if (is_valid(*neighbour) and remaining(neighbour) is not None
+                            and reservations.can_move(cell, neighbour, arrival, owner)):
+                        successors.append((neighbour, arrival))
+
+            for state in successors:
+                if state not in parent:
+                    parent[state] = (cell, time)
+                    steps = remaining(state[0])
+                    heapq.heappush(heap, (state[1] - tick + steps * dwell, steps, state[1], state[0]))
+        return None
+
+    def _timeline(self, state, parent, destination, dwell):
+        """
+        Turn the states of a search into the cell held at each tick.
+
+        Beyond the last state, the route follows the route index to the destination.
+
+        Args:
+            state (tuple): Last (cell, tick) state reached by the search.
+            parent (dict): Each state mapped to the state it was reached from.
+            destination (str): Destination department.
+            dwell (int): Ticks the robot takes per move.
+
+        Returns:
+            list: Cell held at each tick until the destination.
+        """
+        states = []
+        while state is not None:
+            states.append(state)
+            state = parent[state]
+        states.reverse()
+
+        # A move of several ticks holds the cell it leaves until the robot arrives
+        timeline = [states[0][0]]
+        for previous, current in zip(states, states[1:]):
+            timeline.extend([previous[0]] * (current[1] - previous[1] - 1))
+            timeline.append(current[0])
+
+        rest = self.environment.route_index.path(states[-1][0], destination)
+        for cell in rest[1:]:
+            timeline.extend([timeline[-1]] * (dwell - 1))
+            timeline.append(cell)
+        return timeline
@@ -7,52 +7,593 @@ represent the map, validate positions, find paths and generate a visual
 representation of the environment.
 
 Features:
-- A predefined map layout with various departments and obstacles.
+- A predefined map layout with various departments and obstacles, stored
+  as one compact byte per cell.
+- Loading of station maps from plain-text or binary files, with large
+  binary maps memory-mapped rather than parsed.
 - Methods to check the validity of positions on the map.
-- Pathfinding using Breadth-First Search (BFS) for navigating the map.
+- Pathfinding using Breadth-First Search (BFS) for navigating the map, run
+  by a search engine over flat cell indices with optional search budgets.
+- Selectable search strategies (BFS, A*, bidirectional BFS and Jump Point
+  Search) and routing to explicit coordinates.
+- Hierarchical routing (HPA*) over clusters of the map for very large
+  stations, updated per cluster when the map changes.
+- A precomputed route index that answers department queries by lookup and
+  is rebuilt only when the map changes.
+- Heatmaps of the distance from every cell to every department, computed
+  by a vectorised NumPy wavefront when NumPy is installed.
+- A bounded LRU cache of planned routes, emptied whenever the map changes.
+- Bulk route planning that spreads large batches of queries across worker
+  processes sharing one copy of the grid.
+- Optional per-cell terrain costs and routing that minimises delivery time
+  for the package carried, using a cost model of terrain and package type.
+- Cells that can be blocked and unblocked at runtime, with a log of changed
+  cells and incremental replanners that repair routes after a change.
 - A method to generate a coloured, string-based representation of the map, 
   including the robot's position.
+- Optional telemetry of route queries and map rendering: query sources,
+  cells expanded, path lengths and timings.
 
 Classes:
     Environment: Encapsulates the map and provides utilities for robot navigation.
 """
 
 
+import os
+import time
+import map_io
+import parallel
+from heatmap import Heatmap, wavefront
+from hierarchy import ClusterGraph, DEFAULT_CLUSTER_SIZE
+from pathfinding import GridSearch, STRATEGIES
+from replanner import Replanner
+from route_cache import RouteCache
+from route_index import RouteIndex
+from terrain import CostModel, PLAIN, decode_cost, encode_cost
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+HIERARCHICAL = 'hpa'
+ROUTING_STRATEGIES = STRATEGIES + (HIERARCHICAL,)
+
+
+# Obstacles are stored as zero bytes, so the cell buffer doubles as the
+# walkable mask: a cell is walkable exactly when its byte is non-zero.
+OBSTACLE = 0
+ENCODE_CELLS = bytes.maketrans(b'X', bytes([OBSTACLE]))
+FLOOR_CODES = bytes([OBSTACLE, ord('.')])
+
+LUNA_9 = [
+    'XXXXXEX',
+    'XX....X',
+    'XX.XX.X',
+    'X..CX.X',
+    'XM....A',
+    'X...X.X',
+    '..XHXDX',
+    'GXXXXXX'
+]
+
+DEPARTMENT_COLOURS = {
+    'E': '\033[1;37;44m',    # Engineering
+    'C': '\033[1;37;46m',    # Command
+    'M': '\033[1;37;42m',    # Medical Bay
+    'A': '\033[1;37;41m',    # Airlock
+    'H': '\033[1;37;43m',    # Hydroponics
+    'G': '\033[1;37;47m',    # Cargo
+    'D': '\033[1;37m'        # Docking
+}
+
+# Rendered text of every possible cell byte, so a map is drawn by lookup.
+CELL_TEXT = [
+    DEPARTMENT_COLOURS[chr(code)] + chr(code) + '\033[0m    '
+    if chr(code) in DEPARTMENT_COLOURS else chr(code) + '    '
+    for code in range(256)
+]
+CELL_TEXT[OBSTACLE] = 'X    '
+
+
 class Environment:
     """
     Represents the environment where the robot operates.
 
     Provides a map of the environment, validates positions, finds paths
-    using BFS and generates a visual representation of the map.
+    using BFS or a selectable search strategy and generates a visual
+    representation of the map.
+
+    Attributes:
+        strategy (str): Default search strategy for queries the route index cannot answer.
+        route_cache (RouteCache): Cache of planned routes, or None if caching is disabled.
+        cost_model (CostModel): Seconds needed to cross a cell, by terrain cost and package type.
+        telemetry (Telemetry): Telemetry that route queries, map rendering and
+            deliveries record to, or None while telemetry is disabled.
     """
 
-    def __init__(self):
+    def __init__(self, layout=None, strategy='bfs', precompute_routes=True, route_cache_size=1024,
+                 terrain=None):
         """
-        Initialise the environment with a predefined map and dimensions.
+        Initialise the environment with a map layout and dimensions.
+
+        Args:
+            layout (list, optional): Rows of the map, each a string, bytes or
+                list of single-character cells. Defaults to the Luna-9 map.
+            strategy (str): Default search strategy, one of 'bfs', 'astar',
+                'bidirectional', 'jps' or 'hpa'.
+            precompute_routes (bool): Build the route index for every department
+                now, rather than for each department on its first query.
+            route_cache_size (int): Most routes kept in the route cache, 0 to disable it.
+            terrain (list, optional): Terrain cost of every cell, one list of numbers
+                per row, 1.0 for plain floor. Without it every cell is plain floor.
+
+        Raises:
+            ValueError: If the strategy is unknown, the layout is not rectangular
+                or the terrain does not match the layout.
         """
-        self._map = [
-            ['X', 'X', 'X', 'X', 'X', 'E', 'X'],
-            ['X', 'X', '.', '.', '.', '.', 'X'],
-            ['X', 'X', '.', 'X', 'X', '.', 'X'],
-            ['X', '.', '.', 'C', 'X', '.', 'X'],
-            ['X', 'M', '.', '.', '.', '.', 'A'],
-            ['X', '.', '.', '.', 'X', '.', 'X'],
-            ['.', '.', 'X', 'H', 'X', 'D', 'X'],
-            ['G', 'X', 'X', 'X', 'X', 'X', 'X']
-        ]
+        if layout is None:
+            layout = LUNA_9
+        if not layout or not layout[0]:
+            raise ValueError("A map layout needs at least one row and one column")
+
+        rows = len(layout)
+        cols = len(layout[0])
+        width = cols + 2
+        grid = bytearray((rows + 2) * width)
+
+        for row, cells in enumerate(layout):
+            if not isinstance(cells, (bytes, bytearray)):
+                cells = ''.join(cells).encode('ascii')
+            if len(cells) != cols:
+                raise ValueError(f"Row {row} of the map layout has {len(cells)} cells, expected {cols}")
+            start = (row + 1) * width + 1
+            grid[start:start + cols] = cells.translate(ENCODE_CELLS)
+
+        costs = None
+        if terrain is not None:
+            if len(terrain) != rows or any(len(line) != cols for line in terrain):
+                raise ValueError(f"Terrain costs must have {rows} rows of {cols} costs")
+            costs = bytearray([PLAIN]) * len(grid)
+            for row, line in enumerate(terrain):
+                start = (row + 1) * width + 1
+                costs[start:start + cols] = bytes(encode_cost(cost) for cost in line)
+
+        codes = bytes(sorted(set(grid.translate(None, FLOOR_CODES))))
+        self._attach(grid, 0, rows, cols, codes, strategy, precompute_routes, route_cache_size, costs)
+
+    @classmethod
+    def load(cls, path, strategy='bfs', precompute_routes=False, use_mmap=True, route_cache_size=1024):
+        """
+        Load an environment from a plain-text or binary station map file.
+
+        Routes from a loaded map are indexed per department on its first
+        query unless precompute_routes is set, so that startup stays fast.
+
+        Args:
+            path (str): Path of the map file.
+            strategy (str): Default search strategy.
+            precompute_routes (bool): Build the route index for every department now.
+            use_mmap (bool): Memory-map binary maps instead of reading them into memory.
+            route_cache_size (int): Most routes kept in the route cache, 0 to disable it.
+
+        Returns:
+            Environment: The loaded environment.
+
+        Raises:
+            ValueError: If the file is not a valid station map.
+        """
+        if not map_io.is_binary_map(path):
+            layout, terrain = map_io.read_text_map(path)
+            return cls(layout, strategy, precompute_routes, route_cache_size, terrain)
+
+        grid, base, rows, cols, codes, terrain, blocked = map_io.read_binary_map(path, use_mmap)
+        environment = cls.__new__(cls)
+        environment._attach(grid, base, rows, cols, codes, strategy, precompute_routes, route_cache_size,
+                            terrain, blocked)
+        return environment
+
+    def save(self, path):
+        """
+        Save the environment as a binary station map file.
+
+        Args:
+            path (str): Path of the map file.
+        """
+        with open(path, 'wb') as map_file:
+            map_file.write(self.to_bytes())
+
+    def to_bytes(self):
+        """
+        Encode the environment as the bytes of a binary station map.
 
-        self.rows = len(self.map)
-        self.cols = len(self.map[0])
+        Cells changed since the map was loaded are encoded as they are now.
+        Blocked cells are encoded as obstacles, along with what they were
+        before, so they can still be unblocked once the map is loaded again.
+
+        Returns:
+            bytes: The binary station map.
+        """
+        codes = {self._blocked.get(index, self._grid[index])
+                 for cells in self._departments.values() for index in cells}
+        codes.discard(OBSTACLE)
+        blocked = {index - self._base: code for index, code in self._blocked.items()}
+        return map_io.encode_binary_map(self._grid, self._base, self.rows, self.cols, bytes(sorted(codes)),
+                                        self._terrain, blocked)
+
+    @classmethod
+    def from_bytes(cls, data, strategy='bfs', precompute_routes=False, route_cache_size=1024):
+        """
+        Create an environment from the bytes of a binary station map.
+
+        Args:
+            data (bytes): The binary station map, see `to_bytes`.
+            strategy (str): Default search strategy.
+            precompute_routes (bool): Build the route index for every department now.
+            route_cache_size (int): Most routes kept in the route cache, 0 to disable it.
+
+        Returns:
+            Environment: The environment, over its own copy of the data.
+
+        Raises:
+            ValueError: If the data is not a valid binary station map.
+        """
+        buffer = bytearray(data)
+        base, rows, cols, codes, terrain, blocked = map_io.decode_binary_map(buffer)
+        environment = cls.__new__(cls)
+        environment._attach(buffer, base, rows, cols, codes, strategy, precompute_routes, route_cache_size,
+                            terrain, blocked)
+        return environment
+
+    def _attach(self, grid, base, rows, cols, codes, strategy, precompute_routes, route_cache_size,
+                terrain=None, blocked=None):
+        """
+        Set the environment up over a buffer holding a padded grid.
+
+        Args:
+            grid (bytearray): Buffer holding the padded grid, or an mmap of it.
+            base (int): Offset of the padded grid within the buffer.
+            rows (int): Number of rows of the map.
+            cols (int): Number of columns of the map.
+            codes (bytes): Cell codes used by departments on the map.
+            strategy (str): Default search strategy.
+            precompute_routes (bool): Build the route index for every department now.
+            route_cache_size (int): Most routes kept in the route cache, 0 to disable it.
+            terrain (buffer, optional): Terrain byte of each cell, indexed like the grid.
+            blocked (dict, optional): Offset of each blocked cell within the
+                padded grid mapped to the cell code it had before it was blocked.
+
+        Raises:
+            ValueError: If the strategy is unknown.
+        """
+        if strategy not in ROUTING_STRATEGIES:
+            raise ValueError(f"Unknown search strategy: {strategy}")
+        self.strategy = strategy
+
+        self.rows = rows
+        self.cols = cols
+        self._width = cols + 2
+        self._base = base
+        self._origin = base + self._width + 1
+        self._grid = grid
+        self._terrain = terrain
+        self._terrain_values = None
+        self.cost_model = CostModel()
+
+        self._departments = {}
+        for code in codes:
+            cells = self._departments.setdefault(chr(code).upper(), set())
+            cells.update(self._find_all(code))
+
+        # A blocked department cell still belongs to its department, as it did before it was blocked
+        self._blocked = {base + offset: code for offset, code in (blocked or {}).items()}
+        for index, code in self._blocked.items():
+            if code not in FLOOR_CODES:
+                self._departments.setdefault(chr(code).upper(), set()).add(index)
+
+        self._version = 0
+        self._changes = []
+        self._search = GridSearch(grid, rows, cols, base)
+        self._route_index = RouteIndex(self._search, self._departments)
+        self._hierarchy = None
+        if precompute_routes:
+            self._route_index.build()
+        self.route_cache = RouteCache(route_cache_size) if route_cache_size else None
+        self.telemetry = None
+
+    def _store_cell(self, index, cell):
+        """
+        Store a cell in the grid and record it if it belongs to a department.
+
+        Args:
+            index (int): Flat index of the cell.
+            cell (str): Cell character.
+        """
+        self._grid[index] = OBSTACLE if cell == 'X' else ord(cell)
+        if cell not in ('X', '.'):
+            self._departments.setdefault(cell.upper(), set()).add(index)
 
     @property
     def map(self):
         """
-        Get the environment map.
+        Get a copy of the environment map.
 
         Returns:
             list: 2D list representing the map.
         """
-        return self._map
+        return [
+            [self.cell(row, col) for col in range(self.cols)]
+            for row in range(self.rows)
+        ]
+
+    @property
+    def departments(self):
+        """
+        Get the department letters found on the map.
+
+        Returns:
+            list: Sorted list of department letters.
+        """
+        return sorted(self._departments)
+
+    def department_cells(self, department):
+        """
+        Get the positions of the cells belonging to a department.
+
+        Args:
+            department (str): Department name or letter.
+
+        Returns:
+            list: Sorted list of (row, col) coordinates, empty for an unknown department.
+        """
+        cells = self._departments.get(department[:1].upper(), ())
+        return sorted(self._search.position(index) for index in cells)
+
+    def cell(self, row, col):
+        """
+        Get the character of a single cell.
+
+        Args:
+            row (int): Row index of the cell.
+            col (int): Column index of the cell.
+
+        Returns:
+            str: The cell character.
+        """
+        code = self._grid[self._origin + row * self._width + col]
+        return 'X' if code == OBSTACLE else chr(code)
+
+    def as_array(self):
+        """
+        Get a NumPy view of the cell buffer, without copying it.
+
+        Obstacles read as 0 and every other cell as its character code.
+
+        Returns:
+            numpy.ndarray: A (rows, cols) array of uint8 cell codes.
+
+        Raises:
+            ImportError: If NumPy is not installed.
+        """
+        if np is None:
+            raise ImportError("NumPy is required for Environment.as_array()")
+        grid = np.frombuffer(self._grid, dtype=np.uint8, count=(self.rows + 2) * self._width,
+                             offset=self._base)
+        return grid.reshape(self.rows + 2, self._width)[1:-1, 1:-1]
+
+    def heatmap(self, departments=None, vectorised=None):
+        """
+        Compute the distance from every cell to every department.
+
+        With NumPy the fields of all departments are computed together by a
+        vectorised wavefront. Without it they are taken from the route index,
+        which builds each one with a BFS.
+
+        Args:
+            departments (iterable, optional): Department names or letters.
+                Defaults to every department on the map.
+            vectorised (bool, optional): Use the NumPy wavefront. Defaults to
+                using it whenever NumPy is installed.
+
+        Returns:
+            Heatmap: Distances from every cell to each department.
+
+        Raises:
+            ImportError: If vectorised is set and NumPy is not installed.
+            ValueError: If a department is not on the map.
+        """
+        if departments is None:
+            letters = sorted(self._departments)
+        else:
+            letters = [department[:1].upper() for department in departments]
+        for letter in letters:
+            if letter not in self._departments:
+                raise ValueError(f"Unknown department: {letter}")
+
+        if vectorised is None:
+            vectorised = np is not None
+        if not vectorised:
+            fields = [self.route_index._field(letter) for letter in letters]
+            return Heatmap(letters, fields, self.rows, self.cols, self._base)
+        if np is None:
+            raise ImportError("NumPy is required for a vectorised heatmap")
+
+        # The wavefront works on the padded grid alone, so its fields start at offset 0
+        size = (self.rows + 2) * self._width
+        walkable = np.frombuffer(self._grid, dtype=np.uint8, count=size, offset=self._base) != 0
+        sources = [[index - self._base for index in self._departments[letter]] for letter in letters]
+        return Heatmap(letters, wavefront(walkable, self._width, sources), self.rows, self.cols)
+
+    @property
+    def version(self):
+        """
+        Get the map version, which increases every time the map changes.
+
+        Returns:
+            int: The current map version.
+        """
+        return self._version
+
+    @property
+    def route_index(self):
+        """
+        Get the route index for the current map, rebuilding it if the map changed.
+
+        Returns:
+            RouteIndex: Precomputed routes towards each department.
+        """
+        if self._route_index is None:
+            self._route_index = RouteIndex(self._search, self._departments)
+        return self._route_index
+
+    @property
+    def hierarchy(self):
+        """
+        Get the cluster graph used by the 'hpa' strategy, setting it up on first use.
+
+        Returns:
+            ClusterGraph: Abstract graph of cluster entrances over the map.
+        """
+        if self._hierarchy is None:
+            self._hierarchy = ClusterGraph(self._search, DEFAULT_CLUSTER_SIZE)
+        return self._hierarchy
+
+    def build_hierarchy(self, cluster_size=DEFAULT_CLUSTER_SIZE):
+        """
+        Replace the cluster graph used by the 'hpa' strategy with one of a given cluster size.
+
+        Clusters are still built lazily, on the first query that needs them.
+
+        Args:
+            cluster_size (int): Number of rows and columns of a cluster.
+
+        Returns:
+            ClusterGraph: The new cluster graph.
+        """
+        self._hierarchy = ClusterGraph(self._search, cluster_size)
+        return self._hierarchy
+
+    def set_cell(self, row, col, cell):
+        """
+        Change a single cell of the map.
+
+        The route index is discarded and rebuilt on the next query.
+
+        Args:
+            row (int): Row index of the cell.
+            col (int): Column index of the cell.
+            cell (str): New cell character.
+        """
+        index = self._origin + row * self._width + col
+        previous = chr(self._blocked[index]) if index in self._blocked else self.cell(row, col)
+        if previous not in ('X', '.'):
+            department = self._departments[previous.upper()]
+            department.discard(index)
+            if not department:
+                del self._departments[previous.upper()]
+
+        self._store_cell(index, cell)
+        self._blocked.pop(index, None)
+        self._changed(index)
+
+    def block_cell(self, row, col):
+        """
+        Block a walkable cell, for example a sealed bulkhead, until it is unblocked.
+
+        Blocking a cell that is already an obstacle has no effect.
+
+        Args:
+            row (int): Row index of the cell.
+            col (int): Column index of the cell.
+
+        Raises:
+            ValueError: If the position is outside the map.
+        """
+        index = self._cell_index(row, col)
+        if self._grid[index] == OBSTACLE:
+            return
+        self._blocked[index] = self._grid[index]
+        self._grid[index] = OBSTACLE
+        self._changed(index)
+
+    def unblock_cell(self, row, col):
+        """
+        Restore a cell blocked with `block_cell` to what it was before.
+
+        Args:
+            row (int): Row index of the cell.
+            col (int): Column index of the cell.
+
+        Raises:
+            ValueError: If the position is outside the map or the cell is not blocked.
+        """
+        index = self._cell_index(row, col)
+        if index not in self._blocked:
+            raise ValueError(f"Cell {(row, col)} is not blocked")
+        self._grid[index] = self._blocked.pop(index)
+        self._changed(index)
+
+    def changed_cells(self, since_version):
+        """
+        Get the cells that changed after a given map version.
+
+        Args:
+            since_version (int): Map version to compare against.
+
+        Returns:
+            list: Coordinates (row, col) of each changed cell, once each, in order of first change.
+        """
+        changes = dict.fromkeys(self._changes[since_version:])
+        return [self._search.position(index) for index in changes]
+
+    def replanner(self, start_position, destination):
+        """
+        Create an incremental planner that can repair its route after the map changes.
+
+        Args:
+            start_position (tuple): Starting coordinates (row, col).
+            destination (str or tuple): Target destination character or coordinates.
+
+        Returns:
+            Replanner: Planner holding the route to the destination, see
+                `Replanner.path` and `Replanner.repair`.
+
+        Raises:
+            ValueError: If the start position is outside the map.
+        """
+        return Replanner(self._search, self._cell_index(*start_position), self._goal_cells(destination))
+
+    def _cell_index(self, row, col):
+        """
+        Get the flat index of a cell of the map.
+
+        Args:
+            row (int): Row index of the cell.
+            col (int): Column index of the cell.
+
+        Returns:
+            int: Flat index of the cell.
+
+        Raises:
+            ValueError: If the position is outside the map.
+        """
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            raise ValueError(f"Position {(row, col)} is outside the map")
+        return self._origin + row * self._width + col
+
+    def _changed(self, index):
+        """
+        Record a change to a cell: bump the map version and discard the route index.
+
+        Args:
+            index (int): Flat index of the changed cell.
+        """
+        self._changes.append(index)
+        self._version += 1
+        self._route_index = None
+        if self._hierarchy is not None:
+            self._hierarchy.invalidate(index)
 
     def is_valid_position(self, row, col):
         """
@@ -65,48 +606,385 @@ class Environment:
         Returns:
             bool: True if the position is valid, False otherwise.
         """
-        return 0 <= row < self.rows and 0 <= col < self.cols and self.map[row][col] != 'X'
+        return (0 <= row < self.rows and 0 <= col < self.cols
+                and self._grid[self._origin + row * self._width + col] != OBSTACLE)
 
-    def find_path(self, start_position, destination):
+    def find_path(self, start_position, destination, max_depth=None, max_expansions=None,
+                  strategy=None):
         """
         Find the shortest path from a start position to a destination.
 
-        Uses Breadth-First Search (BFS) to determine the path.
+        Repeated queries are answered from the route cache. Department queries
+        are answered from the route index, unless a strategy is asked for. Any
+        other query is searched for with the chosen search strategy.
 
         Args:
             start_position (tuple): Starting coordinates (row, col).
-            destination (str): Target destination character.
+            destination (str or tuple): Target destination character, or
+                target coordinates (row, col).
+            max_depth (int, optional): Longest path, in steps, worth searching for.
+            max_expansions (int, optional): Most cells a search may expand.
+            strategy (str, optional): Search strategy overriding the environment's
+                default. Department queries are then searched for too, so that
+                every query goes through the strategy.
 
         Returns:
             list: List of coordinates representing the path, or None if no path exists.
         """
-        queue = [start_position]
-        visited = set()
-        visited.add(start_position)
-        previous = {start_position: None}
+        indexed = strategy is None
+        strategy = strategy or self.strategy
+        telemetry = self.telemetry
+        if telemetry is not None:
+            started = time.perf_counter()
 
-        while queue:
-            current = queue.pop(0)
-            row, col = current
+        cache = self.route_cache
+        found = False
+        if cache is not None:
+            key = (tuple(start_position), destination if isinstance(destination, str) else tuple(destination),
+                   None if indexed else strategy)
+            found, path = cache.get(key, self._version)
+            source = 'cache'
 
-            if self.map[row][col].upper() == destination[0].upper():
-                path = []
-                while current:
-                    path.append(current)
-                    current = previous[current]
-                path.reverse()
-                return path
+        if not found:
+            route_index = self.route_index
+            if indexed and route_index.covers(start_position, destination):
+                path = route_index.path(start_position, destination)
+                exhaustive = True
+                source = 'index'
+            else:
+                path = self._search_path(start_position, destination, max_depth, max_expansions, strategy)
+                exhaustive = max_depth is None and max_expansions is None
+                source = 'search'
 
-            for move in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
-                new_row, new_col = row + move[0], col + move[1]
-                new_position = (new_row, new_col)
+            # A budget never changes which path a search finds, only whether it finds one, so
+            # any path is worth caching, but a missing one only when no budget cut the search short
+            if cache is not None and (path is not None or exhaustive):
+                cache.put(key, self._version, tuple(path) if path is not None else None)
+        elif path is not None:
+            path = list(path)
 
-                if self.is_valid_position(new_row, new_col) and new_position not in visited:
-                    queue.append(new_position)
-                    visited.add(new_position)
-                    previous[new_position] = current
+        if path is not None and max_depth is not None and len(path) - 1 > max_depth:
+            path = None
+        if telemetry is not None:
+            self._record_path(telemetry, source, strategy, path, started)
+        return path
 
-        return None
+    def _record_path(self, telemetry, source, strategy, path, started):
+        """
+        Record the metrics of a route query.
+
+        Args:
+            telemetry (Telemetry): Telemetry to record to.
+            source (str): What answered the query: 'cache', 'index' or 'search'.
+            strategy (str): Search strategy of the query.
+            path (list): The path found, or None.
+            started (float): Performance counter reading when the query started.
+        """
+        telemetry.count(f'find_path.{source}')
+        if source == 'search':
+            search = self._hierarchy if strategy == HIERARCHICAL else self._search
+            telemetry.observe('find_path.expanded', search.expanded)
+        if path is None:
+            telemetry.count('find_path.no_path')
+        else:
+            telemetry.observe('find_path.length', len(path) - 1)
+        telemetry.observe('find_path.seconds', time.perf_counter() - started)
+
+    def find_path_avoiding(self, start_position, destination, avoid, max_depth=None,
+                           max_expansions=None, strategy=None):
+        """
+        Find the shortest path to a destination that avoids some walkable cells.
+
+        The avoided cells are treated as obstacles for the duration of one
+        search only. The map version and the route index are left untouched.
+
+        Args:
+            start_position (tuple): Starting coordinates (row, col).
+            destination (str or tuple): Target destination character or coordinates.
+            avoid (iterable): Coordinates (row, col) of the cells to avoid.
+            max_depth (int, optional): Longest path, in steps, worth searching for.
+            max_expansions (int, optional): Most cells the search may expand.
+            strategy (str, optional): Search strategy overriding the environment's default.
+
+        Returns:
+            list: List of coordinates representing the path, or None if no path exists.
+        """
+        grid = self._grid
+        saved = []
+        for row, col in avoid:
+            if self.is_valid_position(row, col) and (row, col) != start_position:
+                index = self._origin + row * self._width + col
+                saved.append((index, grid[index]))
+                grid[index] = OBSTACLE
+        # The cluster graph does not see temporary obstacles, so this search stays on the grid
+        strategy = strategy or self.strategy
+        if strategy == HIERARCHICAL:
+            strategy = 'astar'
+        try:
+            return self._search_path(start_position, destination, max_depth, max_expansions, strategy)
+        finally:
+            for index, code in saved:
+                grid[index] = code
+
+    def find_paths(self, queries, strategy=None, workers=None):
+        """
+        Find the shortest paths for a batch of queries, spread across worker processes.
+
+        Batches too small to pay for starting the workers are planned serially
+        with `find_path`. Otherwise the queries the route cache cannot answer
+        are planned in parallel, over a copy of the grid shared by the workers,
+        and their routes are added to the cache.
+
+        Args:
+            queries (iterable): (start_position, destination) pairs, as taken by `find_path`.
+            strategy (str, optional): Search strategy overriding the environment's
+                default. As with `find_path`, department queries are then
+                searched for too.
+            workers (int, optional): Most worker processes. Defaults to the number of CPUs.
+
+        Returns:
+            list: Path of each query, in the order of the queries, None where no path exists.
+
+        Raises:
+            ValueError: If the strategy is unknown.
+        """
+        requested = strategy
+        strategy = strategy or self.strategy
+        if strategy not in ROUTING_STRATEGIES:
+            raise ValueError(f"Unknown search strategy: {strategy}")
+        queries = [
+            (tuple(start), destination if isinstance(destination, str) else tuple(destination))
+            for start, destination in queries
+        ]
+        workers = min(workers or os.cpu_count() or 1, len(queries) // parallel.MIN_QUERIES_PER_WORKER)
+        if workers < 2:
+            return [self.find_path(start, destination, strategy=requested) for start, destination in queries]
+
+        cache = self.route_cache
+        paths = [None] * len(queries)
+        pending = []
+        for number, query in enumerate(queries):
+            found, path = cache.get(query + (requested,), self._version) if cache is not None else (False, None)
+            if found:
+                paths[number] = list(path) if path is not None else None
+            else:
+                pending.append(number)
+        if not pending:
+            return paths
+
+        # Workers see the grid from offset 0, so every flat index is shifted by the base. Without
+        # any departments, their route index answers nothing and every query is searched for
+        base = self._base
+        departments = {letter: {index - base for index in cells} for letter, cells in self._departments.items()
+                       if requested is None}
+        goals = {}
+        for number in pending:
+            destination = queries[number][1]
+            if isinstance(destination, str) and destination[0].upper() not in departments:
+                target = destination[0].upper()
+                goals[target] = {index - base for index in self._goal_cells(target)}
+
+        size = (self.rows + 2) * self._width
+        cluster_size = self._hierarchy.cluster_size if self._hierarchy is not None else DEFAULT_CLUSTER_SIZE
+        planned = parallel.plan_routes(
+            bytes(self._grid[base:base + size]), self.rows, self.cols, departments, goals,
+            [queries[number] for number in pending], strategy, workers, cluster_size
+        )
+        for number, path in zip(pending, planned):
+            paths[number] = path
+            if cache is not None:
+                cache.put(queries[number] + (requested,), self._version, tuple(path) if path is not None else None)
+        return paths
+
+    @property
+    def has_terrain(self):
+        """
+        Check whether the map has terrain costs.
+
+        Returns:
+            bool: True if cells may differ in cost, False if every cell is plain floor.
+        """
+        return self._terrain is not None
+
+    def terrain_cost(self, row, col):
+        """
+        Get the terrain cost of a cell.
+
+        Args:
+            row (int): Row index of the cell.
+            col (int): Column index of the cell.
+
+        Returns:
+            float: Terrain cost, 1.0 for plain floor.
+
+        Raises:
+            ValueError: If the position is outside the map.
+        """
+        index = self._cell_index(row, col)
+        return decode_cost(self._terrain[index]) if self._terrain is not None else 1.0
+
+    def step_time(self, position, package=None):
+        """
+        Get the seconds a robot spends on a cell.
+
+        Args:
+            position (tuple): Coordinates (row, col) of the cell.
+            package (Package, optional): Package carried.
+
+        Returns:
+            float: Seconds spent on the cell, see `CostModel.step_seconds`.
+        """
+        return self.cost_model.step_seconds(self.terrain_cost(*position), package)
+
+    def travel_time(self, path, package=None):
+        """
+        Get the seconds a robot takes to walk a path, spending one step's time on each of its cells.
+
+        Args:
+            path (list): Coordinates (row, col) of the path.
+            package (Package, optional): Package carried.
+
+        Returns:
+            float: Total seconds.
+        """
+        return sum(self.step_time(position, package) for position in path)
+
+    def find_fastest_path(self, start_position, destination, package=None, max_expansions=None):
+        """
+        Find the path to a destination that takes the least time for a package.
+
+        On a map without terrain costs every cell takes the same time, so the
+        fastest path is the shortest one and the query goes to `find_path`.
+        Otherwise a weighted search runs with the cost model's step times.
+
+        Args:
+            start_position (tuple): Starting coordinates (row, col).
+            destination (str or tuple): Target destination character or coordinates.
+            package (Package, optional): Package carried. Without one, the path
+                with the lowest total terrain cost is found.
+            max_expansions (int, optional): Most cells the search may expand.
+
+        Returns:
+            list: List of coordinates representing the path, or None if no path exists.
+        """
+        if self._terrain is None:
+            return self.find_path(start_position, destination)
+
+        start = self._search.index(start_position)
+        if start is None or not self._grid[start]:
+            return None
+
+        if self._terrain_values is None:
+            size = (self.rows + 2) * self._width
+            self._terrain_values = set(self._terrain[self._base:self._base + size])
+        step_costs = self.cost_model.table(package)
+        min_step = min(step_costs[value] for value in self._terrain_values)
+
+        path, _ = self._search.weighted(start, self._goal_cells(destination), step_costs,
+                                        self._terrain, min_step, max_expansions)
+        if path is None:
+            return None
+        return [self._search.position(cell) for cell in path]
+
+    def _goal_cells(self, destination):
+        """
+        Get the cells a destination refers to.
+
+        Args:
+            destination (str or tuple): Target destination name or character,
+                or target coordinates (row, col).
+
+        Returns:
+            set: Flat indices of the matching cells.
+        """
+        if isinstance(destination, tuple):
+            goal = self._search.index(destination)
+            return set() if goal is None else {goal}
+
+        target = destination[0].upper()
+        if target in self._departments:
+            return self._departments[target]
+
+        codes = {OBSTACLE} if target == 'X' else {ord(target), ord(target.lower())}
+        return {
+            index
+            for code in codes
+            for index in self._find_all(code)
+            if 0 <= (index - self._origin) % self._width < self.cols
+            and self._origin <= index < self._origin + self.rows * self._width
+        }
+
+    def _find_all(self, code):
+        """
+        Yield the flat index of every cell of the padded grid holding a byte.
+
+        Args:
+            code (int): Byte value to look for.
+
+        Yields:
+            int: Flat index of each matching cell, padding included.
+        """
+        grid = self._grid
+        needle = bytes((code,))
+        # The buffer may hold more after the grid, such as a terrain layer
+        end = self._base + (self.rows + 2) * self._width
+        index = grid.find(needle, self._base, end)
+        while index >= 0:
+            yield index
+            index = grid.find(needle, index + 1, end)
+
+    def _search_path(self, start_position, destination, max_depth=None, max_expansions=None,
+                     strategy='bfs'):
+        """
+        Find the shortest path to a destination with a search strategy.
+
+        Args:
+            start_position (tuple): Starting coordinates (row, col).
+            destination (str or tuple): Target destination character or coordinates.
+            max_depth (int, optional): Longest path, in steps, worth searching for.
+            max_expansions (int, optional): Most cells the search may expand.
+            strategy (str): One of 'bfs', 'astar', 'bidirectional', 'jps' or 'hpa'.
+                Budgets do not apply to 'hpa', whose paths are near-shortest.
+
+        Returns:
+            list: List of coordinates representing the path, or None if no path exists.
+
+        Raises:
+            ValueError: If the strategy is unknown.
+        """
+        start = self._search.index(start_position)
+        if start is None:
+            return None
+
+        goals = self._goal_cells(destination)
+        if strategy == HIERARCHICAL:
+            path = self.hierarchy.find_path(start, goals)
+        else:
+            path = self._search.search(strategy, start, goals, max_depth, max_expansions)
+        if path is None:
+            return None
+        return [self._search.position(cell) for cell in path]
+
+    def frame(self, robot_position):
+        """
+        Generate the text of every cell of the map with the robot's position.
+
+        Args:
+            robot_position (tuple): Coordinates (row, col) of the robot.
+
+        Returns:
+            list: One list per row holding the coloured text of each cell.
+        """
+        robot_row, robot_col = robot_position
+        width = self._width
+        rows = []
+        for row in range(self.rows):
+            start = self._origin + row * width
+            cells = [CELL_TEXT[code] for code in self._grid[start:start + self.cols]]
+            if row == robot_row:
+                cells[robot_col] = CELL_TEXT[ord('R')]
+            rows.append(cells)
+        return rows
 
     def generate_map(self, robot_position):
         """
@@ -118,27 +996,8 @@ class Environment:
         Returns:
             str: String representation of the map with department colours.
         """
-        map_copy = [row[:] for row in self.map]
-        row, col = robot_position
-        map_copy[row][col] = 'R'
-
-        department_colours = {
-            'E': '\033[1;37;44m',    # Engineering
-            'C': '\033[1;37;46m',    # Command
-            'M': '\033[1;37;42m',    # Medical Bay
-            'A': '\033[1;37;41m',    # Airlock
-            'H': '\033[1;37;43m',    # Hydroponics
-            'G': '\033[1;37;47m',    # Cargo
-            'D': '\033[1;37m'        # Docking
-        }
-
-        map_str = ''
-        for row in map_copy:
-            for cell in row:
-                if cell in department_colours:
-                    map_str += department_colours[cell] + cell + '\033[0m    '
-                else:
-                    map_str += cell + "    "
-            map_str += '\n'
-
-        return map_str
+        telemetry = self.telemetry
+        if telemetry is None:
+            return '\n'.join([''.join(cells) for cells in self.frame(robot_position)]) + '\n'
+        with telemetry.timer('generate_map.seconds'):
+            return '\n'.join([''.join(cells) for cells in self.frame(robot_position)]) + '\n'
@@ -0,0 +1,784 @@
+"""
+fleet.py
+
+This module defines the Fleet class, a headless simulator in which many
+robots share one environment and deliver packages from a common job queue.
+
+Features:
+- Any number of `Robot` instances sharing one read-only `Environment`.
+- A first-in, first-out job queue that idle robots take packages from, which
+  also takes whole `PackageBatch` queues of packages held as arrays, or
+  a scheduler that hands the most urgent jobs to the nearest idle robots
+  and reports how many met their deadlines.
+- Lock-step simulation ticks in which each robot moves at the speed of the
+  package it carries.
+- Cell reservations: a corridor cell holds one robot at a time, while
+  department cells and the home cell hold any number of robots.
+- Cooperative planning as an alternative: each robot plans its route in
+  space and time around the cells other robots have reserved, waiting or
+  detouring ahead of a narrow corridor instead of meeting another robot
+  head-on inside it.
+- Deadlock breaking: a robot blocked for too long first looks for a route
+  around the robots in its way, and failing that asks the robot blocking
+  it to make way if that robot has a lower priority. The robot holding the
+  oldest job has the highest priority. Each job takes only a few detours,
+  so robots cannot chase each other round a loop for good.
+- Stall detection: if no robot delivers, gives up or gets closer to its
+  destination for too long, the robots hand their jobs to the cooperative
+  planner, and a fleet that is already planning cooperatively gives up its
+  stuck jobs, so every run comes to an end.
+- Ticks paced by a pluggable clock, instant by default, so a run can also be
+  watched in real time or at any speed multiplier.
+- Throughput reporting in deliveries per simulated hour and in ticks per
+  second of wall-clock time.
+- An optional package registry that records every delivery in its history.
+- An optional event log of the jobs submitted and the runs made, from which
+  a run can be replayed exactly, see `snapshot`.
+
+Classes:
+    Fleet: Simulates a fleet of delivery robots in lock-step ticks.
+"""
+
+
+import math
+import random
+import time
+from collections import deque
+from clock import SimulatedClock
+from cooperative import CooperativePlanner, DEFAULT_WINDOW
+from package import PackageBatch
+from robot import Robot
+
+
+MAX_DETOURS = 3
+DEFAULT_STALL_TICKS = 200
+
+
+class Fleet:
+    """
+    Simulates a fleet of delivery robots in lock-step ticks.
+
+    Attributes:
+        environment (Environment): The environment shared by every robot.
+        robots (list): The robots of the fleet.
+        jobs (deque): Packages and package batches waiting for a robot, when no
+            scheduler is used.
+        scheduler (Scheduler): Scheduler of the jobs, or None for first-in, first-out dispatch.
+        planner (CooperativePlanner): Planner of the robots' routes in space and
+            time, or None if robots follow shortest routes and give way when blocked.
+        tick_seconds (float): Simulated seconds per tick.
+        home (tuple): Coordinates (row, col) where every robot starts.
+        clock (Clock): Clock that paces the ticks.
+        patience (int): Ticks a robot waits behind another before it looks for
+            a way around or asks the other robot to make way.
+        ticks (int): Number of ticks simulated so far.
+        delivered (int): Number of packages delivered so far.
+        failed (int): Number of packages whose destination could not be reached.
+        blocked_ticks (int): Total ticks robots spent waiting for a free cell.
+            With cooperative planning, only the waits the plans did not foresee.
+        stall_ticks (int): Ticks without any robot delivering, giving up or
+            getting closer to its destination after which the fleet is stalled.
+        stalls (int): Number of stalls broken so far.
+        strategy (str): Search strategy of the reactive robots' routes, or None
+            to take routes to departments from the route index.
+        registry (PackageRegistry): Registry told of every package delivered or
+            given up on, or None.
+        event_log (EventLog): Log the fleet records its jobs and runs to, or None.
+    """
+
+    def __init__(self, environment, size, tick_seconds=0.5, patience=3, home=(6, 0),
+                 clock=None, scheduler=None, cooperative=False, window=DEFAULT_WINDOW, registry=None,
+                 stall_ticks=DEFAULT_STALL_TICKS, strategy=None):
+        """
+        Initialise the fleet with every robot at its home cell.
+
+        Args:
+            environment (Environment): The environment shared by every robot.
+            size (int): Number of robots in the fleet.
+            tick_seconds (float): Simulated seconds per tick.
+            patience (int): Ticks a robot waits behind another before stepping aside.
+            home (tuple): Coordinates (row, col) where every robot starts.
+            clock (Clock, optional): Clock that paces the ticks, shared with every
+                robot. Defaults to a discrete-event clock that never waits.
+            scheduler (Scheduler, optional): Scheduler of the jobs. Without one,
+                jobs are handed to idle robots in submission order.
+            cooperative (bool): Whether robots plan their routes around each
+                other's reservations. Destinations must then be departments.
+            window (int): Ticks ahead each cooperative plan reserves. Robots
+                replan every half window. Also used by a reactive fleet that
+                hands its jobs to the cooperative planner after a stall.
+            registry (PackageRegistry, optional): Registry told of every package
+                delivered or given up on.
+            stall_ticks (int): Ticks without any robot delivering, giving up or
+                getting closer to its destination after which the fleet is stalled.
+            strategy (str, optional): Search strategy every route of a reactive
+                robot is searched for with. Without one, routes to departments
+                come from the route index, and detours are searched for with A*.
+
+        Raises:
+            ValueError: If the fleet is empty, the home cell is not walkable or
+                the planning window is shorter than one tick.
+        """
+        if size < 1:
+            raise ValueError("A fleet needs at least one robot")
+        if not environment.is_valid_position(*home):
+            raise ValueError(f"Home cell {home} is not walkable")
+
+        self.environment = environment
+        self.clock = clock or SimulatedClock()
+        self.robots = [
+            Robot(name=f"Astrid-{number}", model="RX-101", manufacturer="SpaceCorp",
+                  environment=environment, clock=self.clock)
+            for number in range(1, size + 1)
+        ]
+        for robot in self.robots:
+            robot.position = home
+
+        self.jobs = deque()
+        self._batched = 0
+        self.scheduler = scheduler
+        self.tick_seconds = tick_seconds
+        self.home = home
+        self.patience = patience
+        self.ticks = 0
+        self.delivered = 0
+        self.failed = 0
+        self.blocked_ticks = 0
+        self.stall_ticks = stall_ticks
+        self.stalls = 0
+        self.strategy = strategy
+        self.wall_seconds = 0.0
+        self.registry = registry
+        self.event_log = None
+
+        self._shared = {home}
+        for department in environment.departments:
+            self._shared.update(environment.department_cells(department))
+        self.window = window
+        self.planner = CooperativePlanner(environment, self._shared, window) if cooperative else None
+
+        self._paths = [None] * size
+        self._steps = [0] * size
+        self._progress = [0.0] * size
+        self._waited = [0] * size
+        self._assigned = [0] * size
+        self._jobs = [None] * size
+        self._planned = [None] * size
+        self._stuck = [None] * size
+        self._detours = [0] * size
+        self._closest = [None] * size
+        self._progressed = 0
+        self._random = random.Random(0)
+
+    @property
+    def now(self):
+        """
+        Get the simulated time of the current tick.
+
+        Returns:
+            float: Simulated seconds since the first tick.
+        """
+        return self.ticks * self.tick_seconds
+
+    def submit(self, package, deadline=None):
+        """
+        Add a package to the job queue.
+
+        Args:
+            package (Package): The package to deliver.
+            deadline (float, optional): Simulated time by which the package must
+                be delivered. Only used by a scheduler, which otherwise derives
+                it from the package type.
+        """
+        if self.event_log is not None:
+            self.event_log.record('submit', self.ticks, type=type(package).__name__, package=package.package_id,
+                                  destination=package.destination, deadline=deadline)
+        if self.scheduler is not None:
+            self.scheduler.submit(package, self.now, deadline)
+        else:
+            self.jobs.append(package)
+
+    def submit_batch(self, batch):
+        """
+        Add a batch of packages to the job queue, in batch order.
+
+        Without a scheduler or an event log, the batch joins the queue as it
+        is, and each package object is only created when a robot takes it.
+        The fleet takes the packages from the batch as it goes.
+
+        Args:
+            batch (PackageBatch): The packages to deliver.
+        """
+        if self.scheduler is not None or self.event_log is not None:
+            while batch:
+                self.submit(batch.popleft())
+        elif batch:
+            self.jobs.append(batch)
+            self._batched += len(batch) - 1
+
+    @property
+    def queued(self):
+        """
+        Get the number of jobs waiting for a robot.
+
+        Returns:
+            int: Number of queued jobs.
+        """
+        return len(self.scheduler) if self.scheduler is not None else len(self.jobs) + self._batched
+
+    @property
+    def busy(self):
+        """
+        Check whether any robot is carrying a package.
+
+        Returns:
+            bool: True if at least one robot is on a delivery.
+        """
+        return any(path is not None for path in self._paths)
+
+    def run(self, max_ticks=None):
+        """
+        Simulate ticks until every job is delivered or the tick limit is reached.
+
+        Without a tick limit the run still ends: a stalled fleet first plans
+        cooperatively, then gives up the jobs it is stuck on.
+
+        Args:
+            max_ticks (int, optional): Most ticks to simulate.
+
+        Returns:
+            dict: The fleet report, see `report`.
+        """
+        while (self.queued or self.busy) and (max_ticks is None or self.ticks < max_ticks):
+            self.tick()
+        if self.event_log is not None:
+            self.event_log.record('run', self.ticks, max_ticks=max_ticks)
+        return self.report()
+
+    def tick(self):
+        """
+        Simulate one tick: hand jobs to idle robots, then move every busy robot.
+
+        Robots move in priority order. A robot only enters a corridor cell
+        that was free at the start of the tick and that no other robot has
+        entered during it, which also rules out head-on swaps. With
+        cooperative planning, robots follow their plans instead, see
+        `_follow_plans`.
+        """
+        started = time.perf_counter()
+        self._assign_jobs()
+        if self.ticks - self._progressed >= self.stall_ticks and self.busy:
+            self._break_stall()
+
+        self._occupied = {
+            robot.position: number
+            for number, robot in enumerate(self.robots)
+            if robot.position not in self._shared
+        }
+        self._claimed = set()
+        self._moved = set()
+        if self.planner is not None:
+            self._follow_plans()
+            self._end_tick(started)
+            return
+
+        for number in sorted(range(len(self.robots)), key=self._priority):
+            path = self._paths[number]
+            if path is None or number in self._moved:
+                continue
+
+            speed = self.robots[number].inventory[0].DELIVERY_SPEED
+            self._progress[number] = min(self._progress[number] + self.tick_seconds, speed)
+            if self._progress[number] < speed:
+                continue
+
+            target = path[self._steps[number] + 1]
+            if self._is_free(target):
+                self._move(number, target)
+                self._progress[number] -= speed
+                self._steps[number] += 1
+                self._waited[number] = 0
+                if self._steps[number] == len(path) - 1:
+                    self._finish(number)
+                else:
+                    self._approach(number)
+                continue
+
+            self._waited[number] += 1
+            self.blocked_ticks += 1
+            if self._waited[number] < self.patience:
+                continue
+            if self._waited[number] % self.patience == 0 and self._reroute(number):
+                continue
+
+            blocker = self._occupied.get(target)
+            if blocker is not None and self._priority(blocker) > self._priority(number):
+                keep_clear = set(path[self._steps[number]:])
+                self._make_way(blocker, keep_clear, self._priority(number), depth=2)
+            elif self._waited[number] % (3 * self.patience) == 0:
+                self._make_way(number, {target}, self._priority(number), depth=0)
+
+        self._end_tick(started)
+
+    def _end_tick(self, started):
+        """
+        Count a finished tick and wait for the clock.
+
+        Args:
+            started (float): Performance counter reading at the start of the tick.
+        """
+        self.ticks += 1
+        self.wall_seconds += time.perf_counter() - started
+        self.clock.sleep(self.tick_seconds)
+
+    def _follow_plans(self):
+        """
+        Move every busy robot one tick along its cooperative plan.
+
+        Every half window, all busy robots drop their reservations and replan
+        in priority order, so robots of higher priority get the first pick of
+        the cells and the others plan around them. Robots that found no way
+        forward since they last moved go first, in a random order, as robots
+        of higher priority can pin them down otherwise. In between, only
+        robots whose plan ran out or went wrong replan. A robot may enter a
+        cell in the same tick another robot leaves it, so robots can follow
+        each other closely through a corridor. A robot whose next cell is
+        still held waits and replans on the next tick.
+        """
+        order = sorted((number for number in range(len(self.robots)) if self._paths[number] is not None),
+                       key=self._plan_order)
+        if self.ticks % max(1, self.planner.window // 2) == 0:
+            # Stuck robots take turns at planning first, so no pair of them can keep pinning each other down
+            stuck = [number for number in order if self._stuck[number] is not None]
+            self._random.shuffle(stuck)
+            order = stuck + order[len(stuck):]
+            # Until it has replanned, each robot keeps its cell for the ticks it needs before it can move on
+            for number in order:
+                robot = self.robots[number]
+                settling = self._dwell(robot.inventory[0]) - int(self._progress[number])
+                self.planner.reservations.release(number)
+                self.planner.reservations.reserve(number, [robot.position] * max(1, settling), self.ticks)
+                self._planned[number] = None
+        for number in order:
+            if self._planned[number] is None:
+                self._replan(number)
+
+        pending = []
+        for number in order:
+            path = self._paths[number]
+            if path is None:
+                continue
+            target = path[self._steps[number] + 1]
+            if target == self.robots[number].position:
+                self._progress[number] += 1
+                self._advance(number)
+            else:
+                pending.append((number, target))
+
+        # A robot leaving a cell lets the robot behind it in, so keep going until nobody moves
+        occupied = self._occupied
+        moving = True
+        while pending and moving:
+            moving = False
+            waiting = []
+            for number, target in pending:
+                if target not in self._shared and target in occupied:
+                    waiting.append((number, target))
+                    continue
+                robot = self.robots[number]
+                if occupied.get(robot.position) == number:
+                    del occupied[robot.position]
+                if target not in self._shared:
+                    occupied[target] = number
+                robot.position = target
+                self._progress[number] = 0
+                self._stuck[number] = None
+                self._advance(number)
+                if self._paths[number] is not None:
+                    self._approach(number)
+                moving = True
+            pending = waiting
+
+        for number, _ in pending:
+            self.blocked_ticks += 1
+            self._progress[number] += 1
+            self._planned[number] = None
+
+    def _plan_order(self, number):
+        """
+        Get the order in which a robot replans, lower values first.
+
+        Args:
+            number (int): Index of the robot in the fleet.
+
+        Returns:
+            tuple: Robots that found no way forward since they last moved
+                first, then by priority.
+        """
+        return self._stuck[number] is None, self._priority(number)
+
+    def _advance(self, number):
+        """
+        Count one tick of a robot's plan as done, finishing the job at its end.
+
+        Args:
+            number (int): Index of the robot in the fleet.
+        """
+        self._steps[number] += 1
+        if self._steps[number] < len(self._paths[number]) - 1:
+            return
+        robot = self.robots[number]
+        if self.environment.route_index.distance(robot.position, robot.inventory[0].destination) == 0:
+            self._finish(number)
+        else:
+            self._planned[number] = None
+
+    def _replan(self, number):
+        """
+        Renew a robot's cooperative plan from where it stands.
+
+        Args:
+            number (int): Index of the robot in the fleet.
+        """
+        robot = self.robots[number]
+        package = robot.inventory[0]
+        path = self.planner.plan(number, robot.position, package.destination, self.ticks,
+                                 self._dwell(package), int(self._progress[number]))
+        if path is None:
+            self._give_up(number)
+            return
+
+        self._paths[number] = path
+        self._steps[number] = 0
+        self._planned[number] = self.ticks
+        if self.planner.stuck:
+            self._stuck[number] = self.ticks
+
+    def _dwell(self, package):
+        """
+        Get the ticks a robot carrying a package takes per move.
+
+        Args:
+            package (Package): The package carried.
+
+        Returns:
+            int: Ticks per move, at least one.
+        """
+        return max(1, math.ceil(round(package.DELIVERY_SPEED / self.tick_seconds, 9)))
+
+    def _assign_jobs(self):
+        """
+        Hand queued packages to idle robots, in fleet order or as the scheduler decides.
+        """
+        if self.scheduler is not None:
+            idle = {number: robot.position for number, robot in enumerate(self.robots)
+                    if self._paths[number] is None}
+            for number, job in self.scheduler.assign(idle, on_fail=lambda job: self._drop(job.package, job)):
+                self._start(number, job.package, job)
+            return
+
+        for number, robot in enumerate(self.robots):
+            if not self.jobs:
+                return
+            if self._paths[number] is None:
+                self._start(number, self._next_job())
+
+    def _next_job(self):
+        """
+        Take the package at the front of the job queue.
+
+        Returns:
+            Package: The package, taken from the front batch if the queue starts with one.
+        """
+        head = self.jobs[0]
+        if not isinstance(head, PackageBatch):
+            return self.jobs.popleft()
+        package = head.popleft()
+        if head:
+            self._batched -= 1
+        else:
+            self.jobs.popleft()
+        return package
+
+    def _start(self, number, package, job=None):
+        """
+        Send an idle robot out with a package.
+
+        Args:
+            number (int): Index of the robot in the fleet.
+            package (Package): The package to deliver.
+            job (Job, optional): The scheduler's job for the package.
+        """
+        robot = self.robots[number]
+        if self.planner is not None:
+            path = self.planner.plan(number, robot.position, package.destination, self.ticks, self._dwell(package))
+        else:
+            path = self.environment.find_path(robot.position, package.destination, strategy=self.strategy)
+        if path is None:
+            self._drop(package, job)
+            return
+
+        robot.inventory.append(package)
+        self._jobs[number] = job
+        self._paths[number] = path
+        self._steps[number] = 0
+        self._progress[number] = 0.0
+        self._waited[number] = 0
+        self._assigned[number] = self.ticks
+        self._planned[number] = self.ticks
+        self._detours[number] = 0
+        self._closest[number] = None
+        self._progressed = self.ticks
+        self._approach(number)
+        if self.planner is not None and self.planner.stuck:
+            self._stuck[number] = self.ticks
+        if len(path) == 1:
+            self._finish(number)
+
+    def _priority(self, number):
+        """
+        Get the priority of a robot, lower values first.
+
+        Args:
+            number (int): Index of the robot in the fleet.
+
+        Returns:
+            tuple: The tick the robot's job was assigned on, then its index.
+        """
+        return self._assigned[number], number
+
+    def _is_free(self, cell):
+        """
+        Check whether a robot may enter a cell during the current tick.
+
+        Args:
+            cell (tuple): Coordinates (row, col) of the cell.
+
+        Returns:
+            bool: True if the cell is shared, or was free at the start of the
+                tick and has not been entered since.
+        """
+        return cell in self._shared or (cell not in self._occupied and cell not in self._claimed)
+
+    def _move(self, number, target):
+        """
+        Move a robot one cell, reserving the cell for the rest of the tick.
+
+        Args:
+            number (int): Index of the robot in the fleet.
+            target (tuple): Coordinates (row, col) of the cell entered.
+        """
+        if target not in self._shared:
+            self._claimed.add(target)
+        self._moved.add(number)
+        self.robots[number].position = target
+
+    def _reroute(self, number):
+        """
+        Replan a blocked robot's route around the corridor cells other robots occupy.
+
+        Only detours of a few steps are worth taking, which keeps the search
+        small, and only a few detours per job, so two robots cannot keep
+        dodging each other round a loop.
+
+        Args:
+            number (int): Index of the robot in the fleet.
+
+        Returns:
+            bool: True if a route around the other robots was found.
+        """
+        if self._detours[number] >= MAX_DETOURS:
+            return False
+        robot = self.robots[number]
+        max_depth = len(self._paths[number]) - 1 - self._steps[number] + 2 * self.patience
+        path = self.environment.find_path_avoiding(
+            robot.position, robot.inventory[0].destination, self._occupied,
+            max_depth=max_depth, max_expansions=4 * max_depth, strategy=self.strategy or 'astar')
+        if path is None or len(path) < 2:
+            return False
+
+        self._paths[number] = path
+        self._steps[number] = 0
+        self._waited[number] = 0
+        self._detours[number] += 1
+        return True
+
+    def _approach(self, number):
+        """
+        Note how close a robot is to its destination, counting a new best as progress.
+
+        Args:
+            number (int): Index of the robot in the fleet.
+        """
+        robot = self.robots[number]
+        remaining = self.environment.route_index.distance(robot.position, robot.inventory[0].destination)
+        if remaining is None:
+            remaining = len(self._paths[number]) - 1 - self._steps[number]
+        if self._closest[number] is None or remaining < self._closest[number]:
+            self._closest[number] = remaining
+            self._progressed = self.ticks
+
+    def _break_stall(self):
+        """
+        Get a stalled fleet moving again.
+
+        Reactive robots hand their jobs to a cooperative planner, which plans
+        their routes around each other from then on. If the fleet already
+        plans cooperatively, every busy robot gives up its job.
+        """
+        self.stalls += 1
+        self._progressed = self.ticks
+        if self.planner is not None:
+            for number in range(len(self.robots)):
+                if self._paths[number] is not None:
+                    self._give_up(number)
+            return
+
+        self.planner = CooperativePlanner(self.environment, self._shared, self.window)
+        for number, robot in enumerate(self.robots):
+            if self._paths[number] is not None:
+                self.planner.reservations.reserve(number, [robot.position], self.ticks)
+                self._progress[number] = 0
+                self._planned[number] = None
+
+    def _make_way(self, number, keep_clear, priority, depth):
+        """
+        Move a robot out of the way of a robot of higher priority.
+
+        The robot steps to a free neighbouring cell, preferably one off the
+        route it has to clear, and replans if it has a job. If it is boxed in,
+        it asks robots of lower priority around it to make way in turn, up to
+        a depth.
+
+        Args:
+            number (int): Index of the robot to move.
+            keep_clear (set): Coordinates (row, col) of the route to clear.
+            priority (tuple): Priority of the robot asking for way.
+            depth (int): How many robots further away may be asked to make way.
+
+        Returns:
+            bool: True if a robot moved.
+        """
+        if number in self._moved:
+            return False
+
+        robot = self.robots[number]
+        row, col = robot.position
+        free = []
+        crowding = []
+        for move in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
+            cell = (row + move[0], col + move[1])
+            if not self.environment.is_valid_position(*cell):
+                continue
+            if self._is_free(cell):
+                free.append(cell)
+            elif cell in self._occupied and self._priority(self._occupied[cell]) > priority:
+                crowding.append(self._occupied[cell])
+
+        choices = [cell for cell in free if cell not in keep_clear] or free
+        if choices:
+            self._move(number, choices[0])
+            self._progress[number] = 0.0
+            self._waited[number] = 0
+            if self._paths[number] is None:
+                return True
+            path = self.environment.find_path(choices[0], robot.inventory[0].destination, strategy=self.strategy)
+            if path is None:
+                self._give_up(number)
+            else:
+                self._paths[number] = path
+                self._steps[number] = 0
+                if len(path) == 1:
+                    self._finish(number)
+            return True
+
+        if depth > 0:
+            keep_clear = keep_clear | {robot.position}
+            for other in crowding:
+                if other != number and self._make_way(other, keep_clear, priority, depth - 1):
+                    return True
+        return False
+
+    def _finish(self, number):
+        """
+        Record a completed delivery and make the robot idle.
+
+        Args:
+            number (int): Index of the robot in the fleet.
+        """
+        self.delivered += 1
+        self._progressed = self.ticks
+        if self._jobs[number] is not None:
+            self.scheduler.complete(self._jobs[number], self.now)
+        if self.registry is not None:
+            self.registry.complete(self.robots[number].inventory[0], self.now, number)
+        self._clear(number)
+
+    def _give_up(self, number):
+        """
+        Record a job whose destination the robot can no longer reach and make the robot idle.
+
+        Args:
+            number (int): Index of the robot in the fleet.
+        """
+        self._drop(self.robots[number].inventory[0], self._jobs[number])
+        self._clear(number)
+
+    def _drop(self, package, job=None):
+        """
+        Record a package that will not be delivered.
+
+        Every failed job passes through here, so it is counted once and its
+        package leaves the registry.
+
+        Args:
+            package (Package): The package.
+            job (Job, optional): The scheduler's job for the package.
+        """
+        self.failed += 1
+        self._progressed = self.ticks
+        if job is not None:
+            self.scheduler.fail(job)
+        if self.registry is not None:
+            self.registry.discard(package)
+
+    def _clear(self, number):
+        """
+        Drop a robot's package and route.
+
+        Args:
+            number (int): Index of the robot in the fleet.
+        """
+        self.robots[number].inventory.clear()
+        self._paths[number] = None
+        self._jobs[number] = None
+        if self.planner is not None:
+            self.planner.reservations.release(number)
+            self._stuck[number] = None
+
+    def report(self):
+        """
+        Summarise the simulation so far.
+
+        Returns:
+            dict: Robot count, ticks, simulated seconds, deliveries, failed
+                jobs, blocked ticks, deliveries per simulated hour, wall-clock
+                seconds and ticks per wall-clock second, with the scheduler's
+                SLA report when a scheduler is used.
+        """
+        simulated_seconds = self.ticks * self.tick_seconds
+        hours = simulated_seconds / 3600
+        report = {
+            'robots': len(self.robots),
+            'ticks': self.ticks,
+            'simulated_seconds': simulated_seconds,
+            'deliveries': self.delivered,
+            'failed': self.failed,
+            'blocked_ticks': self.blocked_ticks,
+            'deliveries_per_hour': self.delivered / hours if hours else 0.0,
+            'wall_seconds': self.wall_seconds,
+            'ticks_per_second': self.ticks / self.wall_seconds if self.wall_seconds else 0.0
+        }
+        if self.scheduler is not None:
+            report['sla'] = self.scheduler.report()
+        return report
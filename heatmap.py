@@ -0,0 +1,183 @@
+"""
+heatmap.py
+
+This module computes the distance from every cell of a map to every
+department at once, for station layout studies and robot placement.
+
+Features:
+- A vectorised wavefront over NumPy arrays that advances the frontiers of
+  all departments together, one step per iteration, instead of visiting
+  cells one at a time in Python.
+- A pure-Python fallback built on the BFS distance fields of the route
+  index, used when NumPy is not installed.
+- Export of the distances, per-department reachability and the total
+  distance to all departments as plain lists of rows, whichever backend
+  computed them, or as a NumPy array.
+
+Classes:
+    Heatmap: Distances from every cell to every department of a map.
+
+Functions:
+    wavefront: Computes distance fields from several groups of source cells with NumPy.
+"""
+
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def wavefront(walkable, width, sources):
+    """
+    Compute distance fields from several groups of source cells with NumPy.
+
+    The frontiers of all groups are kept as one array of flat indices into a
+    stack of grids, one grid per group, so every step of the wavefront costs
+    a handful of array operations whatever the number of groups.
+
+    Args:
+        walkable (numpy.ndarray): Flat boolean mask of a padded grid.
+        width (int): Row stride of the padded grid.
+        sources (list): Flat indices of the source cells of each group.
+            Sources that are not walkable are skipped.
+
+    Returns:
+        numpy.ndarray: A (groups, cells) array of int32 steps to the nearest
+            source of each group, -1 for cells that cannot reach it.
+    """
+    size = len(walkable)
+    distance = np.full(len(sources) * size, -1, dtype=np.int32)
+    unvisited = np.tile(walkable, len(sources))
+    slot = np.zeros(len(sources) * size, dtype=np.int32)
+
+    frontier = np.concatenate([
+        np.asarray(sorted(cells), dtype=np.int64) + group * size for group, cells in enumerate(sources)
+    ] or [np.zeros(0, dtype=np.int64)])
+    frontier = frontier[unvisited[frontier]]
+    unvisited[frontier] = False
+
+    # The padding keeps every neighbour of a walkable cell within the same grid of the stack
+    step = 0
+    while frontier.size:
+        distance[frontier] = step
+        step += 1
+        neighbours = np.concatenate((frontier + 1, frontier + width, frontier - 1, frontier - width))
+        neighbours = neighbours[unvisited[neighbours]]
+        unvisited[neighbours] = False
+        # A cell reached from several frontier cells keeps only the last of its
+        # copies, which drops duplicates without sorting the frontier
+        slots = np.arange(neighbours.size, dtype=np.int32)
+        slot[neighbours] = slots
+        frontier = neighbours[slot[neighbours] == slots]
+
+    return distance.reshape(len(sources), size)
+
+
+class Heatmap:
+    """
+    Distances from every cell to every department of a map.
+
+    Attributes:
+        departments (list): Department letters, in the order of the fields.
+        rows (int): Number of rows of the map.
+        cols (int): Number of columns of the map.
+    """
+
+    def __init__(self, departments, fields, rows, cols, base=0):
+        """
+        Wrap the distance fields of a map.
+
+        Args:
+            departments (list): Department letters, in the order of the fields.
+            fields (list): Flat distance field of each department over the
+                padded grid, as a NumPy array or an array of ints, -1 for
+                cells that cannot reach the department.
+            rows (int): Number of rows of the map.
+            cols (int): Number of columns of the map.
+            base (int): Offset of the padded grid within the fields.
+        """
+        self.departments = list(departments)
+        self.rows = rows
+        self.cols = cols
+        self._base = base
+        self._fields = dict(zip(self.departments, fields))
+
+    def _rows(self, field):
+        """
+        Cut a padded flat field into the rows of the map.
+
+        Args:
+            field (sequence): Flat field over the padded grid.
+
+        Returns:
+            list: One list of values per row.
+        """
+        width = self.cols + 2
+        first = self._base + width + 1
+        values = field[first:first + self.rows * width].tolist()
+        return [values[start:start + self.cols] for start in range(0, self.rows * width, width)]
+
+    def distances(self, department):
+        """
+        Get the steps from every cell to a department.
+
+        Args:
+            department (str): Department name or letter.
+
+        Returns:
+            list: One list of steps per row, -1 for cells that are obstacles or
+                cannot reach the department.
+
+        Raises:
+            KeyError: If the department is not part of the heatmap.
+        """
+        return self._rows(self._fields[department[:1].upper()])
+
+    def reachable(self, department):
+        """
+        Get the cells from which a department can be reached.
+
+        Args:
+            department (str): Department name or letter.
+
+        Returns:
+            list: One list of booleans per row.
+
+        Raises:
+            KeyError: If the department is not part of the heatmap.
+        """
+        return [[steps >= 0 for steps in line] for line in self.distances(department)]
+
+    def total_distance(self):
+        """
+        Get the sum of the steps from every cell to all departments.
+
+        Cells with a low total are good places to station a robot.
+
+        Returns:
+            list: One list of totals per row, -1 for cells that cannot reach
+                every department.
+        """
+        totals = [[0] * self.cols for _ in range(self.rows)]
+        for department in self.departments:
+            for total, line in zip(totals, self.distances(department)):
+                for col, steps in enumerate(line):
+                    total[col] = -1 if steps < 0 or total[col] < 0 else total[col] + steps
+        return totals
+
+    def as_array(self):
+        """
+        Get the distances as a NumPy array.
+
+        Returns:
+            numpy.ndarray: A (departments, rows, cols) array of int32 steps, -1
+                for cells that cannot reach the department.
+
+        Raises:
+            ImportError: If NumPy is not installed.
+        """
+        if np is None:
+            raise ImportError("NumPy is required for Heatmap.as_array()")
+        return np.array([self.distances(department) for department in self.departments],
+                        dtype=np.int32).reshape(len(self.departments), self.rows, self.cols)
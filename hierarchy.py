@@ -0,0 +1,389 @@
+"""
+hierarchy.py
+
+This module defines the ClusterGraph class, which answers route queries on
+very large maps with Hierarchical Path-Finding A* (HPA*, Botea, Müller and
+Schaeffer, 2004).
+
+Features:
+- Splits the map into square clusters and places entrances on the borders
+  between neighbouring clusters: one in the middle of each short opening,
+  one at each end of a long one.
+- Connects the entrances of a cluster by their distances within it, and
+  searches the resulting abstract graph instead of the grid.
+- Refines only the chosen segments into cell-by-cell routes, each within a
+  single cluster.
+- Builds entrances and in-cluster distances lazily, per cluster, the first
+  time a query needs them, so that setting up a map with millions of cells
+  costs nothing up front.
+- Updates incrementally: a changed cell only discards the abstract graph of
+  its own cluster and of the clusters sharing a border with it.
+
+Routes found through the abstract graph are close to, but not always
+exactly, the shortest.
+
+Classes:
+    ClusterGraph: Abstract graph of cluster entrances over a grid.
+"""
+
+
+import heapq
+from collections import deque
+
+
+DEFAULT_CLUSTER_SIZE = 16
+
+# Openings at least this wide get an entrance at each end instead of one in the middle
+WIDE_OPENING = 6
+
+START = -1
+GOAL = -2
+
+
+class ClusterGraph:
+    """
+    Abstract graph of cluster entrances over a grid.
+
+    Attributes:
+        cluster_size (int): Number of rows and columns of a cluster.
+        expanded (int): Number of abstract nodes expanded by the most recent query.
+    """
+
+    def __init__(self, search, cluster_size=DEFAULT_CLUSTER_SIZE):
+        """
+        Set up the graph for a map. Clusters are built on first use.
+
+        Args:
+            search (GridSearch): Search engine over the map's walkable mask.
+            cluster_size (int): Number of rows and columns of a cluster.
+
+        Raises:
+            ValueError: If the cluster size is smaller than 2.
+        """
+        if cluster_size < 2:
+            raise ValueError("Clusters need at least two rows and columns")
+        self.cluster_size = cluster_size
+        self.expanded = 0
+        self._search = search
+        self._walkable = search._walkable
+        self._width = search.width
+        self._cluster_rows = -(-search.rows // cluster_size)
+        self._cluster_cols = -(-search.cols // cluster_size)
+        self._borders = {}
+        self._graphs = {}
+
+    def cluster_of(self, cell):
+        """
+        Get the cluster a cell belongs to.
+
+        Args:
+            cell (int): Flat index of the cell.
+
+        Returns:
+            tuple: Cluster coordinates (cluster row, cluster col).
+        """
+        row, col = self._search.position(cell)
+        return row // self.cluster_size, col // self.cluster_size
+
+    def _bounds(self, cluster):
+        """
+        Get the cells a cluster spans.
+
+        Args:
+            cluster (tuple): Cluster coordinates.
+
+        Returns:
+            tuple: First row, end row, first column and end column, ends exclusive.
+        """
+        size = self.cluster_size
+        row, col = cluster
+        return (row * size, min((row + 1) * size, self._search.rows),
+                col * size, min((col + 1) * size, self._search.cols))
+
+    def _border(self, cluster, direction):
+        """
+        Get the entrances on the east or south border of a cluster, building them on first use.
+
+        Args:
+            cluster (tuple): Cluster coordinates.
+            direction (str): 'E' for the border with the cluster to the east,
+                'S' for the border with the cluster to the south.
+
+        Returns:
+            list: (inside, outside) pairs of flat indices, one per entrance, or
+                an empty list at the edge of the map.
+        """
+        key = (cluster, direction)
+        entrances = self._borders.get(key)
+        if entrances is not None:
+            return entrances
+
+        first_row, end_row, first_col, end_col = self._bounds(cluster)
+        index = self._search.index
+        if direction == 'E':
+            pairs = [] if end_col >= self._search.cols else [
+                (index((row, end_col - 1)), index((row, end_col))) for row in range(first_row, end_row)
+            ]
+        else:
+            pairs = [] if end_row >= self._search.rows else [
+                (index((end_row - 1, col)), index((end_row, col))) for col in range(first_col, end_col)
+            ]
+
+        walkable = self._walkable
+        entrances = []
+        run = []
+        for inside, outside in pairs + [(None, None)]:
+            if inside is not None and walkable[inside] and walkable[outside]:
+                run.append((inside, outside))
+                continue
+            if len(run) >= WIDE_OPENING:
+                entrances.extend((run[0], run[-1]))
+            elif run:
+                entrances.append(run[len(run) // 2])
+            run = []
+
+        self._borders[key] = entrances
+        return entrances
+
+    def _graph(self, cluster):
+        """
+        Get the abstract graph of a cluster, building it on first use.
+
+        Args:
+            cluster (tuple): Cluster coordinates.
+
+        Returns:
+            dict: Each entrance cell of the cluster mapped to a list of
+                (neighbour, steps) pairs, covering the other entrances of the
+                cluster and the entrance cell across the border.
+        """
+        graph = self._graphs.get(cluster)
+        if graph is not None:
+            return graph
+
+        row, col = cluster
+        links = {}
+        for inside, outside in self._border(cluster, 'E') + self._border(cluster, 'S'):
+            links.setdefault(inside, []).append((outside, 1))
+        if col > 0:
+            for outside, inside in self._border((row, col - 1), 'E'):
+                links.setdefault(inside, []).append((outside, 1))
+        if row > 0:
+            for outside, inside in self._border((row - 1, col), 'S'):
+                links.setdefault(inside, []).append((outside, 1))
+
+        for node in links:
+            distance, _ = self._local_search([node], cluster)
+            links[node].extend(
+                (other, distance[other]) for other in links if other != node and other in distance
+            )
+
+        self._graphs[cluster] = links
+        return links
+
+    def _local_search(self, sources, cluster, targets=None):
+        """
+        Run a BFS that stays within one cluster.
+
+        Args:
+            sources (iterable): Flat indices of the source cells.
+            cluster (tuple): Cluster the search stays within.
+            targets (set, optional): Flat indices at which to stop the search.
+
+        Returns:
+            tuple: Steps from the nearest source to each cell reached, and the
+                parent of each cell reached.
+        """
+        first_row, end_row, first_col, end_col = self._bounds(cluster)
+        base = self._search.base
+        width = self._width
+        walkable = self._walkable
+
+        distance = {}
+        parent = {}
+        queue = deque()
+        for source in sources:
+            distance[source] = 0
+            parent[source] = -1
+            queue.append(source)
+            if targets is not None and source in targets:
+                return distance, parent
+
+        while queue:
+            current = queue.popleft()
+            step = distance[current] + 1
+            for neighbour in (current + 1, current + width, current - 1, current - width):
+                if neighbour in distance or not walkable[neighbour]:
+                    continue
+                row, col = divmod(neighbour - base, width)
+                if not (first_row < row <= end_row and first_col < col <= end_col):
+                    continue
+                distance[neighbour] = step
+                parent[neighbour] = current
+                if targets is not None and neighbour in targets:
+                    return distance, parent
+                queue.append(neighbour)
+
+        return distance, parent
+
+    def _local_path(self, source, cluster, targets):
+        """
+        Find the shortest path within one cluster from a cell to the nearest target.
+
+        Args:
+            source (int): Flat index of the first cell.
+            cluster (tuple): Cluster the path stays within.
+            targets (set): Flat indices of the target cells.
+
+        Returns:
+            list: Flat indices of the path, or None if no target can be reached.
+        """
+        _, parent = self._local_search([source], cluster, targets)
+        end = next((cell for cell in targets if cell in parent), None)
+        if end is None:
+            return None
+        path = []
+        while end >= 0:
+            path.append(end)
+            end = parent[end]
+        path.reverse()
+        return path
+
+    def invalidate(self, cell):
+        """
+        Discard the parts of the abstract graph a changed cell may affect.
+
+        These are the entrances on the borders of the cell's cluster and the
+        graphs of that cluster and of the four clusters sharing a border with it.
+
+        Args:
+            cell (int): Flat index of the changed cell.
+        """
+        row, col = self.cluster_of(cell)
+        for key in (((row, col), 'E'), ((row, col), 'S'), ((row, col - 1), 'E'), ((row - 1, col), 'S')):
+            self._borders.pop(key, None)
+        for cluster in ((row, col), (row, col + 1), (row + 1, col), (row, col - 1), (row - 1, col)):
+            self._graphs.pop(cluster, None)
+
+    def find_path(self, start, goals):
+        """
+        Find a route from a start cell to the nearest goal cell through the abstract graph.
+
+        Args:
+            start (int): Flat index of the start cell.
+            goals (set): Flat indices of the goal cells.
+
+        Returns:
+            list: Flat indices of the path, or None if no path exists.
+        """
+        self.expanded = 0
+        walkable = self._walkable
+        goals = {goal for goal in goals if walkable[goal]}
+        if not walkable[start] or not goals:
+            return None
+        if start in goals:
+            return [start]
+
+        # Temporary links from the start to the entrances of its cluster and,
+        # per goal cluster, from each entrance to the nearest goal within it
+        start_cluster = self.cluster_of(start)
+        distance, _ = self._local_search([start], start_cluster)
+        start_links = [(node, distance[node]) for node in self._graph(start_cluster) if node in distance]
+
+        goals_by_cluster = {}
+        for goal in goals:
+            goals_by_cluster.setdefault(self.cluster_of(goal), set()).add(goal)
+        goal_links = {}
+        for cluster, cluster_goals in goals_by_cluster.items():
+            distance, _ = self._local_search(cluster_goals, cluster)
+            for node in self._graph(cluster):
+                if node in distance:
+                    goal_links[node] = distance[node]
+            if cluster == start_cluster and start in distance:
+                start_links.append((GOAL, distance[start]))
+
+        route = self._abstract_search(start_links, goal_links, goals)
+        if route is None:
+            return None
+        return self._refine(start, route, goals_by_cluster)
+
+    def _abstract_search(self, start_links, goal_links, goals):
+        """
+        Search the abstract graph from the start to the goal with A*.
+
+        Args:
+            start_links (list): (node, steps) pairs leaving the start.
+            goal_links (dict): Entrance mapped to the steps from it to the nearest goal in its cluster.
+            goals (set): Flat indices of the goal cells, for the heuristic.
+
+        Returns:
+            list: Abstract nodes from the first entrance to GOAL, or None if the
+                goal cannot be reached.
+        """
+        manhattan = self._search._heuristic(goals)
+        if manhattan is None:
+            def heuristic(node):
+                return 0
+        else:
+            def heuristic(node):
+                return 0 if node == GOAL else manhattan(node)
+
+        # Ties on the estimate go to the node nearest the goal, which keeps A* from
+        # spreading across the many equally good entrances of open maps
+        cost = {START: 0}
+        parent = {START: None}
+        closed = set()
+        heap = [(0, 0, START)]
+        while heap:
+            _, _, node = heapq.heappop(heap)
+            if node in closed:
+                continue
+            closed.add(node)
+            if node == GOAL:
+                route = []
+                while node != START:
+                    route.append(node)
+                    node = parent[node]
+                route.reverse()
+                return route
+            self.expanded += 1
+
+            if node == START:
+                links = start_links
+            else:
+                links = self._graph(self.cluster_of(node))[node]
+                if node in goal_links:
+                    links = links + [(GOAL, goal_links[node])]
+            for neighbour, steps in links:
+                step = cost[node] + steps
+                if neighbour not in closed and step < cost.get(neighbour, step + 1):
+                    cost[neighbour] = step
+                    parent[neighbour] = node
+                    estimate = heuristic(neighbour)
+                    heapq.heappush(heap, (step + estimate, estimate, neighbour))
+        return None
+
+    def _refine(self, start, route, goals_by_cluster):
+        """
+        Turn an abstract route into a cell-by-cell path.
+
+        Args:
+            start (int): Flat index of the start cell.
+            route (list): Abstract nodes from the first entrance to GOAL.
+            goals_by_cluster (dict): Cluster mapped to the goal cells within it.
+
+        Returns:
+            list: Flat indices of the path.
+        """
+        path = [start]
+        for node in route:
+            current = path[-1]
+            cluster = self.cluster_of(current)
+            if node == GOAL:
+                segment = self._local_path(current, cluster, goals_by_cluster[cluster])
+            elif self.cluster_of(node) != cluster:
+                segment = [current, node]
+            else:
+                segment = self._local_path(current, cluster, {node})
+            path.extend(segment[1:])
+        return path
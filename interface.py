@@ -6,18 +6,46 @@ robot system via a command-line interface (CLI).
 
 Features:
 - Displays boot messages, menus and maps.
+- Animates the map incrementally, redrawing only the cells that changed.
 - Handles user input for robot operations.
 - Manages a delivery menu for department selection.
 - Displays error messages for invalid inputs.
 - Supports shutdown with user confirmation.
+- An asyncio variant that reads its input from a queue of lines, fed from
+  the terminal or any other source, so prompts never block the event loop.
 
 Classes:
-    Environment: Encapsulates the map and provides utilities for robot navigation.
+    Interface: Manages user interactions through the command line.
+    AsyncInterface: Interface whose prompts are awaited instead of blocking.
 """
 
 
+import asyncio
 import sys
-from utils import clear_console
+from renderer import MapRenderer
+
+
+MAP_HEADER = (
+    "=" * 50,
+    "\033[1;37;42m             Moon Base Luna-9 Map                 \033[0m",
+    "=" * 50
+)
+MAP_FOOTER = ("=" * 50,)
+
+DELIVERY_PROMPT = "\033[1;33mPlease select a department (1-7): \033[0m"
+INVALID_DEPARTMENT = "\033[1;31mInvalid input! Please enter a number between 1 and 7.\033[0m"
+UNKNOWN_DEPARTMENT = "\033[1;31mInvalid choice! Please select a valid department.\033[0m"
+SHUTDOWN_PROMPT = "\033[1;31mAre you sure you want to shut down? (y/n): \033[0m"
+
+DELIVERY_DEPARTMENTS = {
+    1: "Engineering",
+    2: "Command",
+    3: "Medical Bay",
+    4: "Airlock",
+    5: "Hydroponics",
+    6: "Cargo",
+    7: "Docking"
+}
 
 
 class Interface:
@@ -37,6 +65,7 @@ class Interface:
             2: "Delivery",
             3: "Shutdown"
         }
+        self.renderer = MapRenderer()
 
     @property
     def menu_options(self):
@@ -57,7 +86,19 @@ class Interface:
             model (str): Model of the robot.
             manufacturer (str): Manufacturer of the robot.
         """
-        clear_console()
+        self._print_boot_screen(name, model, manufacturer)
+        input("Press Enter to continue to the main menu...")
+
+    def _print_boot_screen(self, name, model, manufacturer):
+        """
+        Print the boot screen with robot information.
+
+        Args:
+            name (str): Name of the robot.
+            model (str): Model of the robot.
+            manufacturer (str): Manufacturer of the robot.
+        """
+        self.renderer.clear()
         print("=" * 50)
         print("\033[1;37;44m                     Welcome                      \033[0m")
         print("=" * 50)
@@ -72,7 +113,6 @@ class Interface:
         print("\033[1;35m  A Highly Intelligent Automated Delivery System    \033[0m")
         print("\n\033[1;33m  Booting up...\033[0m")
         print("=" * 50)
-        input("Press Enter to continue to the main menu...")
 
     def display_menu(self, name):
         """
@@ -85,25 +125,67 @@ class Interface:
             int: User's menu choice.
         """
         while True:
-            clear_console()
-            print("=" * 50)
-            print(f"\033[1;37;42m           {name} - Main Control Panel            \033[0m")
-            print("=" * 50)
+            self._print_menu(name)
+            choice = self._parse_choice(input(self._menu_prompt()))
+            if choice in self.menu_options:
+                return choice
+
+            self.display_invalid_choice_message()
+
+    def _print_menu(self, name):
+        """
+        Print the main menu.
 
-            for option, description in self.menu_options.items():
-                print(f"\033[34m{option}. {description}\033[0m")
+        Args:
+            name (str): Name of the robot.
+        """
+        self.renderer.clear()
+        print("=" * 50)
+        print(f"\033[1;37;42m           {name} - Main Control Panel            \033[0m")
+        print("=" * 50)
 
-            print("=" * 50)
+        for option, description in self.menu_options.items():
+            print(f"\033[34m{option}. {description}\033[0m")
 
-            try:
-                prompt = f"\033[1;33mPlease select an option (1-{len(self.menu_options)}): \033[0m"
-                choice = int(input(prompt))
-                if choice in self.menu_options:
-                    return choice
+        print("=" * 50)
+
+    def _menu_prompt(self):
+        """
+        Get the prompt for a main menu choice.
 
-                self.display_invalid_choice_message()
-            except ValueError:
-                self.display_invalid_choice_message()
+        Returns:
+            str: The prompt text.
+        """
+        return f"\033[1;33mPlease select an option (1-{len(self.menu_options)}): \033[0m"
+
+    @staticmethod
+    def _parse_choice(text):
+        """
+        Parse a numbered menu choice.
+
+        Args:
+            text (str): Text entered by the user.
+
+        Returns:
+            int: The number entered, or None if the text is not a number.
+        """
+        try:
+            return int(text)
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def _invalid_department_text(choice):
+        """
+        Get the message shown for an invalid delivery menu choice.
+
+        Args:
+            choice (int): The number entered, or None if the text was not a number.
+
+        Returns:
+            str: The message text.
+        """
+        return INVALID_DEPARTMENT if choice is None else UNKNOWN_DEPARTMENT
 
     def display_map(self, map_str):
         """
@@ -112,12 +194,22 @@ class Interface:
         Args:
             map_str (str): String representation of the map.
         """
-        clear_console()
-        print("=" * 50)
-        print("\033[1;37;42m             Moon Base Luna-9 Map                 \033[0m")
-        print("=" * 50)
+        self.renderer.clear()
+        print("\n".join(MAP_HEADER))
         print(map_str)
-        print("=" * 50)
+        print("\n".join(MAP_FOOTER))
+
+    def display_frame(self, frame):
+        """
+        Display a frame of the map animation.
+
+        Only the cells that changed since the previous frame are redrawn, unless
+        the screen was cleared in between.
+
+        Args:
+            frame (list): Rows of the map, each a list of cell text.
+        """
+        self.renderer.draw(frame, MAP_HEADER, MAP_FOOTER)
 
     def display_delivery_menu(self):
         """
@@ -126,48 +218,48 @@ class Interface:
         Returns:
             str: Selected department name.
         """
-        departments = {
-            1: "Engineering",
-            2: "Command",
-            3: "Medical Bay",
-            4: "Airlock",
-            5: "Hydroponics",
-            6: "Cargo",
-            7: "Docking"
-        }
-
         while True:
-            clear_console()
-            print("=" * 50)
-            print("\033[1;37;42m                   Delivery Menu                  \033[0m")
-            print("=" * 50)
-            print("\033[1;33mSelect a department for the delivery job:\033[0m")
+            self._print_delivery_menu()
+            choice = self._parse_choice(input(DELIVERY_PROMPT))
+            if choice in DELIVERY_DEPARTMENTS:
+                return DELIVERY_DEPARTMENTS[choice]
 
-            for num, dept_name in departments.items():
-                print(f"\033[34m{num}. {dept_name}\033[0m")
+            print(self._invalid_department_text(choice))
+            input("Press Enter to try again...")
 
-            print("=" * 50)
+    def _print_delivery_menu(self):
+        """
+        Print the delivery menu.
+        """
+        self.renderer.clear()
+        print("=" * 50)
+        print("\033[1;37;42m                   Delivery Menu                  \033[0m")
+        print("=" * 50)
+        print("\033[1;33mSelect a department for the delivery job:\033[0m")
 
-            try:
-                choice = int(input("\033[1;33mPlease select a department (1-7): \033[0m"))
-                if choice in departments:
-                    return departments[choice]
+        for num, dept_name in DELIVERY_DEPARTMENTS.items():
+            print(f"\033[34m{num}. {dept_name}\033[0m")
 
-                print("\033[1;31mInvalid choice! Please select a valid department.\033[0m")
-                input("Press Enter to try again...")
-            except ValueError:
-                print("\033[1;31mInvalid input! Please enter a number between 1 and 7.\033[0m")
-                input("Press Enter to try again...")
+        print("=" * 50)
 
     def display_invalid_choice_message(self):
         """
         Display an invalid choice message to the user.
         """
-        print(
+        print(self._invalid_choice_text())
+        input("Press Enter to try again...")
+
+    def _invalid_choice_text(self):
+        """
+        Get the message shown for an invalid main menu choice.
+
+        Returns:
+            str: The message text.
+        """
+        return (
             f"\033[1;31mInvalid choice! Please enter a number between "
             f"1 and {len(self.menu_options)}.\033[0m"
         )
-        input("Press Enter to try again...")
 
     def shutdown(self):
         """
@@ -175,10 +267,136 @@ class Interface:
 
         If the user confirms, the program exits. Otherwise, returns to the menu.
         """
-        confirmation = input("\033[1;31mAre you sure you want to shut down? (y/n): \033[0m").lower()
-        if confirmation == 'y':
-            print("\033[1;31mShutting down... Goodnight\033[0m")
+        if self._confirm_shutdown(input(SHUTDOWN_PROMPT)):
             sys.exit()
-        else:
-            print("\033[1;32mShutdown cancelled. Returning to the main menu.\033[0m")
-            input("Press Enter to return to the menu...")
+        input("Press Enter to return to the menu...")
+
+    @staticmethod
+    def _confirm_shutdown(answer):
+        """
+        Report the outcome of a shutdown confirmation.
+
+        Args:
+            answer (str): Answer entered by the user.
+
+        Returns:
+            bool: True if the user confirmed the shutdown.
+        """
+        if answer.lower() == 'y':
+            print("\033[1;31mShutting down... Goodnight\033[0m")
+            return True
+        print("\033[1;32mShutdown cancelled. Returning to the main menu.\033[0m")
+        return False
+
+
+class AsyncInterface(Interface):
+    """
+    Interface whose prompts are awaited instead of blocking.
+
+    The awaited methods carry an `_async` suffix, so the interface still works
+    as a blocking `Interface` wherever one is expected. Answers to awaited
+    prompts are taken from a queue of lines. `read_terminal` feeds it from
+    standard input, but lines can be put on it from anywhere, such as a test
+    or a remote control session.
+
+    Attributes:
+        lines (asyncio.Queue): Lines of input not read yet.
+    """
+
+    def __init__(self):
+        """
+        Initialise the interface with an empty queue of input lines.
+        """
+        super().__init__()
+        self.lines = asyncio.Queue()
+
+    async def read_terminal(self):
+        """
+        Feed the lines typed on standard input to the queue until it closes.
+
+        The blocking reads run in a worker thread, so the event loop keeps
+        running while the terminal waits for the user.
+        """
+        while True:
+            line = await asyncio.to_thread(sys.stdin.readline)
+            if not line:
+                return
+            await self.lines.put(line.rstrip('\n'))
+
+    async def prompt(self, text):
+        """
+        Show a prompt and wait for the next line of input.
+
+        Args:
+            text (str): The prompt text.
+
+        Returns:
+            str: The line entered.
+        """
+        print(text, end='', flush=True)
+        return await self.lines.get()
+
+    async def boot_async(self, name, model, manufacturer):
+        """
+        Display the boot screen with robot information.
+
+        Args:
+            name (str): Name of the robot.
+            model (str): Model of the robot.
+            manufacturer (str): Manufacturer of the robot.
+        """
+        self._print_boot_screen(name, model, manufacturer)
+        await self.prompt("Press Enter to continue to the main menu...")
+
+    async def display_menu_async(self, name):
+        """
+        Display the main menu and wait for a valid choice.
+
+        Args:
+            name (str): Name of the robot.
+
+        Returns:
+            int: User's menu choice.
+        """
+        while True:
+            self._print_menu(name)
+            choice = self._parse_choice(await self.prompt(self._menu_prompt()))
+            if choice in self.menu_options:
+                return choice
+
+            await self.display_invalid_choice_message_async()
+
+    async def display_delivery_menu_async(self):
+        """
+        Display the delivery menu and wait for a valid choice.
+
+        Returns:
+            str: Selected department name.
+        """
+        while True:
+            self._print_delivery_menu()
+            choice = self._parse_choice(await self.prompt(DELIVERY_PROMPT))
+            if choice in DELIVERY_DEPARTMENTS:
+                return DELIVERY_DEPARTMENTS[choice]
+
+            print(self._invalid_department_text(choice))
+            await self.prompt("Press Enter to try again...")
+
+    async def display_invalid_choice_message_async(self):
+        """
+        Display an invalid choice message to the user.
+        """
+        print(self._invalid_choice_text())
+        await self.prompt("Press Enter to try again...")
+
+    async def shutdown_async(self):
+        """
+        Handle the shutdown sequence, confirming with the user.
+
+        Returns:
+            bool: True if the user confirmed the shutdown, False to return to the menu.
+        """
+        if self._confirm_shutdown(await self.prompt(SHUTDOWN_PROMPT)):
+            return True
+        await self.prompt("Press Enter to return to the menu...")
+        return False
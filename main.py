@@ -1,27 +1,357 @@
 """
 This script initialises and runs the humanoid robot simulation.
 
-The program creates an environment and a robot instance, then starts the
-robot's operations to perform tasks in the simulated environment.
+Run without arguments, the program creates an environment and a robot
+instance, then starts the robot's interactive session. The `run` command
+instead simulates a fleet of robots delivering a list of jobs without any
+prompts, and writes summary statistics of each run, so capacity sweeps can
+be run in batch.
 
-Classes:
-    Environment: Represents the environment the robot operates in.
-    Robot: Represents the humanoid robot and its operations.
+Usage:
+    python main.py
+    python main.py run --map station.map --jobs jobs.csv --robots 4 8 16 --engine astar
+    python main.py run --generate 500 --robots 8 --cooperative --format csv --output sweep.csv
+
+A job file holds one job per line as comma-separated values: the destination
+department, then optionally the package type and the tick the job is
+submitted on. Blank lines and lines starting with '#' are ignored.
 
 Functions:
-    main(): Initialises the environment and robot, and starts the robot's operations.
+    read_jobs: Reads delivery jobs from a job file.
+    generate_jobs: Generates seeded random delivery jobs.
+    simulate: Runs one headless fleet simulation and summarises it.
+    format_results: Formats the summaries of several runs as JSON, text or CSV.
+    main(): Starts the interactive robot, or runs headless simulations from the command line.
 """
 
 
-from environment import Environment
-from robot import Robot
+import argparse
+import csv
+import io
+import json
+import random
+import sys
+import time
+from clock import AcceleratedClock, RealTimeClock, SimulatedClock
+from cooperative import DEFAULT_WINDOW
+from environment import Environment, ROUTING_STRATEGIES
+from fleet import DEFAULT_STALL_TICKS, Fleet
+from registry import PackageRegistry
+from robot import PACKAGE_TYPES, Robot
+from scheduler import POLICIES, Scheduler
+from telemetry import Telemetry
+
+
+CLOCKS = ('simulated', 'accelerated', 'realtime')
+FORMATS = ('json', 'text', 'csv')
+DEFAULT_MAX_TICKS = 100000
+
+
+def read_jobs(path):
+    """
+    Read delivery jobs from a job file.
+
+    Args:
+        path (str): Path of the job file.
+
+    Returns:
+        list: (department, package type name or None, tick) triples, in file order.
+
+    Raises:
+        ValueError: If a line names an unknown package type or a negative tick.
+    """
+    jobs = []
+    with open(path, newline='') as job_file:
+        for number, row in enumerate(csv.reader(job_file), 1):
+            fields = [field.strip() for field in row]
+            if not fields or not fields[0] or fields[0].startswith('#'):
+                continue
+            package_type = fields[1] if len(fields) > 1 and fields[1] else None
+            if package_type is not None and package_type not in PACKAGE_TYPES:
+                raise ValueError(f"Unknown package type on line {number} of {path}: {package_type}")
+            tick = int(fields[2]) if len(fields) > 2 and fields[2] else 0
+            if tick < 0:
+                raise ValueError(f"Negative tick on line {number} of {path}")
+            jobs.append((fields[0], package_type, tick))
+    return jobs
+
+
+def generate_jobs(environment, count, seed=0):
+    """
+    Generate seeded random delivery jobs, all submitted on the first tick.
+
+    Args:
+        environment (Environment): Environment whose departments the jobs go to.
+        count (int): Number of jobs.
+        seed (int): Seed of the random choices.
+
+    Returns:
+        list: (department, package type name, tick) triples.
+    """
+    rng = random.Random(seed)
+    departments = environment.departments
+    names = sorted(PACKAGE_TYPES)
+    return [(rng.choice(departments), rng.choice(names), 0) for _ in range(count)]
+
+
+def _home(environment, home=None):
+    """
+    Choose the cell every robot starts from.
+
+    Args:
+        environment (Environment): The environment.
+        home (tuple, optional): Coordinates (row, col) asked for.
+
+    Returns:
+        tuple: The cell asked for, or the station's usual home cell if it is
+            walkable, or else the first walkable cell in reading order.
+
+    Raises:
+        ValueError: If the map has no walkable cell.
+    """
+    if home is not None:
+        return tuple(home)
+    if environment.is_valid_position(6, 0):
+        return (6, 0)
+    for row in range(environment.rows):
+        for col in range(environment.cols):
+            if environment.is_valid_position(row, col):
+                return (row, col)
+    raise ValueError("The map has no walkable cell")
+
+
+def _clock(name, speed):
+    """
+    Create the clock that paces a run.
+
+    Args:
+        name (str): 'simulated', 'accelerated' or 'realtime'.
+        speed (float): Speed multiplier of an accelerated clock.
+
+    Returns:
+        Clock: The clock.
+    """
+    if name == 'realtime':
+        return RealTimeClock()
+    if name == 'accelerated':
+        return AcceleratedClock(speed)
+    return SimulatedClock()
+
+
+def simulate(environment, jobs, robots, policy=None, cooperative=False, window=DEFAULT_WINDOW,
+             clock=None, tick_seconds=0.5, home=None, max_ticks=None, engine=None,
+             stall_ticks=DEFAULT_STALL_TICKS):
+    """
+    Run one headless fleet simulation and summarise it.
+
+    Jobs are submitted on their ticks, and the run ends once every job is
+    delivered or given up on, or at the tick limit.
 
+    Args:
+        environment (Environment): The environment. Its telemetry is replaced for the run.
+        jobs (list): (department, package type name or None, tick) triples.
+        robots (int): Number of robots.
+        policy (str, optional): Scheduling policy, 'deadline' or 'fifo'. Without
+            one, robots take jobs from a plain first-in, first-out queue.
+        cooperative (bool): Whether robots plan their routes around each other.
+        window (int): Ticks ahead each cooperative plan reserves.
+        clock (Clock, optional): Clock that paces the ticks. Defaults to a
+            discrete-event clock that never waits.
+        tick_seconds (float): Simulated seconds per tick.
+        home (tuple, optional): Coordinates (row, col) where every robot starts.
+        max_ticks (int, optional): Most ticks to simulate.
+        engine (str, optional): Search strategy every route is searched for
+            with. Without one, routes to departments come from the route index.
+        stall_ticks (int): Ticks without progress after which the fleet is stalled,
+            see `Fleet`.
 
-def main():
+    Returns:
+        dict: Robot count, routing engine, jobs, deliveries, failed jobs, jobs
+            left unfinished at the tick limit, ticks, stalls broken, makespan
+            and mean and worst latency in simulated seconds, route queries and
+            states expanded per query, wall-clock seconds, and the SLA hit
+            rate when a scheduler is used.
+    """
+    telemetry = environment.telemetry = Telemetry()
+    registry = PackageRegistry()
+    scheduler = Scheduler(environment, policy=policy) if policy else None
+    fleet = Fleet(environment, robots, tick_seconds=tick_seconds, home=_home(environment, home), clock=clock,
+                  scheduler=scheduler, cooperative=cooperative, window=window, registry=registry,
+                  stall_ticks=stall_ticks, strategy=engine)
+
+    pending = sorted(jobs, key=lambda job: job[2])
+    submitted = {}
+    started = time.perf_counter()
+    position = 0
+    while ((position < len(pending) or fleet.queued or fleet.busy)
+           and (max_ticks is None or fleet.ticks < max_ticks)):
+        while position < len(pending) and pending[position][2] <= fleet.ticks:
+            department, package_type, _ = pending[position]
+            package = Robot._create_package(department, package_type, registry)
+            submitted[package.package_id] = fleet.now
+            fleet.submit(package)
+            position += 1
+        fleet.tick()
+    wall_seconds = time.perf_counter() - started
+
+    history = registry.history
+    latencies = [delivered - submitted[package_id]
+                 for package_id, delivered in zip(history.column('package_id'), history.column('time'))]
+    metrics = telemetry.snapshot()
+    counters = metrics['counters']
+    expanded = [metrics['histograms'].get(name, {'count': 0, 'total': 0.0})
+                for name in ('find_path.expanded', 'plan.expanded')]
+    queries = (sum(counters.get(f'find_path.{source}', 0) for source in ('cache', 'index', 'search'))
+               + expanded[1]['count'])
+    environment.telemetry = None
+
+    summary = {
+        'robots': robots,
+        'engine': engine or 'index',
+        'planner': 'cooperative' if cooperative else 'reactive',
+        'jobs': len(jobs),
+        'deliveries': fleet.delivered,
+        'failed': fleet.failed,
+        'unfinished': len(jobs) - fleet.delivered - fleet.failed,
+        'ticks': fleet.ticks,
+        'stalls': fleet.stalls,
+        'makespan': max(history.column('time'), default=0.0) - min(submitted.values(), default=0.0),
+        'mean_latency': sum(latencies) / len(latencies) if latencies else 0.0,
+        'max_latency': max(latencies, default=0.0),
+        'queries': queries,
+        'expansions_per_query': sum(entry['total'] for entry in expanded) / queries if queries else 0.0,
+        'blocked_ticks': fleet.blocked_ticks,
+        'wall_seconds': wall_seconds
+    }
+    if scheduler is not None:
+        summary['sla_hit_rate'] = scheduler.report()['hit_rate']
+    return summary
+
+
+def format_results(results, output_format):
+    """
+    Format the summaries of several runs.
+
+    Args:
+        results (list): Summaries returned by `simulate`.
+        output_format (str): 'json' for a JSON list, 'text' for one block of
+            aligned lines per run, or 'csv' for a header and one row per run.
+
+    Returns:
+        str: The formatted summaries.
+    """
+    if output_format == 'json':
+        return json.dumps(results, indent=2)
+    if output_format == 'csv':
+        stream = io.StringIO()
+        fields = list(dict.fromkeys(key for result in results for key in result))
+        writer = csv.DictWriter(stream, fields, lineterminator='\n')
+        writer.writeheader()
+        writer.writerows(results)
+        return stream.getvalue().rstrip('\n')
+
+    blocks = []
+    for result in results:
+        width = max(len(key) for key in result)
+        blocks.append('\n'.join(
+            f"{key.replace('_', ' '):<{width}}  {value:.3f}" if isinstance(value, float)
+            else f"{key.replace('_', ' '):<{width}}  {value}"
+            for key, value in result.items()))
+    return '\n\n'.join(blocks)
+
+
+def _parse_arguments(argv):
+    """
+    Parse the command line.
+
+    Args:
+        argv (list): Command-line arguments, without the program name.
+
+    Returns:
+        argparse.Namespace: The arguments. Its command is None for the interactive session.
+    """
+    parser = argparse.ArgumentParser(description="Run the Astrid delivery robot.")
+    commands = parser.add_subparsers(dest='command')
+    run = commands.add_parser('run', help="simulate a fleet delivering a list of jobs, without prompts")
+    run.add_argument('--map', help="station map file, plain text or binary; defaults to Luna-9")
+    jobs = run.add_mutually_exclusive_group(required=True)
+    jobs.add_argument('--jobs', help="job file: department[,package type[,tick]] per line")
+    jobs.add_argument('--generate', type=int, metavar='COUNT', help="generate this many random jobs instead")
+    run.add_argument('--seed', type=int, default=0, help="seed of the generated jobs")
+    run.add_argument('--robots', type=int, nargs='+', default=[4], help="fleet sizes to run, one run each")
+    run.add_argument('--engine', choices=ROUTING_STRATEGIES,
+                     help="search strategy every route goes through; by default the route index answers "
+                          "routes to departments")
+    run.add_argument('--cooperative', action='store_true', help="plan routes around the other robots")
+    run.add_argument('--window', type=int, default=DEFAULT_WINDOW, help="ticks ahead each cooperative plan reserves")
+    run.add_argument('--policy', choices=POLICIES, help="schedule jobs by deadline or in submission order")
+    run.add_argument('--clock', choices=CLOCKS, default='simulated', help="how ticks are paced")
+    run.add_argument('--speed', type=float, default=10.0, help="speed multiplier of the accelerated clock")
+    run.add_argument('--tick-seconds', type=float, default=0.5, help="simulated seconds per tick")
+    run.add_argument('--home', type=int, nargs=2, metavar=('ROW', 'COL'), help="cell every robot starts from")
+    run.add_argument('--max-ticks', type=int, default=DEFAULT_MAX_TICKS, help="most ticks to simulate per run")
+    run.add_argument('--stall-ticks', type=int, default=DEFAULT_STALL_TICKS,
+                     help="ticks without progress before a stalled fleet plans cooperatively or gives up")
+    run.add_argument('--format', choices=FORMATS, default='json', help="format of the summary")
+    run.add_argument('--output', help="file to write the summary to; defaults to standard output")
+    return parser.parse_args(argv)
+
+
+def _run(args):
+    """
+    Run a headless simulation for every fleet size asked for and write the summaries.
+
+    Args:
+        args (argparse.Namespace): Arguments of the run command.
+
+    Returns:
+        int: Exit status, 1 if any run left jobs unfinished and 0 otherwise.
+    """
+    strategy = args.engine or 'bfs'
+
+    def load():
+        if args.map:
+            return Environment.load(args.map, strategy=strategy)
+        return Environment(strategy=strategy)
+
+    environment = load()
+    jobs = read_jobs(args.jobs) if args.jobs else generate_jobs(environment, args.generate, args.seed)
+    results = []
+    for robots in args.robots:
+        # Every run starts from a freshly loaded map, so no run inherits another's cached routes
+        results.append(simulate(load() if results else environment, jobs, robots, args.policy,
+                                args.cooperative, args.window, _clock(args.clock, args.speed),
+                                args.tick_seconds, args.home, args.max_ticks, args.engine, args.stall_ticks))
+
+    text = format_results(results, args.format)
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            output_file.write(text + '\n')
+    else:
+        print(text)
+
+    unfinished = [result for result in results if result['unfinished']]
+    for result in unfinished:
+        print(f"{result['unfinished']} of {result['jobs']} jobs left unfinished with {result['robots']} robots "
+              f"after {result['ticks']} ticks", file=sys.stderr)
+    return 1 if unfinished else 0
+
+
+def main(argv=None):
     """
     Main function to initialise the environment and the robot
-    and start the robot's operations.
+    and start the robot's operations, or to run headless simulations.
+
+    Args:
+        argv (list, optional): Command-line arguments. Defaults to sys.argv.
+
+    Returns:
+        int: Exit status of a headless run.
     """
+    args = _parse_arguments(argv)
+    if args.command == 'run':
+        return _run(args)
+
     # Create the environment
     luna_9 = Environment()
 
@@ -35,7 +365,8 @@ def main():
 
     # Start the robot
     astrid.start_up()
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
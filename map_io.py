@@ -0,0 +1,239 @@
+"""
+map_io.py
+
+This module reads and writes station maps on disk, in two formats:
+
+- Plain text: one line per row of the map, one character per cell, where
+  'X' is an obstacle, '.' is open floor and any other character marks a
+  department. Blank lines and lines starting with '#' are ignored. An
+  optional terrain section follows a '---' line, holding one line per row
+  of whitespace-separated terrain costs.
+- Binary: a fixed 64-byte header followed by the raw cell bytes of the
+  padded grid, exactly as the Environment holds them in memory, and
+  optionally by a terrain layer of the same size holding one cost byte per
+  cell, and by a list of blocked cells. A binary map can therefore be
+  memory-mapped and used without parsing or copying.
+
+The binary header holds, in little-endian order, the magic bytes
+b'ASTRIDMP', the format version, a flags field, the number of rows and
+columns, and up to 32 cell codes used by departments on the map. Bit 0 of
+the flags marks a map with a terrain layer, and bit 1 a map with blocked
+cells. Blocked cells are obstacles in the grid; the list that follows the
+layers holds their count, then the offset of each within the padded grid and
+the cell code it had before it was blocked.
+
+Functions:
+    is_binary_map: Checks whether a file holds a binary station map.
+    read_text_map: Reads the rows and terrain costs of a plain-text station map.
+    read_binary_map: Opens a binary station map, memory-mapped by default.
+    decode_binary_map: Locates the layers of a binary station map held in memory.
+    encode_binary_map: Encodes a padded grid as the bytes of a binary station map.
+    write_binary_map: Writes a padded grid as a binary station map.
+"""
+
+
+import mmap
+import struct
+
+
+MAGIC = b'ASTRIDMP'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<8sHHII32s')
+HEADER_SIZE = 64
+MAX_DEPARTMENT_CODES = 32
+FLAG_TERRAIN = 1
+FLAG_BLOCKED = 2
+BLOCKED_COUNT = struct.Struct('<I')
+BLOCKED_CELL = struct.Struct('<IB')
+TERRAIN_SEPARATOR = b'---'
+
+
+def is_binary_map(path):
+    """
+    Check whether a file holds a binary station map.
+
+    Args:
+        path (str): Path of the map file.
+
+    Returns:
+        bool: True if the file starts with the binary map magic bytes.
+    """
+    with open(path, 'rb') as map_file:
+        return map_file.read(len(MAGIC)) == MAGIC
+
+
+def read_text_map(path):
+    """
+    Read the rows and terrain costs of a plain-text station map.
+
+    Args:
+        path (str): Path of the map file.
+
+    Returns:
+        tuple: One bytes object per row of the map, and one list of terrain
+            costs per row, or None if the file has no terrain section.
+
+    Raises:
+        ValueError: If a terrain cost is not a number.
+    """
+    with open(path, 'rb') as map_file:
+        lines = map_file.read().splitlines()
+    lines = [line.rstrip() for line in lines if line.strip() and not line.startswith(b'#')]
+    if TERRAIN_SEPARATOR not in lines:
+        return lines, None
+
+    separator = lines.index(TERRAIN_SEPARATOR)
+    try:
+        terrain = [[float(cost) for cost in line.split()] for line in lines[separator + 1:]]
+    except ValueError:
+        raise ValueError(f"{path} has a terrain cost that is not a number") from None
+    return lines[:separator], terrain
+
+
+def read_binary_map(path, use_mmap=True):
+    """
+    Open a binary station map.
+
+    A memory-mapped map is opened copy-on-write, so later changes to the
+    map stay in memory and never reach the file.
+
+    Args:
+        path (str): Path of the map file.
+        use_mmap (bool): Memory-map the file instead of reading it into memory.
+
+    Returns:
+        tuple: The buffer holding the file, the offset of the padded grid
+            within it, the number of rows and columns, the department cell
+            codes, a view of the terrain layer indexed like the grid, or None
+            if the map has no terrain layer, and the blocked cells.
+
+    Raises:
+        ValueError: If the file is not a valid binary station map.
+    """
+    with open(path, 'rb') as map_file:
+        _unpack_header(map_file.read(HEADER_SIZE), path)
+        map_file.seek(0)
+        if use_mmap:
+            buffer = mmap.mmap(map_file.fileno(), 0, access=mmap.ACCESS_COPY)
+        else:
+            buffer = bytearray(map_file.read())
+    return (buffer,) + decode_binary_map(buffer, path)
+
+
+def decode_binary_map(buffer, name='buffer'):
+    """
+    Locate the layers of a binary station map held in memory.
+
+    Args:
+        buffer (buffer): The bytes of the map, header included.
+        name (str): Name of the map's source, for error messages.
+
+    Returns:
+        tuple: The offset of the padded grid within the buffer, the number of
+            rows and columns, the department cell codes, a view of the terrain
+            layer indexed like the grid, or None if the map has no terrain
+            layer, and a dict mapping the offset of each blocked cell within
+            the padded grid to the cell code it had before it was blocked.
+
+    Raises:
+        ValueError: If the buffer does not hold a valid binary station map.
+    """
+    flags, rows, cols, codes = _unpack_header(buffer[:HEADER_SIZE], name)
+    size = (rows + 2) * (cols + 2)
+    layers = 2 if flags & FLAG_TERRAIN else 1
+    end = HEADER_SIZE + layers * size
+    blocked = {}
+    if flags & FLAG_BLOCKED:
+        if len(buffer) < end + BLOCKED_COUNT.size:
+            raise ValueError(f"{name} is truncated or has trailing data")
+        start = end + BLOCKED_COUNT.size
+        end = start + BLOCKED_COUNT.unpack_from(buffer, end)[0] * BLOCKED_CELL.size
+        if len(buffer) == end:
+            blocked = dict(BLOCKED_CELL.iter_unpack(buffer[start:end]))
+    if len(buffer) != end:
+        raise ValueError(f"{name} is truncated or has trailing data")
+
+    # Shifting the view by one layer lets a cell's terrain byte share the cell's index
+    terrain = memoryview(buffer)[size:HEADER_SIZE + 2 * size] if flags & FLAG_TERRAIN else None
+    return HEADER_SIZE, rows, cols, codes, terrain, blocked
+
+
+def _unpack_header(header, name):
+    """
+    Check the header of a binary station map and unpack it.
+
+    Args:
+        header (bytes): The first HEADER_SIZE bytes of the map.
+        name (str): Name of the map's source, for error messages.
+
+    Returns:
+        tuple: The flags, the number of rows and columns, and the department cell codes.
+
+    Raises:
+        ValueError: If the header is not that of a supported binary station map.
+    """
+    if len(header) < HEADER_SIZE or bytes(header[:len(MAGIC)]) != MAGIC:
+        raise ValueError(f"{name} is not a binary station map")
+
+    _, version, flags, rows, cols, codes = HEADER.unpack_from(header)
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported station map format version: {version}")
+    return flags, rows, cols, codes.rstrip(b'\x00')
+
+
+def encode_binary_map(grid, base, rows, cols, codes, terrain=None, blocked=None):
+    """
+    Encode a padded grid as the bytes of a binary station map.
+
+    Args:
+        grid (bytearray): Buffer holding the padded grid.
+        base (int): Offset of the padded grid within the buffer.
+        rows (int): Number of rows of the map.
+        cols (int): Number of columns of the map.
+        codes (bytes): Cell codes used by departments on the map.
+        terrain (buffer, optional): Terrain byte of each cell, indexed like the grid.
+        blocked (dict, optional): Offset of each blocked cell within the padded
+            grid mapped to the cell code it had before it was blocked.
+
+    Returns:
+        bytes: The header, the padded grid, and the terrain layer and blocked cells, if any.
+
+    Raises:
+        ValueError: If the map uses more department codes than the header holds.
+    """
+    if len(codes) > MAX_DEPARTMENT_CODES:
+        raise ValueError(f"A station map can hold at most {MAX_DEPARTMENT_CODES} department codes")
+
+    size = (rows + 2) * (cols + 2)
+    flags = (FLAG_TERRAIN if terrain is not None else 0) | (FLAG_BLOCKED if blocked else 0)
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, flags, rows, cols, bytes(codes))
+    layers = [header.ljust(HEADER_SIZE, b'\x00'), bytes(grid[base:base + size])]
+    if terrain is not None:
+        layers.append(bytes(terrain[base:base + size]))
+    if blocked:
+        layers.append(BLOCKED_COUNT.pack(len(blocked)))
+        layers.extend(BLOCKED_CELL.pack(cell, code) for cell, code in sorted(blocked.items()))
+    return b''.join(layers)
+
+
+def write_binary_map(path, grid, base, rows, cols, codes, terrain=None, blocked=None):
+    """
+    Write a padded grid as a binary station map.
+
+    Args:
+        path (str): Path of the map file.
+        grid (bytearray): Buffer holding the padded grid.
+        base (int): Offset of the padded grid within the buffer.
+        rows (int): Number of rows of the map.
+        cols (int): Number of columns of the map.
+        codes (bytes): Cell codes used by departments on the map.
+        terrain (buffer, optional): Terrain byte of each cell, indexed like the grid.
+        blocked (dict, optional): Offset of each blocked cell within the padded
+            grid mapped to the cell code it had before it was blocked.
+
+    Raises:
+        ValueError: If the map uses more department codes than the header holds.
+    """
+    data = encode_binary_map(grid, base, rows, cols, codes, terrain, blocked)
+    with open(path, 'wb') as map_file:
+        map_file.write(data)
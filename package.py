@@ -12,14 +12,23 @@ Features:
 - Each class provides a method to simulate delivery speed for different types of packages.
 - Class includes attributes for the package ID and destination, which are used for 
 	identifying and routing packages to their destinations.
+- Packages keep their fields in slots rather than a per-object dictionary, and
+  each class holds its delivery speed as a class constant, so reading it is
+  an attribute lookup rather than a method call.
+- A struct-of-arrays batch that holds many packages as parallel arrays of IDs,
+  destination codes and class codes, for queues of millions of packages.
 
 Classes:
     Package: Represents a general package with a unique ID and destination.
     Perishable: Represents a perishable package with faster delivery requirements.
     Fragile: Represents a fragile package with slower delivery requirements.
+    PackageBatch: Queue of packages held as parallel arrays.
 """
 
 
+from array import array
+
+
 class Package:
     """
     Represents a general package with a unique ID and destination.
@@ -27,8 +36,13 @@ class Package:
     Attributes:
         package_id (str): The unique identifier of the package.
         destination (str): The destination department of the package.
+        DELIVERY_SPEED (float): Delivery speed of the class, in seconds per step.
     """
 
+    __slots__ = ('_package_id', '_destination')
+
+    DELIVERY_SPEED = 1.5
+
     def __init__(self, package_id, destination):
         """
         Initialise the package with its ID and destination.
@@ -76,7 +90,7 @@ class Package:
         Returns:
             float: The delivery speed in seconds per step.
         """
-        return 1.5
+        return self.DELIVERY_SPEED
 
 
 class Perishable(Package):
@@ -87,6 +101,11 @@ class Perishable(Package):
         Package
     """
 
+    __slots__ = ()
+
+    # Faster delivery speed in seconds per step
+    DELIVERY_SPEED = 1.0
+
     def __init__(self, package_id, destination):
         """
         Initialise the perishable package with its ID and destination.
@@ -97,15 +116,6 @@ class Perishable(Package):
         """
         super().__init__(package_id, destination)
 
-    def get_delivery_speed(self):
-        """
-        Get the delivery speed for the perishable package.
-
-        Returns:
-            float: Faster delivery speed in seconds per step.
-        """
-        return 1.0
-
 
 class Fragile(Package):
     """
@@ -115,6 +125,11 @@ class Fragile(Package):
         Package
     """
 
+    __slots__ = ()
+
+    # Slower delivery speed in seconds per step
+    DELIVERY_SPEED = 2.0
+
     def __init__(self, package_id, destination):
         """
         Initialise the fragile package with its ID and destination.
@@ -125,11 +140,217 @@ class Fragile(Package):
         """
         super().__init__(package_id, destination)
 
-    def get_delivery_speed(self):
+
+# Package classes by class code, as stored in a PackageBatch
+PACKAGE_CLASSES = (Package, Perishable, Fragile)
+
+# Delivery speed in seconds per step, by class code
+DELIVERY_SPEEDS = array('d', (package_class.DELIVERY_SPEED for package_class in PACKAGE_CLASSES))
+
+
+class PackageBatch:
+    """
+    Queue of packages held as parallel arrays.
+
+    Each package takes an 8-byte ID, a 2-byte destination code and a 1-byte
+    class code, instead of a Python object. Destinations are stored as
+    indexes into a table of the names seen, and classes as indexes into
+    PACKAGE_CLASSES. Package objects are only created when packages are
+    taken from the batch.
+
+    Attributes:
+        destinations (list): Destination names by destination code.
+    """
+
+    __slots__ = ('destinations', '_codes', '_ids', '_destination_codes', '_class_codes', '_start')
+
+    def __init__(self):
+        """
+        Initialise an empty batch.
+        """
+        self.destinations = []
+        self._codes = {}
+        self._ids = array('q')
+        self._destination_codes = array('H')
+        self._class_codes = array('B')
+        self._start = 0
+
+    def __len__(self):
+        """
+        Get the number of packages left in the batch.
+
+        Returns:
+            int: Number of packages.
+        """
+        return len(self._ids) - self._start
+
+    def _destination_code(self, destination):
+        """
+        Get the code of a destination, adding it to the table if it is new.
+
+        Args:
+            destination (str): Destination department.
+
+        Returns:
+            int: The destination code.
+        """
+        code = self._codes.get(destination)
+        if code is None:
+            code = self._codes[destination] = len(self.destinations)
+            self.destinations.append(destination)
+        return code
+
+    @staticmethod
+    def _class_code(package_class):
+        """
+        Get the code of a package class.
+
+        Args:
+            package_class (type): Package, Perishable or Fragile.
+
+        Returns:
+            int: Index of the class in PACKAGE_CLASSES.
+
+        Raises:
+            ValueError: If the class has no code.
+        """
+        if package_class not in PACKAGE_CLASSES:
+            raise ValueError(f"Package class {package_class.__name__} cannot be stored in a batch")
+        return PACKAGE_CLASSES.index(package_class)
+
+    def append(self, package_class, package_id, destination):
+        """
+        Add a package to the end of the batch.
+
+        Args:
+            package_class (type): Package, Perishable or Fragile.
+            package_id (int): Identifier of the package.
+            destination (str): Destination department.
+
+        Raises:
+            ValueError: If the class cannot be stored in a batch.
+        """
+        self._class_codes.append(self._class_code(package_class))
+        self._ids.append(package_id)
+        self._destination_codes.append(self._destination_code(destination))
+
+    def extend(self, package_class, package_ids, destinations):
+        """
+        Add packages of one class to the end of the batch.
+
+        Args:
+            package_class (type): Package, Perishable or Fragile.
+            package_ids (iterable): Identifier of each package.
+            destinations (iterable): Destination department of each package.
+
+        Raises:
+            ValueError: If the class cannot be stored in a batch, or there are
+                not as many identifiers as destinations.
+        """
+        class_code = self._class_code(package_class)
+        size = len(self._ids)
+        self._ids.extend(package_ids)
+        self._destination_codes.extend(map(self._destination_code, destinations))
+        if len(self._ids) != len(self._destination_codes):
+            del self._ids[size:]
+            del self._destination_codes[size:]
+            raise ValueError("Every package needs one identifier and one destination")
+        self._class_codes.extend(array('B', [class_code]) * (len(self._ids) - size))
+
+    @classmethod
+    def from_packages(cls, packages):
+        """
+        Create a batch holding packages.
+
+        Args:
+            packages (iterable): The packages, with integer identifiers.
+
+        Returns:
+            PackageBatch: The batch, in the order of the packages.
+
+        Raises:
+            ValueError: If a package's class cannot be stored in a batch.
+        """
+        batch = cls()
+        for package in packages:
+            batch.append(type(package), package.package_id, package.destination)
+        return batch
+
+    def __getitem__(self, index):
+        """
+        Create the package at a position of the batch, without taking it.
+
+        Args:
+            index (int): Position from the front of the batch.
+
+        Returns:
+            Package: The package.
+
+        Raises:
+            IndexError: If the batch has no package at that position.
+        """
+        if not 0 <= index < len(self):
+            raise IndexError("Package batch index out of range")
+        row = self._start + index
+        return PACKAGE_CLASSES[self._class_codes[row]](self._ids[row], self.destinations[self._destination_codes[row]])
+
+    def __iter__(self):
+        """
+        Iterate over the packages left in the batch, without taking them.
+
+        Yields:
+            Package: Each package, front first.
+        """
+        for index in range(len(self)):
+            yield self[index]
+
+    def popleft(self):
+        """
+        Take the package at the front of the batch.
+
+        Returns:
+            Package: The package.
+
+        Raises:
+            IndexError: If the batch is empty.
+        """
+        package = self[0]
+        self._start += 1
+        # Drop the packages taken once they make up half the arrays, so taking stays O(1) amortised
+        if self._start >= 1024 and 2 * self._start >= len(self._ids):
+            for column in (self._ids, self._destination_codes, self._class_codes):
+                del column[:self._start]
+            self._start = 0
+        return package
+
+    def speeds(self):
+        """
+        Get the delivery speed of every package left in the batch.
+
+        Returns:
+            array: Seconds per step of each package, front first.
+        """
+        return array('d', (DELIVERY_SPEEDS[code] for code in self._class_codes[self._start:]))
+
+    def counts(self):
+        """
+        Count the packages left in the batch per destination.
+
+        Returns:
+            dict: Each destination mapped to its number of packages.
+        """
+        totals = [0] * len(self.destinations)
+        for code in self._destination_codes[self._start:]:
+            totals[code] += 1
+        return {self.destinations[code]: total for code, total in enumerate(totals) if total}
+
+    @property
+    def nbytes(self):
         """
-        Get the delivery speed for the fragile package.
+        Get the memory taken by the arrays, without the destination table.
 
         Returns:
-            float: Slower delivery speed in seconds per step.
+            int: Number of bytes.
         """
-        return 2.0
+        columns = (self._ids, self._destination_codes, self._class_codes)
+        return sum(len(column) * column.itemsize for column in columns)
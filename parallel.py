@@ -0,0 +1,154 @@
+"""
+parallel.py
+
+This module plans large batches of routes across several worker processes.
+
+Features:
+- Copies the map's padded grid once into a shared memory block that every
+  worker attaches to, so tasks carry only their queries, never the map.
+- Sends queries to the workers in chunks, several per worker, and returns
+  the routes in the order of the queries.
+- Gives every worker its own search engine and route index, so department
+  queries are answered from distance fields built once per worker.
+
+Workers plan routes exactly as `Environment.find_path` would, so a batch
+planned in parallel matches the same batch planned serially.
+
+Functions:
+    plan_routes: Plans a batch of routes in worker processes.
+"""
+
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from hierarchy import ClusterGraph
+from pathfinding import GridSearch
+from route_index import RouteIndex
+
+
+# Fewer queries than this per worker do not pay for starting the worker
+MIN_QUERIES_PER_WORKER = 128
+
+# Chunks handed to each worker, so that a worker given slow queries does not hold the others up
+CHUNKS_PER_WORKER = 4
+
+# State of the worker process, set up once by _start_worker
+_worker = None
+
+
+class _Worker:
+    """
+    Route planner of one worker process, over the shared grid.
+    """
+
+    def __init__(self, name, size, rows, cols, departments, goals, strategy, cluster_size):
+        """
+        Attach to the shared grid and set up the search engine.
+
+        Args:
+            name (str): Name of the shared memory block holding the grid.
+            size (int): Number of bytes of the grid.
+            rows (int): Number of rows of the map.
+            cols (int): Number of columns of the map.
+            departments (dict): Department letter mapped to the flat indices of its cells.
+            goals (dict): Other destination letters mapped to the flat indices of their cells.
+            strategy (str): Search strategy for queries the route index does not cover.
+            cluster_size (int): Cluster size of the 'hpa' strategy.
+        """
+        self._block = shared_memory.SharedMemory(name=name)
+        self._search = GridSearch(self._block.buf[:size], rows, cols)
+        self._route_index = RouteIndex(self._search, departments)
+        self._departments = departments
+        self._goals = goals
+        self._strategy = strategy
+        self._hierarchy = ClusterGraph(self._search, cluster_size) if strategy == 'hpa' else None
+
+    def plan(self, start_position, destination):
+        """
+        Find the shortest path for one query, as `Environment.find_path` would.
+
+        Args:
+            start_position (tuple): Starting coordinates (row, col).
+            destination (str or tuple): Target destination character or coordinates.
+
+        Returns:
+            list: List of coordinates representing the path, or None if no path exists.
+        """
+        if self._route_index.covers(start_position, destination):
+            return self._route_index.path(start_position, destination)
+
+        search = self._search
+        start = search.index(start_position)
+        if start is None:
+            return None
+        if isinstance(destination, str):
+            target = destination[0].upper()
+            goals = self._departments.get(target) or self._goals.get(target, set())
+        else:
+            goal = search.index(destination)
+            goals = set() if goal is None else {goal}
+
+        if self._hierarchy is not None:
+            path = self._hierarchy.find_path(start, goals)
+        else:
+            path = search.search(self._strategy, start, goals)
+        if path is None:
+            return None
+        return [search.position(cell) for cell in path]
+
+
+def _start_worker(*args):
+    """
+    Set up the route planner of a worker process.
+
+    Args:
+        *args: Arguments of `_Worker`.
+    """
+    global _worker
+    _worker = _Worker(*args)
+
+
+def _plan_chunk(queries):
+    """
+    Plan a chunk of queries in a worker process.
+
+    Args:
+        queries (list): (start_position, destination) pairs.
+
+    Returns:
+        list: Path of each query, None where no path exists.
+    """
+    return [_worker.plan(start, destination) for start, destination in queries]
+
+
+def plan_routes(grid, rows, cols, departments, goals, queries, strategy, workers, cluster_size):
+    """
+    Plan a batch of routes in worker processes.
+
+    Args:
+        grid (bytes): Padded grid of the map, with no offset.
+        rows (int): Number of rows of the map.
+        cols (int): Number of columns of the map.
+        departments (dict): Department letter mapped to the flat indices of its cells.
+        goals (dict): Other destination letters used by the queries mapped to
+            the flat indices of their cells.
+        queries (list): (start_position, destination) pairs.
+        strategy (str): Search strategy for queries the route index does not cover.
+        workers (int): Number of worker processes.
+        cluster_size (int): Cluster size of the 'hpa' strategy.
+
+    Returns:
+        list: Path of each query, in the order of the queries, None where no path exists.
+    """
+    size = len(grid)
+    block = shared_memory.SharedMemory(create=True, size=size)
+    try:
+        block.buf[:size] = grid
+        chunk = -(-len(queries) // (workers * CHUNKS_PER_WORKER))
+        chunks = [queries[start:start + chunk] for start in range(0, len(queries), chunk)]
+        with ProcessPoolExecutor(workers, initializer=_start_worker, initargs=(
+                block.name, size, rows, cols, departments, goals, strategy, cluster_size)) as executor:
+            return [path for paths in executor.map(_plan_chunk, chunks) for path in paths]
+    finally:
+        block.close()
+        block.unlink()
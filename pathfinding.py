@@ -0,0 +1,710 @@
+"""
+pathfinding.py
+
+This module defines the GridSearch class, the search engine used by the
+Environment and the RouteIndex to plan routes across a map.
+
+Features:
+- Works on flat integer cell indices into a grid padded with a one-cell
+  obstacle border, so neighbours never need a bounds check.
+- Allocates its visited and parent arrays on the first search and reuses
+  them, so later searches allocate nothing proportional to the map size.
+- Breadth-First Search (BFS) on a real FIFO queue with an early exit as
+  soon as a goal cell is discovered.
+- A* with a Manhattan heuristic, bidirectional BFS and Jump Point Search
+  (JPS) for point-to-point routing on large open maps.
+- Optional depth and expansion budgets for bounded searches.
+- Weighted routing on a binary heap for maps whose cells take different
+  times to cross: A* when a heuristic applies, Dijkstra's algorithm otherwise.
+- Multi-source BFS distance fields with next-hop pointers.
+
+Classes:
+    GridSearch: Search engine over a padded, flattened walkable mask.
+"""
+
+
+import heapq
+from array import array
+from collections import deque
+
+
+STRATEGIES = ('bfs', 'astar', 'bidirectional', 'jps')
+
+# Above this many goal cells, evaluating a Manhattan heuristic per node costs
+# more than it saves, and the searches fall back to plain BFS ordering.
+MAX_HEURISTIC_GOALS = 16
+
+
+class GridSearch:
+    """
+    Search engine over a padded, flattened walkable mask.
+
+    A cell at (row, col) lives at flat index base + (row + 1) * width + (col + 1),
+    where width is the number of columns plus two and base is the offset of
+    the padded grid within its buffer.
+
+    Attributes:
+        rows (int): Number of rows of the map.
+        cols (int): Number of columns of the map.
+        width (int): Row stride of the padded grid.
+        base (int): Offset of the padded grid within the buffer.
+        expanded (int): Number of cells expanded by the most recent search.
+    """
+
+    def __init__(self, walkable, rows, cols, base=0):
+        """
+        Initialise the engine over a walkable mask.
+
+        Args:
+            walkable (bytearray): Padded mask, non-zero for walkable cells and 0 otherwise.
+                Any buffer supporting integer indexing works, including an mmap.
+            rows (int): Number of rows of the map.
+            cols (int): Number of columns of the map.
+            base (int): Offset of the padded grid within the buffer.
+        """
+        self.rows = rows
+        self.cols = cols
+        self.width = cols + 2
+        self.base = base
+        self.expanded = 0
+        self._walkable = walkable
+        self._epoch = 0
+        self._seen = None
+        self._parent = None
+        self._cost = None
+        self._closed = None
+        self._weight = None
+        self._back_seen = None
+        self._back_parent = None
+        self._back_cost = None
+
+    def index(self, position):
+        """
+        Convert a (row, col) position into a flat index.
+
+        Args:
+            position (tuple): Coordinates (row, col).
+
+        Returns:
+            int: Flat index, or None if the position lies outside the map.
+        """
+        row, col = position
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            return self.base + (row + 1) * self.width + col + 1
+        return None
+
+    def position(self, index):
+        """
+        Convert a flat index into a (row, col) position.
+
+        Args:
+            index (int): Flat index of a cell.
+
+        Returns:
+            tuple: Coordinates (row, col).
+        """
+        row, col = divmod(index - self.base, self.width)
+        return row - 1, col - 1
+
+    def is_walkable(self, index):
+        """
+        Check whether a cell can be walked on.
+
+        Args:
+            index (int): Flat index of a cell.
+
+        Returns:
+            bool: True if the cell is walkable, False otherwise.
+        """
+        return self._walkable[index] != 0
+
+    def _next_epoch(self):
+        """
+        Start a new search, invalidating every visited mark of the previous ones.
+
+        Returns:
+            int: The stamp that marks cells visited by the new search.
+        """
+        self._epoch += 1
+        if self._epoch == 2 ** 31 - 1:
+            for stamps in ('_seen', '_closed', '_back_seen'):
+                if getattr(self, stamps) is not None:
+                    setattr(self, stamps, array('i', [0]) * len(self._walkable))
+            self._epoch = 1
+        return self._epoch
+
+    def _allocate(self, *names):
+        """
+        Allocate scratch arrays used only by some strategies on first use.
+
+        Args:
+            *names (str): Attribute names of the arrays to allocate.
+        """
+        for name in names:
+            if getattr(self, name) is None:
+                setattr(self, name, array('i', [0]) * len(self._walkable))
+
+    def _heuristic(self, goals):
+        """
+        Build a Manhattan distance heuristic towards the nearest goal cell.
+
+        Args:
+            goals (set): Flat indices of the goal cells.
+
+        Returns:
+            function: Heuristic taking a flat index, or None if there are too many goals.
+        """
+        if len(goals) > MAX_HEURISTIC_GOALS:
+            return None
+
+        width = self.width
+        base = self.base
+        targets = [divmod(goal - base, width) for goal in goals]
+        if len(targets) == 1:
+            goal_row, goal_col = targets[0]
+
+            def heuristic(cell):
+                row, col = divmod(cell - base, width)
+                return abs(row - goal_row) + abs(col - goal_col)
+        else:
+            def heuristic(cell):
+                row, col = divmod(cell - base, width)
+                return min(abs(row - goal_row) + abs(col - goal_col) for goal_row, goal_col in targets)
+
+        return heuristic
+
+    def search(self, strategy, start, goals, max_depth=None, max_expansions=None):
+        """
+        Run one of the search strategies.
+
+        Args:
+            strategy (str): One of 'bfs', 'astar', 'bidirectional' or 'jps'.
+            start (int): Flat index of the start cell.
+            goals (set): Flat indices of the goal cells.
+            max_depth (int, optional): Longest path, in steps, worth searching for.
+            max_expansions (int, optional): Most cells the search may expand.
+
+        Returns:
+            list: Flat indices of the path, or None if no path exists within budget.
+
+        Raises:
+            ValueError: If the strategy is unknown.
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown search strategy: {strategy}")
+        if not goals:
+            self.expanded = 0
+            return None
+        return getattr(self, strategy)(start, goals, max_depth, max_expansions)
+
+    def _trace(self, cell):
+        """
+        Follow the parent pointers back from a cell to the start of the search.
+
+        Args:
+            cell (int): Flat index of the last cell of the path.
+
+        Returns:
+            list: Flat indices from the start of the search to the cell.
+        """
+        parent = self._parent
+        path = []
+        while cell >= 0:
+            path.append(cell)
+            cell = parent[cell]
+        path.reverse()
+        return path
+
+    def bfs(self, start, goals, max_depth=None, max_expansions=None):
+        """
+        Find the shortest path from a start cell to the nearest goal cell.
+
+        Neighbours are visited right, down, left, up, so ties between paths
+        of equal length are broken the same way on every call.
+
+        Args:
+            start (int): Flat index of the start cell.
+            goals (set): Flat indices of the goal cells.
+            max_depth (int, optional): Longest path, in steps, worth searching for.
+            max_expansions (int, optional): Most cells the search may expand.
+
+        Returns:
+            list: Flat indices of the path, or None if no path exists within budget.
+        """
+        self.expanded = 0
+        self._allocate('_seen', '_parent')
+        epoch = self._next_epoch()
+        seen = self._seen
+        parent = self._parent
+        walkable = self._walkable
+        width = self.width
+
+        seen[start] = epoch
+        parent[start] = -1
+        if start in goals:
+            return [start]
+
+        queue = deque((start,))
+        popleft = queue.popleft
+        append = queue.append
+        depth = 0
+        expanded = 0
+
+        while queue:
+            if max_depth is not None and depth >= max_depth:
+                break
+            depth += 1
+
+            for _ in range(len(queue)):
+                if max_expansions is not None and expanded >= max_expansions:
+                    self.expanded = expanded
+                    return None
+                current = popleft()
+                expanded += 1
+
+                for neighbour in (current + 1, current + width, current - 1, current - width):
+                    if walkable[neighbour] and seen[neighbour] != epoch:
+                        seen[neighbour] = epoch
+                        parent[neighbour] = current
+                        if neighbour in goals:
+                            self.expanded = expanded
+                            return self._trace(neighbour)
+                        append(neighbour)
+
+        self.expanded = expanded
+        return None
+
+    def astar(self, start, goals, max_depth=None, max_expansions=None):
+        """
+        Find the shortest path to the nearest goal cell using A* with a Manhattan heuristic.
+
+        Args:
+            start (int): Flat index of the start cell.
+            goals (set): Flat indices of the goal cells.
+            max_depth (int, optional): Longest path, in steps, worth searching for.
+            max_expansions (int, optional): Most cells the search may expand.
+
+        Returns:
+            list: Flat indices of the path, or None if no path exists within budget.
+        """
+        heuristic = self._heuristic(goals)
+        if heuristic is None:
+            return self.bfs(start, goals, max_depth, max_expansions)
+
+        self.expanded = 0
+        self._allocate('_seen', '_parent', '_cost', '_closed')
+        epoch = self._next_epoch()
+        seen = self._seen
+        parent = self._parent
+        cost = self._cost
+        closed = self._closed
+        walkable = self._walkable
+        width = self.width
+
+        seen[start] = epoch
+        parent[start] = -1
+        cost[start] = 0
+        estimate = heuristic(start)
+        heap = [(estimate, estimate, start)]
+        expanded = 0
+
+        while heap:
+            _, _, current = heapq.heappop(heap)
+            if closed[current] == epoch:
+                continue
+            closed[current] = epoch
+            if current in goals:
+                self.expanded = expanded
+                return self._trace(current)
+            if max_expansions is not None and expanded >= max_expansions:
+                break
+            expanded += 1
+
+            step = cost[current] + 1
+            if max_depth is not None and step > max_depth:
+                continue
+            for neighbour in (current + 1, current + width, current - 1, current - width):
+                if not walkable[neighbour] or closed[neighbour] == epoch:
+                    continue
+                if seen[neighbour] != epoch or step < cost[neighbour]:
+                    seen[neighbour] = epoch
+                    parent[neighbour] = current
+                    cost[neighbour] = step
+                    estimate = heuristic(neighbour)
+                    heapq.heappush(heap, (step + estimate, estimate, neighbour))
+
+        self.expanded = expanded
+        return None
+
+    def weighted(self, start, goals, step_costs, terrain, min_step=0.0, max_expansions=None):
+        """
+        Find the cheapest path to the nearest goal cell when cells differ in cost.
+
+        The cost of a step is the cost of entering the neighbouring cell, looked
+        up by the cell's terrain byte. With a positive minimum step cost and few
+        enough goals, the search is A* with a scaled Manhattan heuristic;
+        otherwise it is Dijkstra's algorithm.
+
+        Args:
+            start (int): Flat index of the start cell.
+            goals (set): Flat indices of the goal cells.
+            step_costs (sequence): Cost of entering a cell, indexed by terrain byte.
+            terrain (buffer): Terrain byte of each cell, indexed by flat cell.
+            min_step (float): Lowest step cost on the map, used to scale the heuristic.
+            max_expansions (int, optional): Most cells the search may expand.
+
+        Returns:
+            tuple: Flat indices of the path and its total cost, or (None, None)
+                if no path exists within budget.
+        """
+        manhattan = self._heuristic(goals) if min_step > 0 else None
+        if manhattan is None:
+            def heuristic(cell):
+                return 0.0
+        else:
+            def heuristic(cell):
+                return manhattan(cell) * min_step
+
+        self.expanded = 0
+        self._allocate('_seen', '_parent', '_closed')
+        if self._weight is None:
+            self._weight = array('d', [0.0]) * len(self._walkable)
+        epoch = self._next_epoch()
+        seen = self._seen
+        parent = self._parent
+        cost = self._weight
+        closed = self._closed
+        walkable = self._walkable
+        width = self.width
+
+        seen[start] = epoch
+        parent[start] = -1
+        cost[start] = 0.0
+        heap = [(heuristic(start), start)]
+        expanded = 0
+
+        while heap:
+            _, current = heapq.heappop(heap)
+            if closed[current] == epoch:
+                continue
+            closed[current] = epoch
+            if current in goals:
+                self.expanded = expanded
+                return self._trace(current), cost[current]
+            if max_expansions is not None and expanded >= max_expansions:
+                break
+            expanded += 1
+
+            base_cost = cost[current]
+            for neighbour in (current + 1, current + width, current - 1, current - width):
+                if not walkable[neighbour] or closed[neighbour] == epoch:
+                    continue
+                step = base_cost + step_costs[terrain[neighbour]]
+                if seen[neighbour] != epoch or step < cost[neighbour]:
+                    seen[neighbour] = epoch
+                    parent[neighbour] = current
+                    cost[neighbour] = step
+                    heapq.heappush(heap, (step + heuristic(neighbour), neighbour))
+
+        self.expanded = expanded
+        return None, None
+
+    def bidirectional(self, start, goals, max_depth=None, max_expansions=None):
+        """
+        Find the shortest path to the nearest goal cell using bidirectional BFS.
+
+        One search grows outwards from the start and another from every goal
+        cell. Each round expands a full level of whichever frontier is smaller,
+        and the search stops at the end of the first level in which they meet.
+
+        Args:
+            start (int): Flat index of the start cell.
+            goals (set): Flat indices of the goal cells.
+            max_depth (int, optional): Longest path, in steps, worth searching for.
+            max_expansions (int, optional): Most cells the search may expand.
+
+        Returns:
+            list: Flat indices of the path, or None if no path exists within budget.
+        """
+        self.expanded = 0
+        self._allocate('_seen', '_parent', '_cost', '_back_seen', '_back_parent', '_back_cost')
+        epoch = self._next_epoch()
+        walkable = self._walkable
+        width = self.width
+        forward = (self._seen, self._parent, self._cost)
+        backward = (self._back_seen, self._back_parent, self._back_cost)
+
+        forward[0][start] = epoch
+        forward[1][start] = -1
+        forward[2][start] = 0
+        if start in goals:
+            return [start]
+
+        forward_frontier = [start]
+        backward_frontier = []
+        for goal in goals:
+            if walkable[goal]:
+                backward[0][goal] = epoch
+                backward[1][goal] = -1
+                backward[2][goal] = 0
+                backward_frontier.append(goal)
+
+        radius = 0
+        expanded = 0
+        meeting = -1
+        best = None
+
+        while forward_frontier and backward_frontier:
+            if max_depth is not None and radius >= max_depth:
+                break
+            radius += 1
+
+            if len(forward_frontier) <= len(backward_frontier):
+                frontier, own, other = forward_frontier, forward, backward
+            else:
+                frontier, own, other = backward_frontier, backward, forward
+            own_seen, own_parent, own_cost = own
+            other_seen, _, other_cost = other
+
+            next_frontier = []
+            for current in frontier:
+                if max_expansions is not None and expanded >= max_expansions:
+                    self.expanded = expanded
+                    return None
+                expanded += 1
+                step = own_cost[current] + 1
+
+                for neighbour in (current + 1, current + width, current - 1, current - width):
+                    if not walkable[neighbour] or own_seen[neighbour] == epoch:
+                        continue
+                    own_seen[neighbour] = epoch
+                    own_parent[neighbour] = current
+                    own_cost[neighbour] = step
+                    if other_seen[neighbour] == epoch:
+                        length = step + other_cost[neighbour]
+                        if best is None or length < best:
+                            best, meeting = length, neighbour
+                    next_frontier.append(neighbour)
+
+            if frontier is forward_frontier:
+                forward_frontier = next_frontier
+            else:
+                backward_frontier = next_frontier
+            if meeting >= 0:
+                break
+
+        self.expanded = expanded
+        if meeting < 0 or (max_depth is not None and best > max_depth):
+            return None
+
+        path = self._trace(meeting)
+        back_parent = self._back_parent
+        cell = back_parent[meeting]
+        while cell >= 0:
+            path.append(cell)
+            cell = back_parent[cell]
+        return path
+
+    def _jump_horizontal(self, cell, step, goals):
+        """
+        Jump along a row until a goal, a cell with a forced neighbour or an obstacle.
+
+        Args:
+            cell (int): Flat index to jump from.
+            step (int): 1 to jump right, -1 to jump left.
+            goals (set): Flat indices of the goal cells.
+
+        Returns:
+            int: Flat index of the jump point, or -1 if the jump hits an obstacle.
+        """
+        walkable = self._walkable
+        width = self.width
+        while True:
+            cell += step
+            if not walkable[cell]:
+                return -1
+            if cell in goals:
+                return cell
+            behind = cell - step
+            if ((walkable[cell + width] and not walkable[behind + width])
+                    or (walkable[cell - width] and not walkable[behind - width])):
+                return cell
+
+    def _jump_vertical(self, cell, step, goals):
+        """
+        Jump along a column until a goal, an obstacle or a cell that starts a horizontal jump.
+
+        Args:
+            cell (int): Flat index to jump from.
+            step (int): The row stride to jump down, minus the row stride to jump up.
+            goals (set): Flat indices of the goal cells.
+
+        Returns:
+            int: Flat index of the jump point, or -1 if the jump hits an obstacle.
+        """
+        walkable = self._walkable
+        jump_horizontal = self._jump_horizontal
+        while True:
+            cell += step
+            if not walkable[cell]:
+                return -1
+            if cell in goals:
+                return cell
+            if jump_horizontal(cell, 1, goals) >= 0 or jump_horizontal(cell, -1, goals) >= 0:
+                return cell
+
+    def _jump_successors(self, cell, parent, goals):
+        """
+        Find the jump points reachable from a cell, pruned by the direction of arrival.
+
+        Canonical paths move vertically before they move horizontally, so a
+        horizontal move only turns where the turn could not have been made
+        one cell earlier.
+
+        Args:
+            cell (int): Flat index of the cell being expanded.
+            parent (int): Flat index of the jump point the cell was reached from, or -1.
+            goals (set): Flat indices of the goal cells.
+
+        Returns:
+            list: Flat indices of the successor jump points.
+        """
+        walkable = self._walkable
+        width = self.width
+
+        if parent < 0:
+            jumps = [(self._jump_horizontal, 1), (self._jump_horizontal, -1),
+                     (self._jump_vertical, width), (self._jump_vertical, -width)]
+        elif (cell - self.base) // width == (parent - self.base) // width:
+            step = 1 if cell > parent else -1
+            jumps = [(self._jump_horizontal, step)]
+            for vertical in (width, -width):
+                if walkable[cell + vertical] and not walkable[cell - step + vertical]:
+                    jumps.append((self._jump_vertical, vertical))
+        else:
+            step = width if cell > parent else -width
+            jumps = [(self._jump_vertical, step), (self._jump_horizontal, 1),
+                     (self._jump_horizontal, -1)]
+
+        successors = []
+        for jump, step in jumps:
+            successor = jump(cell, step, goals)
+            if successor >= 0:
+                successors.append(successor)
+        return successors
+
+    def jps(self, start, goals, max_depth=None, max_expansions=None):
+        """
+        Find the shortest path to the nearest goal cell using Jump Point Search (JPS).
+
+        JPS runs A* over jump points only, skipping the long straight runs of
+        cells that uniform grids are full of. Expansions count jump points.
+
+        Args:
+            start (int): Flat index of the start cell.
+            goals (set): Flat indices of the goal cells.
+            max_depth (int, optional): Longest path, in steps, worth searching for.
+            max_expansions (int, optional): Most jump points the search may expand.
+
+        Returns:
+            list: Flat indices of the path, or None if no path exists within budget.
+        """
+        self.expanded = 0
+        self._allocate('_seen', '_parent', '_cost', '_closed')
+        epoch = self._next_epoch()
+        seen = self._seen
+        parent = self._parent
+        cost = self._cost
+        closed = self._closed
+        width = self.width
+        base = self.base
+        heuristic = self._heuristic(goals) or (lambda cell: 0)
+
+        seen[start] = epoch
+        parent[start] = -1
+        cost[start] = 0
+        estimate = heuristic(start)
+        heap = [(estimate, estimate, start)]
+        expanded = 0
+
+        while heap:
+            _, _, current = heapq.heappop(heap)
+            if closed[current] == epoch:
+                continue
+            closed[current] = epoch
+            if current in goals:
+                self.expanded = expanded
+                return self._fill_jumps(self._trace(current))
+            if max_expansions is not None and expanded >= max_expansions:
+                break
+            expanded += 1
+
+            row, col = divmod(current - base, width)
+            for successor in self._jump_successors(current, parent[current], goals):
+                if closed[successor] == epoch:
+                    continue
+                successor_row, successor_col = divmod(successor - base, width)
+                step = cost[current] + abs(successor_row - row) + abs(successor_col - col)
+                if max_depth is not None and step > max_depth:
+                    continue
+                if seen[successor] != epoch or step < cost[successor]:
+                    seen[successor] = epoch
+                    parent[successor] = current
+                    cost[successor] = step
+                    estimate = heuristic(successor)
+                    heapq.heappush(heap, (step + estimate, estimate, successor))
+
+        self.expanded = expanded
+        return None
+
+    def _fill_jumps(self, jump_points):
+        """
+        Expand a path of jump points into every cell along it.
+
+        Args:
+            jump_points (list): Flat indices of consecutive jump points, each in
+                line with the previous one.
+
+        Returns:
+            list: Flat indices of every cell of the path.
+        """
+        width = self.width
+        path = jump_points[:1]
+        for previous, cell in zip(jump_points, jump_points[1:]):
+            if (previous - self.base) // width == (cell - self.base) // width:
+                step = 1 if cell > previous else -1
+            else:
+                step = width if cell > previous else -width
+            path.extend(range(previous + step, cell + step, step))
+        return path
+
+    def distance_field(self, sources):
+        """
+        Run a multi-source BFS outwards from a set of cells.
+
+        Args:
+            sources (iterable): Flat indices of the source cells. Sources that are
+                not walkable, such as blocked department cells, are skipped.
+
+        Returns:
+            array: Steps from each flat cell to the nearest source, -1 where unreachable.
+        """
+        walkable = self._walkable
+        width = self.width
+        distance = array('i', [-1]) * len(walkable)
+
+        queue = deque(cell for cell in sources if walkable[cell])
+        for cell in queue:
+            distance[cell] = 0
+
+        popleft = queue.popleft
+        append = queue.append
+        while queue:
+            current = popleft()
+            step = distance[current] + 1
+            for neighbour in (current + 1, current + width, current - 1, current - width):
+                if walkable[neighbour] and distance[neighbour] < 0:
+                    distance[neighbour] = step
+                    append(neighbour)
+
+        return distance
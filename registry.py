@@ -0,0 +1,420 @@
+"""
+registry.py
+
+This module gives packages unique identifiers and keeps track of them from
+creation to delivery.
+
+Features:
+- Monotonic package identifiers that never repeat within a registry, drawn
+  one at a time or as a whole block at once. Several registries, one per
+  process or station, can share an identifier space without coordination
+  by each taking its own shard of it.
+- Lookup of undelivered packages by identifier and by destination, both in
+  constant time.
+- A delivery history stored as columns of packed arrays rather than as
+  objects, at 23 bytes per delivery, so runs of millions of packages
+  keep their full history in memory.
+
+Classes:
+    IdAllocator: Hands out unique, increasing package identifiers.
+    DeliveryHistory: Columnar record of delivered packages.
+    PackageRegistry: Creates packages with unique identifiers and tracks them until delivered.
+"""
+
+
+from array import array
+from collections import namedtuple
+
+
+Delivery = namedtuple('Delivery', ['package_id', 'package_type', 'destination', 'time', 'robot'])
+Delivery.__doc__ = """
+One row of a delivery history.
+
+Attributes:
+    package_id (int): Identifier of the package delivered.
+    package_type (str): Name of the package class.
+    destination (str): Destination department of the package.
+    time (float): Simulated time of delivery.
+    robot (int): Number of the robot that delivered the package, or None.
+"""
+
+
+class IdAllocator:
+    """
+    Hands out unique, increasing package identifiers.
+
+    Shard k of n shards hands out start + k, start + k + n, start + k + 2n,
+    and so on, so allocators on different shards never hand out the same
+    identifier.
+
+    Attributes:
+        shard (int): Shard of the identifier space this allocator draws from.
+        shards (int): Number of shards the identifier space is split into.
+    """
+
+    def __init__(self, start=1, shard=0, shards=1):
+        """
+        Initialise the allocator.
+
+        Args:
+            start (int): Smallest identifier of the identifier space.
+            shard (int): Shard of the identifier space to draw from.
+            shards (int): Number of shards the identifier space is split into.
+
+        Raises:
+            ValueError: If the shard is not one of the shards.
+        """
+        if shards < 1 or not 0 <= shard < shards:
+            raise ValueError(f"Shard {shard} is not one of {shards} shards")
+        self.shard = shard
+        self.shards = shards
+        self._next = start + shard
+
+    @property
+    def next_id(self):
+        """
+        Get the identifier the allocator hands out next.
+
+        Returns:
+            int: The next identifier.
+        """
+        return self._next
+
+    def allocate(self, count=1):
+        """
+        Reserve a block of identifiers.
+
+        Args:
+            count (int): Number of identifiers.
+
+        Returns:
+            range: The identifiers, in increasing order.
+        """
+        first = self._next
+        self._next += count * self.shards
+        return range(first, self._next, self.shards)
+
+    def __next__(self):
+        """
+        Hand out one identifier.
+
+        Returns:
+            int: The identifier.
+        """
+        package_id = self._next
+        self._next += self.shards
+        return package_id
+
+    def __iter__(self):
+        """
+        Iterate over the identifiers handed out from now on.
+
+        Returns:
+            IdAllocator: The allocator itself.
+        """
+        return self
+
+
+class DeliveryHistory:
+    """
+    Columnar record of delivered packages.
+
+    Each column is a packed array. Package types and destinations are
+    stored as indexes into tables of the names seen, so a row takes a fixed
+    few bytes whatever the names.
+    """
+
+    def __init__(self):
+        """
+        Initialise an empty history.
+        """
+        self._ids = array('q')
+        self._types = array('B')
+        self._destinations = array('H')
+        self._times = array('d')
+        self._robots = array('i')
+        self._type_names = []
+        self._type_codes = {}
+        self._destination_names = []
+        self._destination_codes = {}
+
+    def __len__(self):
+        """
+        Get the number of deliveries recorded.
+
+        Returns:
+            int: Number of rows.
+        """
+        return len(self._ids)
+
+    @staticmethod
+    def _code(names, codes, name):
+        """
+        Get the index of a name in a name table, adding it if it is new.
+
+        Args:
+            names (list): The name table.
+            codes (dict): Each name of the table mapped to its index.
+            name (str): The name.
+
+        Returns:
+            int: Index of the name in the table.
+        """
+        code = codes.get(name)
+        if code is None:
+            code = codes[name] = len(names)
+            names.append(name)
+        return code
+
+    def append(self, package, time, robot=None):
+        """
+        Record the delivery of a package.
+
+        Args:
+            package (Package): The package delivered. Its identifier must be an integer.
+            time (float): Simulated time of delivery.
+            robot (int, optional): Number of the robot that delivered it.
+        """
+        self._ids.append(package.package_id)
+        self._types.append(self._code(self._type_names, self._type_codes, type(package).__name__))
+        self._destinations.append(self._code(self._destination_names, self._destination_codes,
+                                             package.destination))
+        self._times.append(time)
+        self._robots.append(-1 if robot is None else robot)
+
+    def __getitem__(self, row):
+        """
+        Get one delivery.
+
+        Args:
+            row (int): Index of the row, negative from the end.
+
+        Returns:
+            Delivery: The delivery.
+        """
+        robot = self._robots[row]
+        return Delivery(self._ids[row], self._type_names[self._types[row]],
+                        self._destination_names[self._destinations[row]], self._times[row],
+                        None if robot < 0 else robot)
+
+    def __iter__(self):
+        """
+        Iterate over the deliveries in the order they were recorded.
+
+        Yields:
+            Delivery: Each delivery.
+        """
+        for row in range(len(self)):
+            yield self[row]
+
+    def column(self, name):
+        """
+        Get one column of the history.
+
+        Args:
+            name (str): 'package_id', 'time' or 'robot' for the packed array
+                of that column, where robot -1 means unknown, or 'package_type'
+                or 'destination' for a list of names.
+
+        Returns:
+            array or list: The column, one entry per delivery.
+
+        Raises:
+            KeyError: If there is no column of that name.
+        """
+        if name == 'package_type':
+            return [self._type_names[code] for code in self._types]
+        if name == 'destination':
+            return [self._destination_names[code] for code in self._destinations]
+        return {'package_id': self._ids, 'time': self._times, 'robot': self._robots}[name]
+
+    def counts(self, name):
+        """
+        Count the deliveries per package type or per destination.
+
+        Args:
+            name (str): 'package_type' or 'destination'.
+
+        Returns:
+            dict: Each name mapped to its number of deliveries.
+        """
+        codes, names = ((self._types, self._type_names) if name == 'package_type'
+                        else (self._destinations, self._destination_names))
+        totals = [0] * len(names)
+        for code in codes:
+            totals[code] += 1
+        return {names[code]: total for code, total in enumerate(totals) if total}
+
+    @property
+    def nbytes(self):
+        """
+        Get the memory taken by the columns, without the name tables.
+
+        Returns:
+            int: Number of bytes.
+        """
+        columns = (self._ids, self._types, self._destinations, self._times, self._robots)
+        return sum(len(column) * column.itemsize for column in columns)
+
+
+class PackageRegistry:
+    """
+    Creates packages with unique identifiers and tracks them until delivered.
+
+    Attributes:
+        ids (IdAllocator): Allocator of the registry's package identifiers.
+        history (DeliveryHistory): Every package delivered so far.
+        discarded (int): Number of packages dropped without being delivered.
+    """
+
+    def __init__(self, start=1, shard=0, shards=1):
+        """
+        Initialise an empty registry.
+
+        Args:
+            start (int): Smallest package identifier.
+            shard (int): Shard of the identifier space the registry draws from.
+            shards (int): Number of registries sharing the identifier space.
+        """
+        self.ids = IdAllocator(start, shard, shards)
+        self.history = DeliveryHistory()
+        self.discarded = 0
+        self._packages = {}
+        self._by_destination = {}
+
+    def __len__(self):
+        """
+        Get the number of packages not yet delivered.
+
+        Returns:
+            int: Number of packages tracked.
+        """
+        return len(self._packages)
+
+    def __contains__(self, package_id):
+        """
+        Check whether a package is tracked and not yet delivered.
+
+        Args:
+            package_id (int): Identifier of the package.
+
+        Returns:
+            bool: True if the registry tracks the package.
+        """
+        return package_id in self._packages
+
+    def create(self, package_type, destination):
+        """
+        Create and register a package with a fresh identifier.
+
+        Args:
+            package_type (type): Package class.
+            destination (str): Destination department.
+
+        Returns:
+            Package: The new package.
+        """
+        package = package_type(next(self.ids), destination)
+        self._add(package)
+        return package
+
+    def create_many(self, package_type, destinations):
+        """
+        Create and register one package per destination, with a block of fresh identifiers.
+
+        Args:
+            package_type (type): Package class of every package.
+            destinations (list): Destination department of each package.
+
+        Returns:
+            list: The new packages, in the order of the destinations.
+        """
+        packages = list(map(package_type, self.ids.allocate(len(destinations)), destinations))
+        for package in packages:
+            self._add(package)
+        return packages
+
+    def register(self, package):
+        """
+        Track a package created elsewhere.
+
+        Args:
+            package (Package): The package.
+
+        Raises:
+            ValueError: If a package with the same identifier is already tracked.
+        """
+        if package.package_id in self._packages:
+            raise ValueError(f"Package {package.package_id} is already registered")
+        self._add(package)
+
+    def _add(self, package):
+        """
+        Index a package by identifier and destination.
+
+        Args:
+            package (Package): The package.
+        """
+        self._packages[package.package_id] = package
+        self._by_destination.setdefault(package.destination, {})[package.package_id] = package
+
+    def get(self, package_id):
+        """
+        Get a package not yet delivered.
+
+        Args:
+            package_id (int): Identifier of the package.
+
+        Returns:
+            Package: The package, or None if it is not tracked.
+        """
+        return self._packages.get(package_id)
+
+    def by_destination(self, destination):
+        """
+        Get the packages not yet delivered to a department.
+
+        Args:
+            destination (str): Destination department.
+
+        Returns:
+            list: The packages, in the order they were registered.
+        """
+        return list(self._by_destination.get(destination, {}).values())
+
+    def _remove(self, package):
+        """
+        Stop tracking a package.
+
+        Args:
+            package (Package): The package.
+
+        Returns:
+            bool: True if the package was tracked.
+        """
+        if self._packages.pop(package.package_id, None) is None:
+            return False
+        del self._by_destination[package.destination][package.package_id]
+        return True
+
+    def complete(self, package, time, robot=None):
+        """
+        Record the delivery of a package and stop tracking it.
+
+        Args:
+            package (Package): The package delivered.
+            time (float): Simulated time of delivery.
+            robot (int, optional): Number of the robot that delivered it.
+        """
+        self._remove(package)
+        self.history.append(package, time, robot)
+
+    def discard(self, package):
+        """
+        Stop tracking a package that will not be delivered.
+
+        Args:
+            package (Package): The package.
+        """
+        if self._remove(package):
+            self.discarded += 1
@@ -0,0 +1,113 @@
+"""
+renderer.py
+
+This module defines the MapRenderer class, which animates the station map
+in a terminal by redrawing only the cells that changed since the last frame.
+
+Features:
+- Clears the screen with an ANSI escape sequence instead of spawning a
+  `clear` or `cls` subprocess.
+- Draws the first frame in full, together with a header and footer.
+- Redraws later frames by moving the cursor to each changed cell with ANSI
+  cursor positioning, so a robot step costs a few dozen bytes instead of
+  the whole map.
+- Builds every frame with a single join and writes it with a single call.
+
+Classes:
+    MapRenderer: Incremental terminal renderer for map frames.
+"""
+
+
+import sys
+
+
+CLEAR_SCREEN = '\033[2J\033[H'
+
+# Every cell of a frame takes this many terminal columns, see environment.CELL_TEXT
+CELL_WIDTH = 5
+
+
+class MapRenderer:
+    """
+    Incremental terminal renderer for map frames.
+
+    A frame is a list of rows, each a list of the text of its cells. The
+    renderer keeps the last frame it drew and, while nothing else has been
+    written to the screen, only redraws the cells that differ from it.
+
+    Attributes:
+        stream (file): Text stream the renderer writes to.
+    """
+
+    def __init__(self, stream=None):
+        """
+        Initialise the renderer with no frame on screen.
+
+        Args:
+            stream (file, optional): Text stream to write to. Defaults to standard output.
+        """
+        self.stream = stream
+        self._frame = None
+        self._top = 0
+        self._bottom = 0
+
+    def clear(self):
+        """
+        Clear the screen and forget the last frame, so the next one is drawn in full.
+        """
+        self._write(CLEAR_SCREEN)
+        self._frame = None
+
+    def draw(self, frame, header=(), footer=()):
+        """
+        Draw a frame, redrawing only the cells that changed since the last one.
+
+        The header and footer are only written when the frame is drawn in
+        full, which happens for the first frame after `clear` and whenever
+        the frame or header size changes.
+
+        Args:
+            frame (list): Rows of the frame, each a list of cell text.
+            header (sequence): Lines printed above the map.
+            footer (sequence): Lines printed below the map.
+
+        Returns:
+            int: Number of cells written.
+        """
+        last = self._frame
+        if (last is None or len(last) != len(frame) or len(header) != self._top
+                or any(len(old) != len(new) for old, new in zip(last, frame))):
+            lines = list(header)
+            lines.extend(''.join(row) for row in frame)
+            lines.extend(footer)
+            self._write(CLEAR_SCREEN + '\n'.join(lines) + '\n')
+            self._top = len(header)
+            self._bottom = len(header) + len(frame) + len(footer)
+            self._frame = [list(row) for row in frame]
+            return sum(len(row) for row in frame)
+
+        pieces = []
+        for row, (old, new) in enumerate(zip(last, frame)):
+            if old == new:
+                continue
+            line = self._top + row + 1
+            for col, text in enumerate(new):
+                if old[col] != text:
+                    pieces.append(f'\033[{line};{col * CELL_WIDTH + 1}H{text}')
+                    old[col] = text
+
+        if pieces:
+            pieces.append(f'\033[{self._bottom + 1};1H')
+            self._write(''.join(pieces))
+        return len(pieces) - 1 if pieces else 0
+
+    def _write(self, text):
+        """
+        Write text to the stream and flush it.
+
+        Args:
+            text (str): Text to write.
+        """
+        stream = self.stream or sys.stdout
+        stream.write(text)
+        stream.flush()
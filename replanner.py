@@ -0,0 +1,222 @@
+"""
+replanner.py
+
+This module defines the Replanner class, which keeps a robot's route to its
+destination up to date as cells of the map are blocked and unblocked, using
+the D* Lite algorithm (Koenig and Likhachev, 2002).
+
+Features:
+- Searches backwards from every cell of the destination towards the robot,
+  so that the cost-to-go of each cell stays valid as the robot moves.
+- Repairs only the part of the search affected by the changed cells,
+  instead of searching the whole map again.
+- Works on the flat cell indices and walkable mask shared with GridSearch,
+  so a blocked cell takes effect as soon as the map changes.
+
+Classes:
+    Replanner: Incremental route planner towards a fixed destination.
+"""
+
+
+import heapq
+
+
+INFINITY = float('inf')
+
+
+class Replanner:
+    """
+    Incremental route planner towards a fixed destination.
+
+    Attributes:
+        expanded (int): Number of cells expanded by the most recent plan or repair.
+    """
+
+    def __init__(self, search, start, goals):
+        """
+        Plan the initial route.
+
+        Args:
+            search (GridSearch): Search engine over the map's walkable mask.
+            start (int): Flat index of the robot's cell.
+            goals (iterable): Flat indices of the destination cells.
+        """
+        self._search = search
+        self._walkable = search._walkable
+        self._width = search.width
+        self._goals = set(goals)
+        self._start = start
+        self._start_position = divmod(start - search.base, self._width)
+        self._last = start
+        self._modifier = 0
+        self._g = {}
+        self._rhs = {}
+        self._open = {}
+        self._heap = []
+
+        for goal in self._goals:
+            if self._walkable[goal]:
+                self._rhs[goal] = 0
+                self._push(goal)
+        self._compute()
+
+    def _heuristic(self, cell):
+        """
+        Estimate the number of steps between a cell and the robot.
+
+        Args:
+            cell (int): Flat index of the cell.
+
+        Returns:
+            int: Manhattan distance to the robot's cell.
+        """
+        row, col = divmod(cell - self._search.base, self._width)
+        start_row, start_col = self._start_position
+        return abs(row - start_row) + abs(col - start_col)
+
+    def _key(self, cell):
+        """
+        Compute the priority of a cell in the open list.
+
+        Args:
+            cell (int): Flat index of the cell.
+
+        Returns:
+            tuple: Primary and secondary key, smaller first.
+        """
+        best = min(self._g.get(cell, INFINITY), self._rhs.get(cell, INFINITY))
+        return (best + self._heuristic(cell) + self._modifier, best)
+
+    def _push(self, cell):
+        """
+        Add a cell to the open list, replacing any earlier entry for it.
+
+        Args:
+            cell (int): Flat index of the cell.
+        """
+        key = self._key(cell)
+        self._open[cell] = key
+        heapq.heappush(self._heap, (key, cell))
+
+    def _neighbours(self, cell):
+        """
+        Get the four neighbours of a cell.
+
+        Args:
+            cell (int): Flat index of the cell.
+
+        Returns:
+            tuple: Flat indices of the right, lower, left and upper neighbours.
+        """
+        width = self._width
+        return (cell + 1, cell + width, cell - 1, cell - width)
+
+    def _update(self, cell):
+        """
+        Recompute the one-step lookahead cost of a cell and queue it if inconsistent.
+
+        Args:
+            cell (int): Flat index of the cell.
+        """
+        walkable = self._walkable
+        if cell in self._goals and walkable[cell]:
+            rhs = 0
+        elif walkable[cell]:
+            g = self._g
+            rhs = min([g.get(neighbour, INFINITY) for neighbour in self._neighbours(cell)
+                       if walkable[neighbour]], default=INFINITY) + 1
+        else:
+            rhs = INFINITY
+        self._rhs[cell] = rhs
+
+        self._open.pop(cell, None)
+        if self._g.get(cell, INFINITY) != rhs:
+            self._push(cell)
+
+    def _compute(self):
+        """
+        Expand cells until the robot's cell is consistent and nothing cheaper is queued.
+        """
+        heap = self._heap
+        open_cells = self._open
+        g = self._g
+        rhs = self._rhs
+        start = self._start
+        walkable = self._walkable
+        self.expanded = 0
+
+        while heap:
+            key, cell = heap[0]
+            if open_cells.get(cell) != key:
+                heapq.heappop(heap)
+                continue
+            if key >= self._key(start) and rhs.get(start, INFINITY) == g.get(start, INFINITY):
+                break
+
+            heapq.heappop(heap)
+            new_key = self._key(cell)
+            if key < new_key:
+                self._push(cell)
+                continue
+
+            del open_cells[cell]
+            self.expanded += 1
+            if g.get(cell, INFINITY) > rhs.get(cell, INFINITY):
+                g[cell] = rhs[cell]
+                for neighbour in self._neighbours(cell):
+                    if walkable[neighbour]:
+                        self._update(neighbour)
+            else:
+                g[cell] = INFINITY
+                self._update(cell)
+                for neighbour in self._neighbours(cell):
+                    if walkable[neighbour]:
+                        self._update(neighbour)
+
+    def path(self):
+        """
+        Get the current route from the robot to the destination.
+
+        Returns:
+            list: List of coordinates representing the path, or None if no path exists.
+        """
+        g = self._g
+        cell = self._start
+        if g.get(cell, INFINITY) == INFINITY or not self._walkable[cell]:
+            return None
+
+        path = [cell]
+        while cell not in self._goals:
+            cell = min(self._neighbours(cell), key=lambda neighbour: g.get(neighbour, INFINITY)
+                       if self._walkable[neighbour] else INFINITY)
+            if g.get(cell, INFINITY) == INFINITY or len(path) > len(g):
+                return None
+            path.append(cell)
+        return [self._search.position(cell) for cell in path]
+
+    def repair(self, position, changed):
+        """
+        Repair the route after the robot moved and cells of the map changed.
+
+        Args:
+            position (tuple): The robot's current coordinates (row, col).
+            changed (iterable): Coordinates (row, col) of the cells that were
+                blocked or unblocked since the last plan or repair.
+
+        Returns:
+            list: List of coordinates representing the path, or None if no path exists.
+        """
+        # Keys queued before the move stay valid lower bounds once raised by
+        # the distance moved, so the open list need not be reordered
+        start = self._search.index(position)
+        self._start = start
+        self._start_position = divmod(start - self._search.base, self._width)
+        self._modifier += self._heuristic(self._last)
+        self._last = start
+
+        for cell in map(self._search.index, changed):
+            self._update(cell)
+            for neighbour in self._neighbours(cell):
+                self._update(neighbour)
+        self._compute()
+        return self.path()
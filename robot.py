@@ -11,19 +11,47 @@ Features:
 - Pathfinding using Breadth-First Search (BFS) for determining the shortest path.
 - Inventory management for storing packages (supports Perishable, Fragile, and generic packages).
 - A user interface to display the map and delivery menu options.
-- A simulation of delivery speed for different types of packages.
+- A simulation of delivery speed for different types of packages, paced by a
+  pluggable clock that runs in real time, accelerated or instantly.
+- Multi-package inventories delivered on one planned tour, Perishable packages first.
+- A headless batch delivery mode that replays jobs without terminal output or sleeping.
+- Optional telemetry of the delivery loop: steps, deliveries, render time
+  and sleep time, recorded to the environment's telemetry.
+- An asyncio control loop and delivery stepping, so that one event loop can
+  drive many robots while still accepting commands.
 
 Classes:
     Robot: Represents the humanoid robot with delivery capabilities.
 """
 
 
-import time
-from interface import Interface
+import asyncio
+from collections import namedtuple
+from clock import RealTimeClock
+from interface import AsyncInterface, Interface
 from package import Package, Perishable, Fragile
+from tour import plan_tour
 from utils import generate_id
 
 
+PACKAGE_TYPES = {
+    "Package": Package,
+    "Perishable": Perishable,
+    "Fragile": Fragile
+}
+
+DeliveryResult = namedtuple('DeliveryResult', ['package_type', 'destination', 'path_length', 'duration'])
+DeliveryResult.__doc__ = """
+Outcome of one job delivered by `Robot.deliver_batch`.
+
+Attributes:
+    package_type (str): Name of the package class delivered.
+    destination (str): Destination department of the package.
+    path_length (int): Number of steps moved, or None if no path was found.
+    duration (float): Simulated delivery time in seconds, 0.0 if no path was found.
+"""
+
+
 class Robot:
     """
     Represents a humanoid robot for package delivery.
@@ -35,10 +63,12 @@ class Robot:
         position (tuple): The current (row, col) position of the robot.
         inventory (list): List of packages currently held by the robot.
         environment (Environment): The environment where the robot operates.
-        interface (Interface): User interface for interacting with the robot.
+        interface (Interface): User interface for interacting with the robot, or
+            None for a headless robot that draws nothing.
+        clock (Clock): Clock that paces the robot's movement.
     """
 
-    def __init__(self, name, model, manufacturer, environment):
+    def __init__(self, name, model, manufacturer, environment, clock=None, headless=False):
         """
         Initialise the robot with basic details and its operating environment.
 
@@ -47,6 +77,9 @@ class Robot:
             model (str): The model identifier of the robot.
             manufacturer (str): The manufacturer of the robot.
             environment (Environment): The operating environment of the robot.
+            clock (Clock, optional): Clock that paces the robot's movement. Defaults
+                to a real-time clock.
+            headless (bool): Run without a user interface, drawing nothing.
         """
         self._name = name
         self._model = model
@@ -54,7 +87,8 @@ class Robot:
         self.position = (6, 0)
         self.inventory = []
         self.environment = environment
-        self.interface = Interface()
+        self.interface = None if headless else Interface()
+        self.clock = clock or RealTimeClock()
 
     @property
     def name(self):
@@ -95,13 +129,67 @@ class Robot:
             user_choice = self.interface.display_menu(self.name)
 
             if user_choice == 1:
-                self.interface.display_map(self.environment.generate_map(self.position))
+                self._display_map(self.interface)
                 input("Press Enter to return to the main menu...")
             elif user_choice == 2:
                 self.delivery()
             elif user_choice == 3:
                 self.interface.shutdown()
 
+    async def start_up_async(self, interface=None):
+        """
+        Start up the robot and run the main menu on an event loop.
+
+        Works like `start_up`, but prompts and delivery steps are awaited, so
+        other robots and tasks on the same event loop keep running. The robot
+        gets its own interface back once the menu is left.
+
+        Args:
+            interface (AsyncInterface, optional): Interface to use. Defaults to
+                one fed from the terminal.
+        """
+        reader = None
+        if interface is None:
+            interface = AsyncInterface()
+            reader = asyncio.create_task(interface.read_terminal())
+        previous, self.interface = self.interface, interface
+
+        try:
+            await interface.boot_async(self.name, self.model, self.manufacturer)
+            while True:
+                user_choice = await interface.display_menu_async(self.name)
+
+                if user_choice == 1:
+                    self._display_map(interface)
+                    await interface.prompt("Press Enter to return to the main menu...")
+                elif user_choice == 2:
+                    department = await interface.display_delivery_menu_async()
+                    self.inventory.append(self._create_package(department))
+                    await self.deliver_inventory_async()
+                    self.inventory.clear()
+                    print("Delivery complete!")
+                    await interface.prompt("Press Enter to return to the main menu...")
+                elif user_choice == 3 and await interface.shutdown_async():
+                    return
+        finally:
+            self.interface = previous
+            if reader is not None:
+                reader.cancel()
+
+    def _display_map(self, interface):
+        """
+        Display the map with the robot's position, timing it when telemetry is enabled.
+
+        Args:
+            interface (Interface): Interface to display the map on.
+        """
+        telemetry = self.environment.telemetry
+        if telemetry is None:
+            interface.display_map(self.environment.generate_map(self.position))
+            return
+        with telemetry.timer('display_map.seconds'):
+            interface.display_map(self.environment.generate_map(self.position))
+
     def delivery(self):
         """
         Handle the delivery process, including package creation and navigation.
@@ -111,29 +199,260 @@ class Robot:
         department = self.interface.display_delivery_menu()
 
         if department:
-            package_id = generate_id()
+            self.inventory.append(self._create_package(department))
 
-            if department == "Medical Bay":
-                package = Perishable(package_id, department)
-            elif department == "Airlock":
-                package = Fragile(package_id, department)
-            else:
-                package = Package(package_id, department)
+            self.deliver_inventory()
 
-            self.inventory.append(package)
+            self.inventory.clear()
+            print("Delivery complete!")
+            input("Press Enter to return to the main menu...")
 
-            path = self.environment.find_path(self.position, self.inventory[0].destination)
+    def plan_tour(self):
+        """
+        Order the inventory into one tour across the departments of its packages.
 
-            if path:
-                for step in path:
-                    self.position = step
-                    map_str = self.environment.generate_map(self.position)
-                    self.interface.display_map(map_str)
-                    delivery_speed = self.inventory[0].get_delivery_speed()
-                    time.sleep(delivery_speed)
-            else:
+        Packages bound for the same department share a stop. Stops holding a
+        Perishable package are visited before all others, and within that
+        constraint the tour with the fewest steps is chosen, using the
+        department-to-department distances of the environment's route index.
+        Packages whose department cannot be reached are moved to the end.
+
+        Returns:
+            list: Destinations in visiting order, one per stop, unreachable ones last.
+        """
+        stops = {}
+        for package in self.inventory:
+            stops.setdefault(package.destination[:1].upper(), []).append(package)
+        if len(stops) <= 1:
+            return [packages[0].destination for packages in stops.values()]
+
+        index = self.environment.route_index
+        destinations = [packages[0].destination for packages in stops.values()]
+        start_costs = [index.distance(self.position, destination) for destination in destinations]
+        reachable = [stop for stop, cost in enumerate(start_costs) if cost is not None]
+        unreachable = [stop for stop, cost in enumerate(start_costs) if cost is None]
+
+        ranks = [
+            0 if any(isinstance(package, Perishable) for package in packages) else 1
+            for packages in stops.values()
+        ]
+        order = plan_tour(
+            [start_costs[stop] for stop in reachable],
+            [[index.department_distance(destinations[stop], destinations[other]) for other in reachable]
+             for stop in reachable],
+            [ranks[stop] for stop in reachable]
+        )
+        order = [reachable[stop] for stop in order] + unreachable
+
+        grouped = list(stops.values())
+        self.inventory[:] = [package for stop in order for package in grouped[stop]]
+        return [destinations[stop] for stop in order]
+
+    def deliver_inventory(self):
+        """
+        Deliver every package in the inventory on one planned tour.
+
+        Each leg takes the fastest route for the package about to be dropped
+        off, and the robot moves at that package's speed on the terrain of
+        each cell, displaying the map at each step. If cells are blocked or unblocked on
+        the way, the rest of the route is repaired incrementally. Packages
+        that cannot be delivered stay in the inventory.
+
+        Returns:
+            list: The packages delivered, in delivery order.
+        """
+        telemetry = self.environment.telemetry
+        steps = self._delivery_steps()
+        try:
+            while True:
+                seconds = next(steps)
+                if telemetry is None:
+                    self.clock.sleep(seconds)
+                    continue
+                with telemetry.timer('delivery.sleep_seconds'):
+                    self.clock.sleep(seconds)
+        except StopIteration as finished:
+            return finished.value
+
+    async def deliver_inventory_async(self):
+        """
+        Deliver every package in the inventory, awaiting the clock between steps.
+
+        Works like `deliver_inventory`, but other tasks on the event loop run
+        while the robot waits to take its next step.
+
+        Returns:
+            list: The packages delivered, in delivery order.
+        """
+        telemetry = self.environment.telemetry
+        steps = self._delivery_steps()
+        try:
+            while True:
+                seconds = next(steps)
+                if telemetry is None:
+                    await self.clock.sleep_async(seconds)
+                    continue
+                with telemetry.timer('delivery.sleep_seconds'):
+                    await self.clock.sleep_async(seconds)
+        except StopIteration as finished:
+            return finished.value
+
+    def _delivery_steps(self):
+        """
+        Move the robot along its tour, one step per iteration.
+
+        Yields:
+            float: Simulated seconds the step takes, for the caller to wait.
+
+        Returns:
+            list: The packages delivered, in delivery order.
+        """
+        delivered = []
+
+        # Packages leave the inventory as they are delivered, so if the tour is
+        # cut short the inventory holds exactly the packages not delivered
+        for destination in self.plan_tour():
+            department = destination[:1].upper()
+            on_board = [package for package in self.inventory
+                        if package.destination[:1].upper() == department]
+            path = self.environment.find_fastest_path(self.position, destination, on_board[0])
+
+            if path and (yield from self._walk(path, destination)):
+                delivered.extend(on_board)
+                self.inventory[:] = [package for package in self.inventory if package not in on_board]
+            elif self.interface is not None:
                 print("No path found.")
 
-            self.inventory.clear()
-            print("Delivery complete!")
-            input("Press Enter to return to the main menu...")
+            telemetry = self.environment.telemetry
+            if telemetry is not None:
+                telemetry.count('delivery.delivered' if on_board[0] in delivered else 'delivery.failed', len(on_board))
+
+        return delivered
+
+    def _walk(self, path, destination):
+        """
+        Walk a path, displaying the map at each step.
+
+        After each step, if the map changed, the rest of the route is repaired
+        by an incremental replanner, created on the first change.
+
+        Args:
+            path (list): Coordinates of the planned route, starting at the robot's position.
+            destination (str or tuple): Destination the route leads to.
+
+        Yields:
+            float: Simulated seconds each step takes, for the caller to wait.
+
+        Returns:
+            bool: True if the robot reached the destination, False if it was cut off.
+        """
+        environment = self.environment
+        telemetry = environment.telemetry
+        version = environment.version
+        planner = None
+        step = 0
+
+        while True:
+            self.position = path[step]
+            if self.interface is not None:
+                if telemetry is None:
+                    self.interface.display_frame(environment.frame(self.position))
+                else:
+                    with telemetry.timer('render.seconds'):
+                        self.interface.display_frame(environment.frame(self.position))
+            if telemetry is not None:
+                telemetry.count('delivery.steps')
+            yield environment.step_time(self.position, self.inventory[0])
+            if step == len(path) - 1:
+                return True
+
+            if environment.version != version:
+                if planner is None:
+                    planner = environment.replanner(self.position, destination)
+                    path = planner.path()
+                else:
+                    path = planner.repair(self.position, environment.changed_cells(version))
+                version = environment.version
+                if path is None:
+                    return False
+                if len(path) == 1:
+                    return True
+                step = 0
+            step += 1
+
+    def deliver_batch(self, jobs):
+        """
+        Deliver a batch of jobs without rendering the map or sleeping.
+
+        Each job starts where the previous one ended, as it would in
+        `delivery`, and its simulated duration is the time `delivery` would
+        have slept for it. Routes are the fastest for each package and are
+        reused for repeated (position, destination, package type) triples,
+        so long replays of historical jobs run in seconds.
+
+        Args:
+            jobs (iterable): (package type, department) pairs. The package type
+                is a package class or its name; None picks the type `delivery`
+                would use for the department.
+
+        Returns:
+            list: One DeliveryResult per job, in input order.
+
+        Raises:
+            ValueError: If a package type is not known.
+        """
+        routes = {}
+        results = []
+
+        for package_type, department in jobs:
+            package = self._create_package(department, package_type)
+            key = (self.position, department, type(package))
+            route = routes.get(key)
+            if route is None:
+                path = self.environment.find_fastest_path(self.position, department, package)
+                route = (len(path) - 1, path[-1], self.environment.travel_time(path, package)) if path else None
+                routes[key] = route
+
+            if route is None:
+                results.append(DeliveryResult(type(package).__name__, department, None, 0.0))
+                continue
+
+            steps, self.position, duration = route
+            results.append(DeliveryResult(type(package).__name__, department, steps, duration))
+
+        return results
+
+    @staticmethod
+    def _create_package(department, package_type=None, registry=None):
+        """
+        Create a package with a fresh ID for a department.
+
+        Args:
+            department (str): Destination department of the package.
+            package_type (type or str, optional): Package class or its name. By
+                default Medical Bay gets a Perishable package, Airlock a Fragile
+                one and every other department a generic package.
+            registry (PackageRegistry, optional): Registry that issues the ID and
+                tracks the package. Without one, the ID is random and may repeat.
+
+        Returns:
+            Package: The new package.
+
+        Raises:
+            ValueError: If the package type is not known.
+        """
+        if package_type is None:
+            if department == "Medical Bay":
+                package_type = Perishable
+            elif department == "Airlock":
+                package_type = Fragile
+            else:
+                package_type = Package
+        elif isinstance(package_type, str):
+            if package_type not in PACKAGE_TYPES:
+                raise ValueError(f"Unknown package type: {package_type}")
+            package_type = PACKAGE_TYPES[package_type]
+
+        if registry is not None:
+            return registry.create(package_type, department)
+        return package_type(generate_id(), department)
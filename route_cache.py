@@ -0,0 +1,147 @@
+"""
+route_cache.py
+
+This module defines the RouteCache class, a bounded cache of planned routes
+that lets repeated queries skip route planning entirely.
+
+Features:
+- Least-recently-used (LRU) eviction once the cache holds its capacity.
+- Hit and miss counters, with the hit rate derived from them.
+- Invalidation by map version: the cache empties itself as soon as it is
+  used with a version other than the one its routes were planned for.
+- Caches the absence of a route as well as routes themselves.
+
+Classes:
+    RouteCache: Bounded LRU cache of routes keyed by (start, destination).
+"""
+
+
+from collections import OrderedDict
+
+
+class RouteCache:
+    """
+    Bounded LRU cache of routes keyed by (start, destination).
+
+    Attributes:
+        capacity (int): Most routes held at once.
+        hits (int): Number of lookups answered from the cache.
+        misses (int): Number of lookups the cache could not answer.
+        evictions (int): Number of routes dropped to make room for newer ones.
+        invalidations (int): Number of times the cache emptied itself after a map change.
+    """
+
+    def __init__(self, capacity):
+        """
+        Initialise an empty cache.
+
+        Args:
+            capacity (int): Most routes held at once.
+
+        Raises:
+            ValueError: If the capacity is not positive.
+        """
+        if capacity < 1:
+            raise ValueError("A route cache needs room for at least one route")
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._routes = OrderedDict()
+        self._version = None
+
+    def __len__(self):
+        """
+        Get the number of routes held.
+
+        Returns:
+            int: Number of routes in the cache.
+        """
+        return len(self._routes)
+
+    @property
+    def hit_rate(self):
+        """
+        Get the share of lookups answered from the cache.
+
+        Returns:
+            float: Hits divided by lookups, 0.0 before the first lookup.
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def _check_version(self, version):
+        """
+        Empty the cache if the map version differs from the one its routes were planned for.
+
+        Args:
+            version (int): Current map version.
+        """
+        if version != self._version:
+            if self._routes:
+                self._routes.clear()
+                self.invalidations += 1
+            self._version = version
+
+    def get(self, key, version):
+        """
+        Look a route up and mark it as the most recently used.
+
+        Args:
+            key (tuple): Start coordinates and destination of the route.
+            version (int): Current map version.
+
+        Returns:
+            tuple: True and the cached route, which is None when no route
+                exists, or False and None on a miss.
+        """
+        self._check_version(version)
+        try:
+            route = self._routes[key]
+        except KeyError:
+            self.misses += 1
+            return False, None
+        self._routes.move_to_end(key)
+        self.hits += 1
+        return True, route
+
+    def put(self, key, version, route):
+        """
+        Store a route, evicting the least recently used one if the cache is full.
+
+        Args:
+            key (tuple): Start coordinates and destination of the route.
+            version (int): Map version the route was planned for.
+            route (tuple): Coordinates of the route, or None if no route exists.
+        """
+        self._check_version(version)
+        self._routes[key] = route
+        self._routes.move_to_end(key)
+        if len(self._routes) > self.capacity:
+            self._routes.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """
+        Drop every route and reset the counters.
+        """
+        self._routes.clear()
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def stats(self):
+        """
+        Summarise the cache counters.
+
+        Returns:
+            dict: Size, capacity, hits, misses, hit rate, evictions and invalidations.
+        """
+        return {
+            'size': len(self._routes),
+            'capacity': self.capacity,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations
+        }
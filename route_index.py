@@ -0,0 +1,161 @@
+"""
+route_index.py
+
+This module defines the RouteIndex class, which precomputes the routes from
+every walkable cell of a map to each department on that map.
+
+Features:
+- A Breadth-First Search (BFS) distance field per department, seeded from
+  every cell of that department at once.
+- Routes recovered by walking down a distance field, at a cost proportional
+  to the length of the route. Ties are broken in the neighbour order of the
+  BFS search, so a route is the same one a search from its start would find.
+- Distance fields built all at once, or per department on its first query.
+- Department-to-department distances for planning multi-stop tours.
+
+Classes:
+    RouteIndex: Distance fields towards each department.
+"""
+
+
+class RouteIndex:
+    """
+    Precomputed routes from every walkable cell to each department.
+    """
+
+    def __init__(self, search, departments):
+        """
+        Set up the index for a map. Distance fields are built on first use.
+
+        Args:
+            search (GridSearch): Search engine over the map's walkable mask.
+            departments (dict): Department letter mapped to the flat indices of its cells.
+        """
+        self._search = search
+        self._departments = departments
+        self._fields = {}
+        self._between = {}
+
+    @property
+    def departments(self):
+        """
+        Get the department letters found on the map.
+
+        Returns:
+            list: Sorted list of department letters.
+        """
+        return sorted(self._departments)
+
+    def build(self):
+        """
+        Build the distance field of every department that does not have one yet.
+        """
+        for department in self._departments:
+            self._field(department)
+
+    def _field(self, department):
+        """
+        Get the distance field of a department, building it on first use.
+
+        Args:
+            department (str): Department letter.
+
+        Returns:
+            array: Steps from each flat cell to the department, -1 where unreachable.
+        """
+        field = self._fields.get(department)
+        if field is None:
+            field = self._search.distance_field(self._departments[department])
+            self._fields[department] = field
+        return field
+
+    def covers(self, position, destination):
+        """
+        Check whether a query can be answered from the index.
+
+        Args:
+            position (tuple): Starting coordinates (row, col).
+            destination (str or tuple): Target destination name or character,
+                or target coordinates.
+
+        Returns:
+            bool: True if the start is walkable and the destination is a department.
+        """
+        if not isinstance(destination, str) or destination[:1].upper() not in self._departments:
+            return False
+        cell = self._search.index(position)
+        return cell is not None and self._search.is_walkable(cell)
+
+    def distance(self, position, destination):
+        """
+        Get the number of steps from a position to a department.
+
+        Args:
+            position (tuple): Starting coordinates (row, col).
+            destination (str): Target destination name or character.
+
+        Returns:
+            int: Number of steps, or None if the department cannot be reached.
+        """
+        if not self.covers(position, destination):
+            return None
+        distance = self._field(destination[0].upper())
+        steps = distance[self._search.index(position)]
+        return steps if steps >= 0 else None
+
+    def department_distance(self, origin, destination):
+        """
+        Get the number of steps between the nearest cells of two departments.
+
+        Args:
+            origin (str): Origin department name or character.
+            destination (str): Target department name or character.
+
+        Returns:
+            int: Number of steps, or None if either department is not on the map
+                or they are not connected.
+        """
+        origin = origin[:1].upper()
+        destination = destination[:1].upper()
+        if origin not in self._departments or destination not in self._departments:
+            return None
+
+        key = (origin, destination)
+        if key not in self._between:
+            distance = self._field(destination)
+            reachable = [distance[cell] for cell in self._departments[origin] if distance[cell] >= 0]
+            self._between[key] = min(reachable) if reachable else None
+        return self._between[key]
+
+    def path(self, position, destination):
+        """
+        Recover the route from a position to a department.
+
+        Args:
+            position (tuple): Starting coordinates (row, col).
+            destination (str): Target destination name or character.
+
+        Returns:
+            list: List of coordinates representing the path, or None if no path exists.
+        """
+        if not self.covers(position, destination):
+            return None
+        distance = self._field(destination[0].upper())
+        cell = self._search.index(position)
+        steps = distance[cell]
+        if steps < 0:
+            return None
+
+        # Step to the first neighbour one step closer, in the order right, down,
+        # left, up, which gives the path a BFS from the position would find
+        to_position = self._search.position
+        width = self._search.width
+        path = [to_position(cell)]
+        while steps:
+            steps -= 1
+            for neighbour in (cell + 1, cell + width, cell - 1, cell - width):
+                if distance[neighbour] == steps:
+                    cell = neighbour
+                    break
+            path.append(to_position(cell))
+        return path
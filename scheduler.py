@@ -0,0 +1,255 @@
+"""
+scheduler.py
+
+This module defines the Scheduler class, which decides which queued delivery
+job goes to which free robot, and tracks whether each job met its deadline.
+
+Features:
+- A binary heap of queued jobs keyed on deadline, then package class, so the
+  most urgent job is always dispatched first. A first-in, first-out policy is
+  available for comparison.
+- Deadlines derived from a service-level agreement (SLA) per package type,
+  or given per job.
+- Each job goes to the nearest free robot by the precomputed distances of
+  the environment's route index, so choosing a robot runs no searches.
+- A report of SLA hits and misses, overall and per package type, with the
+  worst lateness.
+
+Classes:
+    Scheduler: Priority queue of delivery jobs with deadline tracking.
+"""
+
+
+import heapq
+import itertools
+from collections import namedtuple
+
+
+POLICIES = ('deadline', 'fifo')
+
+# Seconds from submission within which each package type must be delivered
+DEFAULT_SLA = {
+    "Perishable": 120.0,
+    "Fragile": 600.0,
+    "Package": 900.0
+}
+
+# Package classes served first when deadlines are equal, lower first
+CLASS_RANK = {
+    "Perishable": 0,
+    "Fragile": 1,
+    "Package": 2
+}
+
+Job = namedtuple('Job', ['package', 'submitted', 'deadline'])
+Job.__doc__ = """
+A delivery job waiting for, or assigned to, a robot.
+
+Attributes:
+    package (Package): The package to deliver.
+    submitted (float): Simulated time the job was submitted.
+    deadline (float): Simulated time by which the package must be delivered.
+"""
+
+
+class Scheduler:
+    """
+    Priority queue of delivery jobs with deadline tracking.
+
+    Attributes:
+        environment (Environment): The environment whose route index gives robot distances.
+        sla (dict): Package class name mapped to the seconds allowed for its delivery.
+        policy (str): 'deadline' for earliest deadline first, 'fifo' for submission order.
+        on_time (int): Number of jobs delivered by their deadline.
+        late (int): Number of jobs delivered after their deadline.
+        failed (int): Number of jobs whose destination no robot could reach.
+        max_lateness (float): Most seconds a job was delivered after its deadline.
+    """
+
+    def __init__(self, environment, sla=None, policy='deadline'):
+        """
+        Initialise an empty scheduler.
+
+        Args:
+            environment (Environment): The environment whose route index gives robot distances.
+            sla (dict, optional): Package class name mapped to the seconds
+                allowed for its delivery. Defaults to DEFAULT_SLA; types not
+                listed get the longest allowance of the table.
+            policy (str): 'deadline' or 'fifo'.
+
+        Raises:
+            ValueError: If the policy is unknown.
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown scheduling policy: {policy}")
+        self.environment = environment
+        self.sla = dict(DEFAULT_SLA if sla is None else sla)
+        self.policy = policy
+        self.on_time = 0
+        self.late = 0
+        self.failed = 0
+        self.max_lateness = 0.0
+        self._heap = []
+        self._order = itertools.count()
+        self._by_type = {}
+
+    def __len__(self):
+        """
+        Get the number of queued jobs.
+
+        Returns:
+            int: Number of jobs waiting for a robot.
+        """
+        return len(self._heap)
+
+    def submit(self, package, now, deadline=None):
+        """
+        Queue a delivery job.
+
+        Args:
+            package (Package): The package to deliver.
+            now (float): Simulated time of submission.
+            deadline (float, optional): Simulated time by which the package must
+                be delivered. Defaults to now plus the SLA of its type.
+
+        Returns:
+            Job: The queued job.
+        """
+        kind = type(package).__name__
+        if deadline is None:
+            deadline = now + self.sla.get(kind, max(self.sla.values(), default=0.0))
+        job = Job(package, now, deadline)
+        heapq.heappush(self._heap, (self._key(job, next(self._order)), job))
+        return job
+
+    def _key(self, job, order):
+        """
+        Get the heap key of a job.
+
+        Args:
+            job (Job): The job.
+            order (int): Number of jobs submitted before it.
+
+        Returns:
+            tuple: The submission order under the fifo policy, otherwise the
+                deadline, then the class rank, then the submission order.
+        """
+        if self.policy == 'fifo':
+            return (order,)
+        return (job.deadline, CLASS_RANK.get(type(job.package).__name__, len(CLASS_RANK)), order)
+
+    def assign(self, idle, on_fail=None):
+        """
+        Hand the most urgent queued jobs to the nearest free robots.
+
+        Jobs are taken in priority order while robots are free. Each goes to
+        the free robot with the fewest steps to its destination; a job that
+        no free robot can reach is counted as failed.
+
+        Args:
+            idle (dict): Identifier of each free robot mapped to its position.
+            on_fail (callable, optional): Called with each job no free robot can
+                reach, in place of `fail`. It must record the failure itself.
+
+        Returns:
+            list: (robot identifier, Job) pairs, in the order the jobs were taken.
+        """
+        idle = dict(idle)
+        assignments = []
+
+        while idle and self._heap:
+            _, job = heapq.heappop(self._heap)
+            destination = job.package.destination
+            distances = [(self._distance(position, destination), robot) for robot, position in idle.items()]
+            reachable = [(steps, robot) for steps, robot in distances if steps is not None]
+            if not reachable:
+                (on_fail or self.fail)(job)
+                continue
+
+            _, robot = min(reachable, key=lambda entry: entry[0])
+            del idle[robot]
+            assignments.append((robot, job))
+        return assignments
+
+    def _distance(self, position, destination):
+        """
+        Get the number of steps from a robot to a destination.
+
+        Args:
+            position (tuple): The robot's coordinates (row, col).
+            destination (str): Destination department.
+
+        Returns:
+            int: Number of steps, or None if the destination cannot be reached.
+        """
+        index = self.environment.route_index
+        if index.covers(position, destination):
+            return index.distance(position, destination)
+        path = self.environment.find_path(position, destination)
+        return len(path) - 1 if path is not None else None
+
+    def complete(self, job, now):
+        """
+        Record the delivery of a job.
+
+        Args:
+            job (Job): The job delivered.
+            now (float): Simulated time of delivery.
+
+        Returns:
+            bool: True if the job met its deadline.
+        """
+        return self._record(job, now)
+
+    def fail(self, job):
+        """
+        Record a job that could not be delivered.
+
+        Args:
+            job (Job): The job given up on.
+        """
+        self._record(job, None)
+
+    def _record(self, job, delivered):
+        """
+        Count the outcome of a job, overall and for its package type.
+
+        Args:
+            job (Job): The job.
+            delivered (float): Simulated time of delivery, or None if it failed.
+
+        Returns:
+            bool: True if the job met its deadline.
+        """
+        counts = self._by_type.setdefault(type(job.package).__name__, {'on_time': 0, 'late': 0, 'failed': 0})
+        if delivered is None:
+            outcome = 'failed'
+        elif delivered <= job.deadline:
+            outcome = 'on_time'
+        else:
+            outcome = 'late'
+            self.max_lateness = max(self.max_lateness, delivered - job.deadline)
+        counts[outcome] += 1
+        setattr(self, outcome, getattr(self, outcome) + 1)
+        return outcome == 'on_time'
+
+    def report(self):
+        """
+        Summarise the SLA hits and misses so far.
+
+        Returns:
+            dict: Queued, on-time, late and failed job counts, the share of
+                finished jobs delivered on time, the worst lateness in seconds
+                and the same counts per package type.
+        """
+        finished = self.on_time + self.late + self.failed
+        return {
+            'policy': self.policy,
+            'queued': len(self._heap),
+            'on_time': self.on_time,
+            'late': self.late,
+            'failed': self.failed,
+            'hit_rate': self.on_time / finished if finished else 0.0,
+            'max_lateness': self.max_lateness,
+            'by_type': {kind: dict(counts) for kind, counts in sorted(self._by_type.items())}
+        }
@@ -0,0 +1,783 @@
+"""
+snapshot.py
+
+This module saves and restores the whole state of a fleet simulation, and
+records the events of a run so that it can be replayed exactly.
+
+Features:
+- Compact binary snapshots of a fleet: the environment grid, every robot's
+  position, inventory, route and progress, the queued jobs and package
+  batches, the scheduler's heap and counters, the cooperative planner's
+  reservations, and the state of the random number generators. Snapshots
+  are compressed with zlib and take a few milliseconds to save or restore.
+- A restored fleet carries on exactly as the original would have, so a long
+  run can resume from a checkpoint instead of starting over.
+- A seeded, append-only event log of JSON lines that records the jobs
+  submitted to a fleet, the checkpoints taken and the runs made.
+- Replay of an event log from its latest checkpoint, so that a slow or
+  wrong run can be reproduced tick for tick without rerunning it in full.
+
+The snapshot format is the magic bytes b'ASTRIDSN' and a little-endian
+format version, followed by the zlib-compressed fields of the fleet.
+
+Classes:
+    EventLog: Append-only log of the events of a fleet run.
+
+Functions:
+    dumps: Encodes a fleet as the bytes of a snapshot.
+    loads: Restores a fleet from the bytes of a snapshot.
+    save_snapshot: Saves a snapshot of a fleet to a file.
+    load_snapshot: Restores a fleet from a snapshot file.
+    checkpoint: Saves a snapshot of a fleet and records it in the fleet's event log.
+    replay: Replays an event log from its latest checkpoint.
+"""
+
+
+import itertools
+import json
+import os
+import random
+import struct
+import zlib
+from collections import deque
+from environment import Environment
+from fleet import Fleet
+from package import PackageBatch
+from robot import PACKAGE_TYPES
+from scheduler import Job, Scheduler
+
+
+MAGIC = b'ASTRIDSN'
+FORMAT_VERSION = 3
+HEADER = struct.Struct('<8sH')
+
+INTEGER = struct.Struct('<q')
+NUMBER = struct.Struct('<d')
+FLAG = struct.Struct('<B')
+
+
+class _Writer:
+    """
+    Encodes the fields of a snapshot, in order.
+    """
+
+    def __init__(self):
+        """
+        Initialise an empty writer.
+        """
+        self._parts = []
+
+    def getvalue(self):
+        """
+        Get the fields written so far.
+
+        Returns:
+            bytes: The encoded fields.
+        """
+        return b''.join(self._parts)
+
+    def integer(self, value):
+        """
+        Write a signed integer.
+
+        Args:
+            value (int): The integer.
+        """
+        self._parts.append(INTEGER.pack(value))
+
+    def number(self, value):
+        """
+        Write a floating-point number.
+
+        Args:
+            value (float): The number.
+        """
+        self._parts.append(NUMBER.pack(value))
+
+    def flag(self, value):
+        """
+        Write a boolean.
+
+        Args:
+            value (bool): The boolean.
+        """
+        self._parts.append(FLAG.pack(bool(value)))
+
+    def blob(self, value):
+        """
+        Write a byte string with its length.
+
+        Args:
+            value (bytes): The bytes.
+        """
+        self.integer(len(value))
+        self._parts.append(bytes(value))
+
+    def text(self, value):
+        """
+        Write a string with its length.
+
+        Args:
+            value (str): The string.
+        """
+        self.blob(value.encode('utf-8'))
+
+    def optional(self, value, write):
+        """
+        Write a value that may be None.
+
+        Args:
+            value: The value, or None.
+            write (callable): Writer method for the value when it is not None.
+        """
+        self.flag(value is not None)
+        if value is not None:
+            write(value)
+
+    def cells(self, cells):
+        """
+        Write a list of cells with its length.
+
+        Args:
+            cells (list): Coordinates (row, col) of the cells.
+        """
+        self.integer(len(cells))
+        self._parts.append(struct.pack(f'<{2 * len(cells)}i', *itertools.chain.from_iterable(cells)))
+
+    def package(self, package):
+        """
+        Write a package: its class name, identifier and destination.
+
+        Args:
+            package (Package): The package.
+        """
+        self.text(type(package).__name__)
+        package_id = package.package_id
+        self.flag(isinstance(package_id, int))
+        if isinstance(package_id, int):
+            self.integer(package_id)
+        else:
+            self.text(str(package_id))
+        self.text(package.destination)
+
+    def job(self, job):
+        """
+        Write a scheduler job.
+
+        Args:
+            job (Job): The job.
+        """
+        self.package(job.package)
+        self.number(job.submitted)
+        self.number(job.deadline)
+
+    def batch(self, batch):
+        """
+        Write the packages left in a package batch, as its arrays.
+
+        Args:
+            batch (PackageBatch): The batch.
+        """
+        self.integer(len(batch.destinations))
+        for destination in batch.destinations:
+            self.text(destination)
+        for column in (batch._ids, batch._destination_codes, batch._class_codes):
+            self.blob(column[batch._start:].tobytes())
+
+    def random_state(self, state):
+        """
+        Write the state of a random number generator.
+
+        Args:
+            state (tuple): The state, as returned by `random.Random.getstate`.
+        """
+        version, internal, gauss_next = state
+        self.integer(version)
+        self.integer(len(internal))
+        self._parts.append(struct.pack(f'<{len(internal)}I', *internal))
+        self.optional(gauss_next, self.number)
+
+
+class _Reader:
+    """
+    Decodes the fields of a snapshot, in the order they were written.
+    """
+
+    def __init__(self, data):
+        """
+        Initialise a reader at the start of the fields.
+
+        Args:
+            data (bytes): The encoded fields.
+        """
+        self._data = data
+        self._offset = 0
+
+    def _unpack(self, layout):
+        """
+        Read one fixed-size field.
+
+        Args:
+            layout (struct.Struct): Layout of the field.
+
+        Returns:
+            tuple: The values of the field.
+
+        Raises:
+            ValueError: If the data ends inside the field.
+        """
+        try:
+            values = layout.unpack_from(self._data, self._offset)
+        except struct.error as error:
+            raise ValueError("Truncated snapshot") from error
+        self._offset += layout.size
+        return values
+
+    def integer(self):
+        """
+        Read a signed integer.
+
+        Returns:
+            int: The integer.
+        """
+        return self._unpack(INTEGER)[0]
+
+    def number(self):
+        """
+        Read a floating-point number.
+
+        Returns:
+            float: The number.
+        """
+        return self._unpack(NUMBER)[0]
+
+    def flag(self):
+        """
+        Read a boolean.
+
+        Returns:
+            bool: The boolean.
+        """
+        return bool(self._unpack(FLAG)[0])
+
+    def blob(self):
+        """
+        Read a byte string.
+
+        Returns:
+            bytes: The bytes.
+
+        Raises:
+            ValueError: If the data ends inside the byte string.
+        """
+        size = self.integer()
+        value = self._data[self._offset:self._offset + size]
+        if len(value) != size:
+            raise ValueError("Truncated snapshot")
+        self._offset += size
+        return value
+
+    def text(self):
+        """
+        Read a string.
+
+        Returns:
+            str: The string.
+        """
+        return self.blob().decode('utf-8')
+
+    def optional(self, read):
+        """
+        Read a value that may be None.
+
+        Args:
+            read (callable): Reader method for the value.
+
+        Returns:
+            The value, or None.
+        """
+        return read() if self.flag() else None
+
+    def cells(self):
+        """
+        Read a list of cells.
+
+        Returns:
+            list: Coordinates (row, col) of the cells.
+        """
+        count = self.integer()
+        values = self._unpack(struct.Struct(f'<{2 * count}i'))
+        return list(zip(values[0::2], values[1::2]))
+
+    def package(self):
+        """
+        Read a package.
+
+        Returns:
+            Package: A new package of the class, identifier and destination written.
+
+        Raises:
+            ValueError: If the package class is not known.
+        """
+        kind = self.text()
+        package_id = self.integer() if self.flag() else self.text()
+        destination = self.text()
+        if kind not in PACKAGE_TYPES:
+            raise ValueError(f"Unknown package type in snapshot: {kind}")
+        return PACKAGE_TYPES[kind](package_id, destination)
+
+    def job(self):
+        """
+        Read a scheduler job.
+
+        Returns:
+            Job: The job.
+        """
+        return Job(self.package(), self.number(), self.number())
+
+    def batch(self):
+        """
+        Read a package batch.
+
+        Returns:
+            PackageBatch: The batch.
+        """
+        batch = PackageBatch()
+        for _ in range(self.integer()):
+            batch._destination_code(self.text())
+        for column in (batch._ids, batch._destination_codes, batch._class_codes):
+            column.frombytes(self.blob())
+        return batch
+
+    def random_state(self):
+        """
+        Read the state of a random number generator.
+
+        Returns:
+            tuple: The state, for `random.Random.setstate`.
+        """
+        version = self.integer()
+        count = self.integer()
+        internal = self._unpack(struct.Struct(f'<{count}I'))
+        return version, internal, self.optional(self.number)
+
+
+def dumps(fleet):
+    """
+    Encode a fleet as the bytes of a snapshot.
+
+    The snapshot holds the state of the module-level random number
+    generator too, which package identifiers are drawn from.
+
+    Args:
+        fleet (Fleet): The fleet, between two ticks.
+
+    Returns:
+        bytes: The snapshot.
+    """
+    writer = _Writer()
+    environment = fleet.environment
+    writer.text(environment.strategy)
+    writer.blob(environment.to_bytes())
+
+    planner = fleet.planner
+    writer.integer(len(fleet.robots))
+    writer.number(fleet.tick_seconds)
+    writer.integer(fleet.patience)
+    writer.cells([fleet.home])
+    writer.flag(planner is not None)
+    writer.integer(fleet.window)
+    writer.integer(fleet.stall_ticks)
+    writer.optional(fleet.strategy, writer.text)
+    for value in (fleet.ticks, fleet.delivered, fleet.failed, fleet.blocked_ticks, fleet.stalls, fleet._progressed):
+        writer.integer(value)
+    writer.number(fleet.wall_seconds)
+    writer.random_state(random.getstate())
+    writer.random_state(fleet._random.getstate())
+
+    for number, robot in enumerate(fleet.robots):
+        writer.cells([robot.position])
+        writer.integer(len(robot.inventory))
+        for package in robot.inventory:
+            writer.package(package)
+        writer.optional(fleet._paths[number], writer.cells)
+        writer.integer(fleet._steps[number])
+        writer.number(fleet._progress[number])
+        writer.integer(fleet._waited[number])
+        writer.integer(fleet._assigned[number])
+        writer.optional(fleet._jobs[number], writer.job)
+        writer.optional(fleet._planned[number], writer.integer)
+        writer.optional(fleet._stuck[number], writer.integer)
+        writer.integer(fleet._detours[number])
+        writer.optional(fleet._closest[number], writer.integer)
+
+    writer.integer(len(fleet.jobs))
+    for entry in fleet.jobs:
+        writer.flag(isinstance(entry, PackageBatch))
+        if isinstance(entry, PackageBatch):
+            writer.batch(entry)
+        else:
+            writer.package(entry)
+
+    scheduler = fleet.scheduler
+    writer.flag(scheduler is not None)
+    if scheduler is not None:
+        _dump_scheduler(writer, scheduler)
+    if planner is not None:
+        _dump_reservations(writer, planner.reservations)
+
+    return HEADER.pack(MAGIC, FORMAT_VERSION) + zlib.compress(writer.getvalue())
+
+
+def loads(data, clock=None):
+    """
+    Restore a fleet from the bytes of a snapshot.
+
+    The module-level random number generator is restored to its state when
+    the snapshot was taken.
+
+    Args:
+        data (bytes): The snapshot, see `dumps`.
+        clock (Clock, optional): Clock that paces the restored fleet. Defaults
+            to a discrete-event clock that never waits.
+
+    Returns:
+        Fleet: A fleet in the state of the snapshot, over its own environment.
+
+    Raises:
+        ValueError: If the data is not a valid snapshot.
+    """
+    if len(data) < HEADER.size:
+        raise ValueError("Truncated snapshot")
+    magic, version = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not a fleet snapshot")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported snapshot version: {version}")
+    try:
+        reader = _Reader(zlib.decompress(data[HEADER.size:]))
+    except zlib.error as error:
+        raise ValueError("Corrupt snapshot") from error
+
+    strategy = reader.text()
+    environment = Environment.from_bytes(reader.blob(), strategy)
+    size = reader.integer()
+    tick_seconds = reader.number()
+    patience = reader.integer()
+    home = reader.cells()[0]
+    cooperative = reader.flag()
+    window = reader.integer()
+    fleet = Fleet(environment, size, tick_seconds, patience, home, clock,
+                  cooperative=cooperative, window=window, stall_ticks=reader.integer(),
+                  strategy=reader.optional(reader.text))
+    (fleet.ticks, fleet.delivered, fleet.failed, fleet.blocked_ticks, fleet.stalls,
+     fleet._progressed) = (reader.integer() for _ in range(6))
+    fleet.wall_seconds = reader.number()
+    random.setstate(reader.random_state())
+    fleet._random.setstate(reader.random_state())
+
+    for number, robot in enumerate(fleet.robots):
+        robot.position = reader.cells()[0]
+        robot.inventory = [reader.package() for _ in range(reader.integer())]
+        fleet._paths[number] = reader.optional(reader.cells)
+        fleet._steps[number] = reader.integer()
+        fleet._progress[number] = reader.number()
+        fleet._waited[number] = reader.integer()
+        fleet._assigned[number] = reader.integer()
+        fleet._jobs[number] = reader.optional(reader.job)
+        fleet._planned[number] = reader.optional(reader.integer)
+        fleet._stuck[number] = reader.optional(reader.integer)
+        fleet._detours[number] = reader.integer()
+        fleet._closest[number] = reader.optional(reader.integer)
+        # The robot's job carries the very package it holds, as in the original fleet
+        if fleet._jobs[number] is not None and robot.inventory:
+            fleet._jobs[number] = fleet._jobs[number]._replace(package=robot.inventory[0])
+
+    fleet.jobs = deque(reader.batch() if reader.flag() else reader.package() for _ in range(reader.integer()))
+    fleet._batched = sum(len(entry) - 1 for entry in fleet.jobs if isinstance(entry, PackageBatch))
+    if reader.flag():
+        fleet.scheduler = _load_scheduler(reader, environment)
+    if fleet.planner is not None:
+        _load_reservations(reader, fleet.planner.reservations)
+    return fleet
+
+
+def _dump_scheduler(writer, scheduler):
+    """
+    Write a scheduler's settings, counters and queued jobs.
+
+    Args:
+        writer (_Writer): The snapshot writer.
+        scheduler (Scheduler): The scheduler.
+    """
+    writer.text(scheduler.policy)
+    writer.integer(len(scheduler.sla))
+    for kind, seconds in scheduler.sla.items():
+        writer.text(kind)
+        writer.number(seconds)
+    for value in (scheduler.on_time, scheduler.late, scheduler.failed):
+        writer.integer(value)
+    writer.number(scheduler.max_lateness)
+
+    # Reading the counter consumes it, so carry on from the same number
+    order = next(scheduler._order)
+    scheduler._order = itertools.count(order)
+    writer.integer(order)
+
+    writer.integer(len(scheduler._heap))
+    for key, job in scheduler._heap:
+        writer.integer(key[-1])
+        writer.job(job)
+
+    writer.integer(len(scheduler._by_type))
+    for kind, counts in scheduler._by_type.items():
+        writer.text(kind)
+        for outcome in ('on_time', 'late', 'failed'):
+            writer.integer(counts[outcome])
+
+
+def _load_scheduler(reader, environment):
+    """
+    Read a scheduler written by `_dump_scheduler`.
+
+    Args:
+        reader (_Reader): The snapshot reader.
+        environment (Environment): The environment of the restored fleet.
+
+    Returns:
+        Scheduler: The scheduler, with its queue in the same heap order.
+    """
+    policy = reader.text()
+    sla = {reader.text(): reader.number() for _ in range(reader.integer())}
+    scheduler = Scheduler(environment, sla, policy)
+    scheduler.on_time, scheduler.late, scheduler.failed = (reader.integer() for _ in range(3))
+    scheduler.max_lateness = reader.number()
+    scheduler._order = itertools.count(reader.integer())
+
+    for _ in range(reader.integer()):
+        order = reader.integer()
+        job = reader.job()
+        scheduler._heap.append((scheduler._key(job, order), job))
+
+    for _ in range(reader.integer()):
+        kind = reader.text()
+        scheduler._by_type[kind] = {outcome: reader.integer() for outcome in ('on_time', 'late', 'failed')}
+    return scheduler
+
+
+def _dump_reservations(writer, reservations):
+    """
+    Write every reservation of a reservation table, by owner.
+
+    Args:
+        writer (_Writer): The snapshot writer.
+        reservations (ReservationTable): The table.
+    """
+    writer.integer(len(reservations._owned))
+    for owner, entries in reservations._owned.items():
+        writer.integer(owner)
+        cells = [key for table, key in entries if table is reservations._cells]
+        moves = [key for table, key in entries if table is reservations._moves]
+        writer.integer(len(cells))
+        for cell, tick in cells:
+            writer.cells([cell])
+            writer.integer(tick)
+        writer.integer(len(moves))
+        for source, target, tick in moves:
+            writer.cells([source, target])
+            writer.integer(tick)
+
+
+def _load_reservations(reader, reservations):
+    """
+    Read the reservations written by `_dump_reservations` into an empty table.
+
+    Args:
+        reader (_Reader): The snapshot reader.
+        reservations (ReservationTable): The table.
+    """
+    for _ in range(reader.integer()):
+        owner = reader.integer()
+        owned = reservations._owned[owner] = []
+        for _ in range(reader.integer()):
+            key = (reader.cells()[0], reader.integer())
+            reservations._cells[key] = owner
+            owned.append((reservations._cells, key))
+        for _ in range(reader.integer()):
+            key = tuple(reader.cells()) + (reader.integer(),)
+            reservations._moves[key] = owner
+            owned.append((reservations._moves, key))
+
+
+def save_snapshot(fleet, path):
+    """
+    Save a snapshot of a fleet to a file.
+
+    Args:
+        fleet (Fleet): The fleet, between two ticks.
+        path (str): Path of the snapshot file.
+    """
+    with open(path, 'wb') as snapshot_file:
+        snapshot_file.write(dumps(fleet))
+
+
+def load_snapshot(path, clock=None):
+    """
+    Restore a fleet from a snapshot file.
+
+    Args:
+        path (str): Path of the snapshot file.
+        clock (Clock, optional): Clock that paces the restored fleet.
+
+    Returns:
+        Fleet: A fleet in the state of the snapshot.
+
+    Raises:
+        ValueError: If the file is not a valid snapshot.
+    """
+    with open(path, 'rb') as snapshot_file:
+        return loads(snapshot_file.read(), clock)
+
+
+def checkpoint(fleet, path):
+    """
+    Save a snapshot of a fleet and record it in the fleet's event log, if it has one.
+
+    Args:
+        fleet (Fleet): The fleet, between two ticks.
+        path (str): Path of the snapshot file.
+    """
+    save_snapshot(fleet, path)
+    if fleet.event_log is not None:
+        fleet.event_log.record('checkpoint', fleet.ticks, path=fleet.event_log.relative(path))
+
+
+class EventLog:
+    """
+    Append-only log of the events of a fleet run, one JSON object per line.
+
+    Every event holds its name and the tick it happened on. A new log starts
+    with a 'start' event holding the seed of the module-level random number
+    generator, which the log seeds, so that package identifiers drawn from it
+    repeat from run to run. Attach the log to a fleet as its `event_log`, and
+    the fleet records every job submitted and every run.
+
+    Attributes:
+        path (str): Path of the log file.
+        seed (int): Seed of the run, or None if the run was not seeded.
+    """
+
+    def __init__(self, path, seed=None):
+        """
+        Open a log, appending to it if it exists.
+
+        Args:
+            path (str): Path of the log file.
+            seed (int, optional): Seed for the module-level random number
+                generator. Only used when the log is new.
+        """
+        self.path = path
+        started = os.path.exists(path) and os.path.getsize(path) > 0
+        self.seed = self.read(path)[0].get('seed') if started else seed
+        self._stream = open(path, 'a')
+        if not started:
+            if seed is not None:
+                random.seed(seed)
+            self.record('start', 0, seed=seed)
+
+    def record(self, event, tick, **fields):
+        """
+        Append an event to the log.
+
+        Args:
+            event (str): Name of the event.
+            tick (int): Tick the event happened on.
+            **fields: Other fields of the event, encodable as JSON.
+        """
+        self._stream.write(json.dumps(dict(fields, event=event, tick=tick)) + '\n')
+        self._stream.flush()
+
+    def relative(self, path):
+        """
+        Express a path relative to the directory of the log.
+
+        Args:
+            path (str): The path.
+
+        Returns:
+            str: The path from the log's directory.
+        """
+        return os.path.relpath(path, os.path.dirname(os.path.abspath(self.path)))
+
+    def events(self):
+        """
+        Read every event recorded so far.
+
+        Returns:
+            list: The events, in the order they were recorded.
+        """
+        self._stream.flush()
+        return self.read(self.path)
+
+    @staticmethod
+    def read(path):
+        """
+        Read every event of a log file.
+
+        Args:
+            path (str): Path of the log file.
+
+        Returns:
+            list: The events, in the order they were recorded.
+        """
+        with open(path) as log_file:
+            return [json.loads(line) for line in log_file if line.strip()]
+
+    def close(self):
+        """
+        Close the log file.
+        """
+        self._stream.close()
+
+
+def replay(log_path, until=None, clock=None):
+    """
+    Replay an event log from its latest checkpoint.
+
+    The fleet is restored from the last checkpoint taken at or before the
+    tick replayed to, then the jobs submitted after the checkpoint are
+    submitted again on the ticks they were first submitted on.
+
+    Args:
+        log_path (str): Path of the event log.
+        until (int, optional): Tick to replay to. Defaults to the tick of the
+            last event recorded.
+        clock (Clock, optional): Clock that paces the replayed fleet.
+
+    Returns:
+        Fleet: The fleet at the tick replayed to.
+
+    Raises:
+        ValueError: If no checkpoint was recorded at or before that tick.
+    """
+    events = EventLog.read(log_path)
+    if until is None:
+        until = max(event['tick'] for event in events)
+    checkpoints = [position for position, event in enumerate(events)
+                   if event['event'] == 'checkpoint' and event['tick'] <= until]
+    if not checkpoints:
+        raise ValueError(f"No checkpoint at or before tick {until} in {log_path}")
+
+    start = checkpoints[-1]
+    directory = os.path.dirname(os.path.abspath(log_path))
+    fleet = load_snapshot(os.path.join(directory, events[start]['path']), clock)
+    for event in events[start + 1:]:
+        if event['event'] != 'submit' or event['tick'] > until:
+            continue
+        while fleet.ticks < event['tick']:
+            fleet.tick()
+        package = PACKAGE_TYPES[event['type']](event['package'], event['destination'])
+        fleet.submit(package, event['deadline'])
+    while fleet.ticks < until and (fleet.queued or fleet.busy):
+        fleet.tick()
+    return fleet
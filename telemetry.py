@@ -0,0 +1,316 @@
+"""
+telemetry.py
+
+This module records counters and histograms from the hot paths of the robot
+delivery system and passes them to pluggable sinks.
+
+Features:
+- Counters, such as route queries answered from the cache, and histograms,
+  such as cells expanded per search or seconds per rendered frame.
+- Timers for measuring a block of code into a histogram.
+- An in-memory sink that aggregates the metrics, with histograms kept as
+  power-of-two buckets so their memory stays bounded however many values
+  are recorded.
+- A sink that writes every metric as one JSON line to a file.
+- Instrumented code holds None instead of a Telemetry object while
+  telemetry is disabled, so a disabled hot path only pays for one check.
+
+Classes:
+    Histogram: Summary of the values recorded for one metric.
+    MemorySink: Sink that aggregates metrics in memory.
+    JsonLinesSink: Sink that writes metrics to a file, one JSON object per line.
+    Telemetry: Records metrics and passes them to its sinks.
+"""
+
+
+import json
+import math
+import time
+from contextlib import contextmanager
+
+
+class Histogram:
+    """
+    Summary of the values recorded for one metric.
+
+    Values are counted in buckets bounded by powers of two, so percentiles
+    are estimates, accurate to within a factor of two.
+
+    Attributes:
+        count (int): Number of values recorded.
+        total (float): Sum of the values recorded.
+        minimum (float): Smallest value recorded, None before the first.
+        maximum (float): Largest value recorded, None before the first.
+    """
+
+    def __init__(self):
+        """
+        Initialise an empty histogram.
+        """
+        self.count = 0
+        self.total = 0.0
+        self.minimum = None
+        self.maximum = None
+        self._buckets = {}
+
+    def add(self, value):
+        """
+        Record a value.
+
+        Args:
+            value (float): The value, zero or more.
+        """
+        self.count += 1
+        self.total += value
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+        # Bucket e holds the values from 2 ** (e - 1) up to 2 ** e, zero gets its own bucket
+        exponent = math.frexp(value)[1] if value > 0 else None
+        self._buckets[exponent] = self._buckets.get(exponent, 0) + 1
+
+    @property
+    def mean(self):
+        """
+        Get the mean of the values recorded.
+
+        Returns:
+            float: The mean, 0.0 before the first value.
+        """
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, share):
+        """
+        Estimate a percentile of the values recorded.
+
+        Args:
+            share (float): Share of the values at or below the percentile, from 0 to 1.
+
+        Returns:
+            float: Upper bound of the bucket holding the percentile, capped at
+                the largest value, or 0.0 before the first value.
+        """
+        if not self.count:
+            return 0.0
+        rank = share * self.count
+        seen = 0
+        for exponent in sorted(self._buckets, key=lambda key: -math.inf if key is None else key):
+            seen += self._buckets[exponent]
+            if seen >= rank:
+                return 0.0 if exponent is None else min(math.ldexp(1.0, exponent), self.maximum)
+        return self.maximum
+
+    def summary(self):
+        """
+        Summarise the histogram.
+
+        Returns:
+            dict: Count, total, mean, minimum, maximum and the estimated median
+                and 99th percentile.
+        """
+        return {
+            'count': self.count,
+            'total': self.total,
+            'mean': self.mean,
+            'min': self.minimum,
+            'max': self.maximum,
+            'p50': self.percentile(0.5),
+            'p99': self.percentile(0.99)
+        }
+
+
+class MemorySink:
+    """
+    Sink that aggregates metrics in memory.
+
+    Attributes:
+        counters (dict): Counter name mapped to its total.
+        histograms (dict): Histogram name mapped to its Histogram.
+    """
+
+    def __init__(self):
+        """
+        Initialise an empty sink.
+        """
+        self.counters = {}
+        self.histograms = {}
+
+    def count(self, name, value):
+        """
+        Add to a counter.
+
+        Args:
+            name (str): Name of the counter.
+            value (int): Amount to add.
+        """
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name, value):
+        """
+        Record a value in a histogram.
+
+        Args:
+            name (str): Name of the histogram.
+            value (float): The value.
+        """
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        histogram.add(value)
+
+    def snapshot(self):
+        """
+        Summarise every metric recorded so far.
+
+        Returns:
+            dict: The counters, and each histogram's summary.
+        """
+        return {
+            'counters': dict(self.counters),
+            'histograms': {name: histogram.summary() for name, histogram in sorted(self.histograms.items())}
+        }
+
+    def close(self):
+        """
+        Do nothing; the metrics stay available after the sink is closed.
+        """
+
+
+class JsonLinesSink:
+    """
+    Sink that writes metrics to a file, one JSON object per line.
+
+    Each line holds the metric's kind ('counter' or 'histogram'), name,
+    value and wall-clock time.
+    """
+
+    def __init__(self, path_or_stream):
+        """
+        Open the sink.
+
+        Args:
+            path_or_stream (str or file): Path of the file to append to, or an
+                open text stream, which the sink does not close.
+        """
+        if isinstance(path_or_stream, str):
+            self._stream = open(path_or_stream, 'a')
+            self._owned = True
+        else:
+            self._stream = path_or_stream
+            self._owned = False
+
+    def _write(self, kind, name, value):
+        """
+        Write one metric.
+
+        Args:
+            kind (str): 'counter' or 'histogram'.
+            name (str): Name of the metric.
+            value (float): The value.
+        """
+        self._stream.write(json.dumps({'kind': kind, 'name': name, 'value': value, 'time': time.time()}) + '\n')
+
+    def count(self, name, value):
+        """
+        Write a counter increment.
+
+        Args:
+            name (str): Name of the counter.
+            value (int): Amount added.
+        """
+        self._write('counter', name, value)
+
+    def observe(self, name, value):
+        """
+        Write a histogram value.
+
+        Args:
+            name (str): Name of the histogram.
+            value (float): The value.
+        """
+        self._write('histogram', name, value)
+
+    def close(self):
+        """
+        Flush the stream, and close it if the sink opened it.
+        """
+        self._stream.flush()
+        if self._owned:
+            self._stream.close()
+
+
+class Telemetry:
+    """
+    Records metrics and passes them to its sinks.
+
+    Attributes:
+        sinks (list): Sinks every metric is passed to.
+    """
+
+    def __init__(self, *sinks):
+        """
+        Initialise telemetry.
+
+        Args:
+            *sinks: Sinks every metric is passed to. Defaults to one MemorySink.
+        """
+        self.sinks = list(sinks) or [MemorySink()]
+
+    def count(self, name, value=1):
+        """
+        Add to a counter.
+
+        Args:
+            name (str): Name of the counter.
+            value (int): Amount to add.
+        """
+        for sink in self.sinks:
+            sink.count(name, value)
+
+    def observe(self, name, value):
+        """
+        Record a value in a histogram.
+
+        Args:
+            name (str): Name of the histogram.
+            value (float): The value.
+        """
+        for sink in self.sinks:
+            sink.observe(name, value)
+
+    @contextmanager
+    def timer(self, name):
+        """
+        Time a block of code into a histogram of seconds.
+
+        Args:
+            name (str): Name of the histogram.
+
+        Yields:
+            None
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    def snapshot(self):
+        """
+        Summarise the metrics of the first in-memory sink.
+
+        Returns:
+            dict: See `MemorySink.snapshot`, or None if no sink keeps metrics in memory.
+        """
+        for sink in self.sinks:
+            if isinstance(sink, MemorySink):
+                return sink.snapshot()
+        return None
+
+    def close(self):
+        """
+        Close every sink.
+        """
+        for sink in self.sinks:
+            sink.close()
@@ -0,0 +1,131 @@
+"""
+terrain.py
+
+This module defines how the terrain of a cell affects the time a robot takes
+to cross it, depending on the package the robot carries.
+
+Every walkable cell has a terrain cost: 1.0 for plain floor, more for ramps
+or congested corridors, less for low-gravity zones. Costs are stored as one
+byte per cell, in tenths, so a cost layer is as compact as the map itself.
+
+Features:
+- Encoding and decoding of terrain costs as bytes.
+- A cost model that turns a terrain cost and a package into the seconds
+  needed to cross a cell, with packages of some types slowed down more than
+  others on rough cells.
+- Lookup tables from terrain byte to seconds, built once per package type,
+  so that searches never call back into the cost model.
+
+Classes:
+    CostModel: Seconds needed to cross a cell, by terrain cost and package type.
+
+Functions:
+    encode_cost: Converts a terrain cost into its byte value.
+    decode_cost: Converts a terrain byte value into its cost.
+"""
+
+
+TERRAIN_SCALE = 10
+PLAIN = TERRAIN_SCALE
+MAX_COST = 255 / TERRAIN_SCALE
+
+# How much more than the plain-floor rate each package type is slowed down
+# by the rough part of a cell's cost
+DEFAULT_SENSITIVITY = {
+    "Package": 1.0,
+    "Perishable": 1.0,
+    "Fragile": 2.0
+}
+
+
+def encode_cost(cost):
+    """
+    Convert a terrain cost into its byte value.
+
+    Args:
+        cost (float): Terrain cost, 1.0 for plain floor.
+
+    Returns:
+        int: Byte value holding the cost in tenths.
+
+    Raises:
+        ValueError: If the cost is not between 0.1 and MAX_COST.
+    """
+    value = round(cost * TERRAIN_SCALE)
+    if not 1 <= value <= 255:
+        raise ValueError(f"Terrain cost {cost} is outside 0.1 to {MAX_COST}")
+    return value
+
+
+def decode_cost(value):
+    """
+    Convert a terrain byte value into its cost.
+
+    Args:
+        value (int): Byte value holding the cost in tenths.
+
+    Returns:
+        float: Terrain cost, 1.0 for plain floor.
+    """
+    return value / TERRAIN_SCALE
+
+
+class CostModel:
+    """
+    Seconds needed to cross a cell, by terrain cost and package type.
+
+    On a cell with a cost of at most 1.0 a robot moves at its package's
+    delivery speed scaled by the cost. On a rougher cell, the excess over
+    1.0 is multiplied by the sensitivity of the package's type first, so a
+    Fragile package slows down twice as much as a generic one by default.
+
+    Attributes:
+        sensitivity (dict): Package class name mapped to its sensitivity to rough terrain.
+    """
+
+    def __init__(self, sensitivity=None):
+        """
+        Initialise the cost model.
+
+        Args:
+            sensitivity (dict, optional): Package class name mapped to its
+                sensitivity. Types not listed have a sensitivity of 1.0.
+        """
+        self.sensitivity = dict(DEFAULT_SENSITIVITY if sensitivity is None else sensitivity)
+        self._tables = {}
+
+    def step_seconds(self, cost, package=None):
+        """
+        Get the seconds needed to cross a cell.
+
+        Args:
+            cost (float): Terrain cost of the cell.
+            package (Package, optional): Package carried. Without one, the result
+                is the terrain cost itself.
+
+        Returns:
+            float: Seconds needed to cross the cell.
+        """
+        if package is None:
+            return cost
+        speed = package.DELIVERY_SPEED
+        if cost <= 1:
+            return speed * cost
+        return speed * (1 + (cost - 1) * self.sensitivity.get(type(package).__name__, 1.0))
+
+    def table(self, package=None):
+        """
+        Get the seconds needed to cross a cell for every terrain byte value.
+
+        Args:
+            package (Package, optional): Package carried.
+
+        Returns:
+            list: 256 floats indexed by terrain byte value.
+        """
+        key = None if package is None else (type(package), package.DELIVERY_SPEED)
+        table = self._tables.get(key)
+        if table is None:
+            table = [0.0] + [self.step_seconds(decode_cost(value), package) for value in range(1, 256)]
+            self._tables[key] = table
+        return table
@@ -0,0 +1,31 @@
+import json
+import pytest
+from benchmark import MAP_GENERATORS, DEPARTMENTS, run_benchmarks, compare, main
+from environment import Environment
+
+@pytest.mark.parametrize("kind", sorted(MAP_GENERATORS))
+def test_generated_maps_are_seeded(kind):
+    generate = MAP_GENERATORS[kind]
+    layout = generate(30, seed=4)
+    assert layout == generate(30, seed=4)
+    assert len(layout) == 30 and all(len(row) == 30 for row in layout)
+
+@pytest.mark.parametrize("kind", ["maze", "corridor"])
+def test_every_department_is_reachable(kind):
+    environment = Environment(MAP_GENERATORS[kind](40, seed=2))
+    for department in DEPARTMENTS:
+        assert environment.find_path((0, 0), department) is not None
+
+def test_compare_flags_regressions():
+    baseline = {'find_path/open/50': {'best': 1.0}, 'generate_map/open/50': {'best': 1.0}}
+    results = {'find_path/open/50': {'best': 1.5}, 'generate_map/open/50': {'best': 0.9}}
+    comparison = compare(results, baseline, tolerance=0.25)
+    assert comparison['find_path/open/50']['regressed']
+    assert not comparison['generate_map/open/50']['regressed']
+
+def test_main_writes_json_results(tmp_path):
+    output = tmp_path / "results.json"
+    assert main(['--sizes', '12', '--kinds', 'open', '--repeat', '1', '--output', str(output)]) == 0
+    results = json.loads(output.read_text())['results']
+    assert sorted(results) == ['deliver_batch/open/12', 'dispatch/open/12', 'find_path/open/12',
+                               'generate_map/open/12']
@@ -0,0 +1,48 @@
+import pytest
+import time
+from clock import RealTimeClock, AcceleratedClock, SimulatedClock
+from environment import Environment
+from robot import Robot
+
+def test_real_time_clock_sleeps(monkeypatch):
+    slept = []
+    monkeypatch.setattr(time, 'sleep', slept.append)
+    RealTimeClock().sleep(1.5)
+    assert slept == [1.5]
+
+def test_accelerated_clock_scales_sleep(monkeypatch):
+    slept = []
+    monkeypatch.setattr(time, 'sleep', slept.append)
+    AcceleratedClock(speed=100).sleep(2.0)
+    assert slept == [0.02]
+
+    with pytest.raises(ValueError):
+        AcceleratedClock(speed=0)
+
+def test_simulated_clock_fires_events_in_order():
+    clock = SimulatedClock()
+    fired = []
+    clock.schedule(2.0, lambda: fired.append(("b", clock.now())))
+    clock.schedule(1.0, lambda: fired.append(("a", clock.now())))
+    clock.schedule(2.0, lambda: fired.append(("c", clock.now())))
+
+    clock.sleep(1.5)
+    assert fired == [("a", 1.0)]
+    assert clock.now() == 1.5
+
+    clock.run()
+    assert fired == [("a", 1.0), ("b", 2.0), ("c", 2.0)]
+    assert clock.pending == 0
+
+def test_robot_delivery_uses_clock(monkeypatch):
+    # A simulated clock advances by the delivery time without sleeping
+    monkeypatch.setattr(time, 'sleep', lambda x: pytest.fail("slept in real time"))
+    monkeypatch.setattr('builtins.input', lambda x: None)
+    clock = SimulatedClock()
+    robot = Robot("Astrid", "RX-101", "SpaceCorp", Environment(), clock=clock)
+    monkeypatch.setattr(robot.interface, 'display_delivery_menu', lambda: "Medical Bay")
+    monkeypatch.setattr(robot.interface, 'display_frame', lambda x: None)
+
+    path = robot.environment.find_path(robot.position, "Medical Bay")
+    robot.delivery()
+    assert clock.now() == len(path) * 1.0
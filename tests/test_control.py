@@ -0,0 +1,128 @@
+import asyncio
+import socket
+import pytest
+from clock import AcceleratedClock, SimulatedClock
+from control import ControlClient, ControlServer, Supervisor
+from environment import Environment
+from interface import AsyncInterface
+from robot import Robot
+
+def test_supervisor_runs_many_robots_on_one_loop():
+    environment = Environment()
+    departments = ["Engineering", "Command", "Medical Bay", "Airlock", "Hydroponics", "Docking"]
+
+    async def scenario():
+        supervisor = Supervisor(environment, SimulatedClock())
+        for number in range(20):
+            supervisor.add_robot(f"Astrid-{number}")
+            for department in departments[number % 3:number % 3 + 3]:
+                supervisor.submit(f"Astrid-{number}", department)
+        await supervisor.join()
+        await supervisor.stop()
+        return supervisor
+
+    supervisor = asyncio.run(scenario())
+    status = supervisor.status()
+    assert all(entry['delivered'] == 3 and not entry['busy'] for entry in status.values())
+    assert tuple(status['Astrid-0']['position']) in environment.department_cells('Command') + \
+        environment.department_cells('Engineering') + environment.department_cells('Medical Bay')
+
+def test_robots_step_concurrently():
+    async def scenario():
+        supervisor = Supervisor(Environment(), AcceleratedClock(200))
+        supervisor.add_robot("Astrid")
+        supervisor.add_robot("Bertha")
+        supervisor.submit("Astrid", "Engineering")
+        supervisor.submit("Bertha", "Docking")
+        await asyncio.sleep(0.01)
+        busy = [entry['busy'] for entry in supervisor.status().values()]
+        await supervisor.stop()
+        return busy
+
+    assert asyncio.run(scenario()) == [True, True]
+
+@pytest.mark.parametrize("transport", ['tcp', 'unix'])
+def test_control_endpoint(transport, tmp_path):
+    if transport == 'unix' and not hasattr(socket, 'AF_UNIX'):
+        pytest.skip("Unix sockets are not available")
+
+    async def scenario():
+        supervisor = Supervisor(Environment(), SimulatedClock())
+        supervisor.add_robot("Astrid")
+        server = ControlServer(supervisor)
+        if transport == 'unix':
+            path = str(tmp_path / "control.sock")
+            await server.start(path=path)
+            client = await ControlClient.connect(path=path)
+        else:
+            host, port = await server.start()
+            client = await ControlClient.connect(host, port)
+
+        answers = [
+            await client.request('robots'),
+            await client.request('deliver', robot="Astrid", department="Airlock"),
+            await client.request('deliver', robot="Astrid", department="Airlock", package_type="Crate"),
+            await client.request('deliver', robot="Bertha", department="Airlock"),
+            await client.request('launch'),
+            await client.request('wait'),
+            await client.request('status')
+        ]
+        await client.close()
+        await server.close()
+        await supervisor.stop()
+        return answers
+
+    robots, delivered, bad_type, bad_robot, unknown, waited, status = asyncio.run(scenario())
+    assert robots == {'ok': True, 'robots': ["Astrid"]}
+    assert delivered['ok'] and delivered['type'] == "Fragile"
+    assert not bad_type['ok'] and not bad_robot['ok'] and not unknown['ok']
+    assert waited['ok']
+    assert status['robots']['Astrid']['delivered'] == 1
+    assert status['robots']['Astrid']['position'] == [4, 6]
+
+def test_bad_commands_and_failed_tours_are_answered():
+    async def scenario():
+        supervisor = Supervisor(Environment(), SimulatedClock())
+        robot = supervisor.add_robot("Astrid")
+
+        async def failing_tour():
+            # Delivers the first package, then breaks down
+            robot.inventory.pop(0)
+            raise RuntimeError("wheel jammed")
+
+        server = ControlServer(supervisor)
+        answers = [await server.execute(line) for line in [
+            '[]',
+            '{"command": "deliver", "robot": "Astrid", "department": 5}',
+            '{"command": "deliver", "robot": "Astrid", "department": "Airlock", "package_type": 5}',
+            '{"command": "deliver", "robot": ["Astrid"], "department": "Airlock"}'
+        ]]
+        with pytest.raises(TypeError):
+            supervisor.submit("Astrid", "Airlock", dict)
+
+        robot.deliver_inventory_async = failing_tour
+        supervisor.submit("Astrid", "Airlock")
+        supervisor.submit("Astrid", "Docking")
+        answers.append(await asyncio.wait_for(server.execute('{"command": "wait"}'), 1))
+        status = supervisor.status()['Astrid']
+        await supervisor.stop()
+        return answers, status
+
+    answers, status = asyncio.run(scenario())
+    assert [answer['ok'] for answer in answers] == [False, False, False, False, True]
+    assert status['delivered'] == 1 and status['failed'] == 1 and not status['busy']
+    assert status['error'] == "RuntimeError: wheel jammed"
+
+def test_async_start_up_reads_queued_input():
+    environment = Environment()
+    robot = Robot("Astrid", "RX-101", "SpaceCorp", environment, SimulatedClock())
+    interface = AsyncInterface()
+    interface.display_frame = lambda frame: None
+    for line in ["", "2", "3", "", "9", "", "3", "y"]:
+        interface.lines.put_nowait(line)
+
+    own_interface = robot.interface
+    asyncio.run(robot.start_up_async(interface))
+    assert robot.position in environment.department_cells('Medical Bay')
+    assert robot.inventory == []
+    assert robot.interface is own_interface
@@ -0,0 +1,82 @@
+import random
+import pytest
+from collections import Counter
+from cooperative import ReservationTable, CooperativePlanner
+from environment import Environment
+from fleet import Fleet
+from package import Package, Perishable, Fragile
+
+DEPARTMENTS = ["Engineering", "Command", "Medical Bay", "Airlock", "Hydroponics", "Docking"]
+
+def test_reservations_forbid_sharing_and_swaps():
+    table = ReservationTable(shared=[(0, 0)])
+    table.reserve('a', [(0, 1), (0, 2), (0, 2)], start=5)
+    assert not table.is_free((0, 2), 6, 'b')
+    assert table.is_free((0, 2), 6, 'a')
+    assert table.is_free((0, 1), 6, 'b')
+    # Moving (0, 2) -> (0, 1) while 'a' moves (0, 1) -> (0, 2) would be a head-on swap
+    assert not table.can_move((0, 2), (0, 1), 6, 'b')
+    table.reserve('a', [(0, 0)] * 3, start=5)
+    assert table.is_free((0, 0), 6, 'b')
+
+    table.release('a')
+    assert len(table) == 0
+    assert table.can_move((0, 2), (0, 1), 6, 'b')
+
+def test_planner_routes_around_a_reservation():
+    # Two robots meet head-on in a corridor; the second one gives way to the first
+    environment = Environment(['A.....E', 'XX.XXXX'])
+    shared = {(0, 0), (0, 6)}
+    planner = CooperativePlanner(environment, shared=shared, window=32)
+    first = planner.plan('a', (0, 0), 'Engineering', tick=0)
+    second = planner.plan('b', (0, 6), 'Airlock', tick=0)
+
+    assert first[-1] == (0, 6) and second[-1] == (0, 0)
+    assert len(first) == 7
+    for tick in range(1, max(len(first), len(second))):
+        here = (first[min(tick, len(first) - 1)], second[min(tick, len(second) - 1)])
+        before = (first[min(tick - 1, len(first) - 1)], second[min(tick - 1, len(second) - 1)])
+        assert here[0] != here[1] or here[0] in shared
+        swapped = here[0] == before[1] and here[1] == before[0] and here[0] != here[1]
+        assert not swapped or shared & set(here)
+    assert len(second) > 7
+
+def test_planner_rejects_unreachable_destinations():
+    environment = Environment(['..X.E'])
+    planner = CooperativePlanner(environment)
+    assert planner.plan('a', (0, 0), 'Engineering', tick=0) is None
+    with pytest.raises(ValueError):
+        CooperativePlanner(environment, window=0)
+
+def _submit(fleet, count, seed):
+    rng = random.Random(seed)
+    for number in range(count):
+        package_type = rng.choice([Package, Perishable, Fragile])
+        fleet.submit(package_type(number, rng.choice(DEPARTMENTS)))
+
+@pytest.mark.parametrize("size", [3, 16])
+def test_cooperative_fleet_never_collides_or_swaps(size):
+    fleet = Fleet(Environment(), size=size, cooperative=True)
+    _submit(fleet, 80, seed=size)
+    shared = {(6, 0)} | {cell for d in fleet.environment.departments
+                         for cell in fleet.environment.department_cells(d)}
+    while fleet.queued or fleet.busy:
+        before = [robot.position for robot in fleet.robots]
+        fleet.tick()
+        after = [robot.position for robot in fleet.robots]
+        counts = Counter(cell for cell in after if cell not in shared)
+        assert all(count == 1 for count in counts.values())
+        moves = {(old, new) for old, new in zip(before, after) if old != new and not {old, new} & shared}
+        assert not any((new, old) in moves for old, new in moves)
+        assert fleet.ticks < 10000
+    assert fleet.delivered == 80
+
+def test_cooperative_fleet_beats_reactive_fleet_at_the_chokepoints():
+    reports = {}
+    for cooperative in (False, True):
+        fleet = Fleet(Environment(), size=16, cooperative=cooperative)
+        _submit(fleet, 150, seed=5)
+        reports[cooperative] = fleet.run(max_ticks=20000)
+    assert reports[True]['deliveries'] == reports[False]['deliveries'] == 150
+    assert reports[True]['deliveries_per_hour'] > 1.2 * reports[False]['deliveries_per_hour']
+    assert reports[True]['blocked_ticks'] < reports[False]['blocked_ticks']
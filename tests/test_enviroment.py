@@ -34,3 +34,34 @@ def test_generate_map(environment):
     assert clean_map_str.strip() != ""  # Ensure map is not empty
     assert any(char in clean_map_str for char in ['X', 'E', 'H', 'R', 'G'])  # Ensure that map contains symbols like 'X', 'E', etc.
 
+def test_set_cell_rebuilds_route_index(environment):
+    # Blocking the only corridor out of Cargo must change the route
+    index = environment.route_index
+    assert environment.find_path((6, 0), "G") == [(6, 0), (7, 0)]
+    environment.set_cell(7, 0, 'X')
+    assert environment.version == 1
+    assert environment.route_index is not index
+    assert environment.find_path((6, 0), "G") is None
+
+@pytest.mark.parametrize("strategy", ["bfs", "astar", "bidirectional", "jps"])
+def test_find_path_to_coordinates(strategy):
+    # Routing to explicit coordinates works with every strategy
+    environment = Environment(strategy=strategy)
+    path = environment.find_path((6, 0), (1, 5))
+    assert path[0] == (6, 0) and path[-1] == (1, 5)
+    assert len(path) == 11
+
+def test_compact_map_round_trip(environment):
+    # The byte-per-cell grid decodes back to the Luna-9 layout
+    assert environment.map[0] == ['X', 'X', 'X', 'X', 'X', 'E', 'X']
+    assert environment.cell(4, 6) == 'A'
+    assert environment.is_valid_position(6, 0)
+    assert not environment.is_valid_position(7, 1)
+    assert not environment.is_valid_position(-1, 0)
+
+def test_as_array_is_a_view(environment):
+    np = pytest.importorskip("numpy")
+    grid = environment.as_array()
+    assert grid.shape == (8, 7) and grid.dtype == np.uint8
+    environment.set_cell(1, 2, 'X')
+    assert grid[1, 2] == 0
@@ -0,0 +1,97 @@
+import random
+import pytest
+from collections import Counter
+from environment import Environment
+from fleet import Fleet
+from package import Package, PackageBatch, Perishable, Fragile
+
+DEPARTMENTS = ["Engineering", "Command", "Medical Bay", "Airlock", "Hydroponics", "Docking"]
+
+@pytest.fixture
+def fleet():
+    return Fleet(Environment(), size=8)
+
+def test_fleet_delivers_every_job(fleet):
+    rng = random.Random(7)
+    for number in range(60):
+        package_type = rng.choice([Package, Perishable, Fragile])
+        fleet.submit(package_type(number, rng.choice(DEPARTMENTS)))
+
+    report = fleet.run(max_ticks=10000)
+    assert report['deliveries'] == 60
+    assert report['failed'] == 0
+    assert report['deliveries_per_hour'] > 0
+    assert all(robot.inventory == [] for robot in fleet.robots)
+
+def test_corridor_cells_hold_one_robot(fleet):
+    # No two robots may ever share a cell outside departments and home
+    rng = random.Random(3)
+    for number in range(40):
+        fleet.submit(Package(number, rng.choice(DEPARTMENTS)))
+
+    shared = {(6, 0)} | {cell for d in fleet.environment.departments
+                         for cell in fleet.environment.department_cells(d)}
+    while fleet.jobs or fleet.busy:
+        fleet.tick()
+        counts = Counter(robot.position for robot in fleet.robots)
+        assert all(count == 1 for cell, count in counts.items() if cell not in shared)
+        assert fleet.ticks < 10000
+
+def test_unreachable_job_fails():
+    environment = Environment(['..X.E'])
+    fleet = Fleet(environment, size=2, home=(0, 0))
+    fleet.submit(Package(1, "Engineering"))
+    assert fleet.run()['failed'] == 1
+
+def test_fleet_takes_package_batches(fleet):
+    batch = PackageBatch()
+    batch.extend(Perishable, range(30), DEPARTMENTS * 5)
+    fleet.submit(Package(99, "Command"))
+    fleet.submit_batch(batch)
+    assert fleet.queued == 31
+
+    report = fleet.run(max_ticks=10000)
+    assert report['deliveries'] == 31 and len(batch) == 0
+    assert not fleet.jobs
+
+def test_idle_robot_in_a_corridor_makes_way():
+    # A robot parked with no job, as after giving up, must not stall or crash the fleet
+    fleet = Fleet(Environment(), size=2)
+    route = fleet.environment.find_path((6, 0), "Airlock")
+    fleet.robots[1].position = route[6]
+    fleet.submit(Package(1, "Airlock"))
+
+    report = fleet.run(max_ticks=500)
+    assert report['deliveries'] == 1 and report['failed'] == 0
+    assert fleet.robots[1].position != route[6]
+
+@pytest.mark.parametrize("seed", [4, 14, 27])
+def test_reactive_robots_do_not_circle_for_ever(seed):
+    # Two robots used to dodge each other round the loop north of Command without end
+    rng = random.Random(seed)
+    fleet = Fleet(Environment(), size=2)
+    for number in range(150):
+        package_type = rng.choice([Package, Perishable, Fragile])
+        fleet.submit(package_type(number, rng.choice(DEPARTMENTS)))
+
+    report = fleet.run()
+    assert report['deliveries'] == 150 and report['failed'] == 0
+
+def test_stalled_fleet_hands_its_jobs_to_the_cooperative_planner():
+    rng = random.Random(1)
+    destinations = [rng.choice(DEPARTMENTS) for _ in range(60)]
+    fleet = Fleet(Environment(), size=8, stall_ticks=4)
+    for number, destination in enumerate(destinations):
+        fleet.submit(Package(number, destination))
+
+    report = fleet.run()
+    assert fleet.stalls == 1 and fleet.planner is not None
+    assert report['deliveries'] == 60
+
+    # A cooperative fleet that stalls gives up its stuck jobs rather than run for ever
+    fleet = Fleet(Environment(), size=8, cooperative=True, stall_ticks=2)
+    for number, destination in enumerate(destinations):
+        fleet.submit(Package(number, destination))
+    report = fleet.run()
+    assert fleet.stalls >= 1 and report['failed'] > 0
+    assert report['deliveries'] + report['failed'] == 60 and not fleet.busy
@@ -0,0 +1,47 @@
+import pytest
+import environment as environment_module
+from benchmark import corridor_map, maze_map
+from environment import Environment
+
+def test_distances_match_path_lengths():
+    environment = Environment()
+    heatmap = environment.heatmap(vectorised=False)
+    assert heatmap.departments == sorted(environment.departments)
+
+    distances = heatmap.distances('Medical Bay')
+    for row in range(environment.rows):
+        for col in range(environment.cols):
+            path = environment.find_path((row, col), 'M') if environment.is_valid_position(row, col) else None
+            assert distances[row][col] == (len(path) - 1 if path else -1)
+
+def test_reachability_and_total_distance():
+    environment = Environment(['E.X.C', '..X..'])
+    heatmap = environment.heatmap(vectorised=False)
+    assert heatmap.reachable('E') == [[True, True, False, False, False], [True, True, False, False, False]]
+    assert heatmap.distances('C')[1][3] == 2
+    assert heatmap.total_distance() == [[-1] * 5, [-1] * 5]
+
+    heatmap = environment.heatmap(['Command'], vectorised=False)
+    assert heatmap.total_distance() == [[-1, -1, -1, 1, 0], [-1, -1, -1, 2, 1]]
+
+@pytest.mark.parametrize("generate", [maze_map, corridor_map])
+def test_vectorised_heatmap_matches_bfs_fields(generate, tmp_path):
+    np = pytest.importorskip("numpy")
+    path = tmp_path / "station.map"
+    Environment(generate(50, 1)).save(str(path))
+    environment = Environment.load(str(path))
+
+    vectorised = environment.heatmap(vectorised=True)
+    fallback = environment.heatmap(vectorised=False)
+    for department in environment.departments:
+        assert vectorised.distances(department) == fallback.distances(department)
+    assert vectorised.as_array().shape == (len(environment.departments), 50, 50)
+    assert np.array_equal(vectorised.as_array(), fallback.as_array())
+
+def test_invalid_heatmap_requests(monkeypatch):
+    environment = Environment()
+    with pytest.raises(ValueError):
+        environment.heatmap(['Bridge'])
+    monkeypatch.setattr(environment_module, 'np', None)
+    with pytest.raises(ImportError):
+        environment.heatmap(vectorised=True)
@@ -0,0 +1,55 @@
+import random
+import pytest
+from benchmark import open_map, maze_map
+from environment import Environment
+
+def is_valid_path(environment, path, start, goal):
+    return (path[0] == start and path[-1] == goal
+            and all(environment.is_valid_position(*cell) for cell in path)
+            and all(abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1 for a, b in zip(path, path[1:])))
+
+@pytest.mark.parametrize("generate", [open_map, maze_map])
+def test_hierarchical_paths_are_valid_and_near_shortest(generate):
+    environment = Environment(generate(60, 3), route_cache_size=0)
+    environment.build_hierarchy(cluster_size=8)
+    rng = random.Random(3)
+    open_cells = [(row, col) for row in range(60) for col in range(60)
+                  if environment.is_valid_position(row, col)]
+
+    for _ in range(30):
+        start, goal = rng.sample(open_cells, 2)
+        path = environment.find_path(start, goal, strategy='hpa')
+        shortest = environment.find_path(start, goal)
+        assert (path is None) == (shortest is None)
+        if path is not None:
+            assert is_valid_path(environment, path, start, goal)
+            assert len(path) <= 1.2 * len(shortest)
+
+def test_hierarchical_department_queries():
+    environment = Environment(strategy='hpa')
+    environment.build_hierarchy(cluster_size=3)
+    for department in environment.departments:
+        path = environment._search_path((6, 0), department, strategy='hpa')
+        assert path[-1] in environment.department_cells(department)
+        assert len(path) <= 1.5 * len(environment.find_path((6, 0), department))
+
+def test_changed_cell_updates_only_nearby_clusters():
+    environment = Environment(open_map(64, 5, density=0.1), route_cache_size=0)
+    hierarchy = environment.build_hierarchy(cluster_size=8)
+    start, goal = (0, 0), (63, 63)
+    while not environment.is_valid_position(*goal):
+        goal = (goal[0], goal[1] - 1)
+    path = environment.find_path(start, goal, strategy='hpa')
+    built = len(hierarchy._graphs)
+
+    blocked = path[len(path) // 2]
+    environment.block_cell(*blocked)
+    assert built - len(hierarchy._graphs) <= 5  # Its cluster and up to four neighbours
+
+    path = environment.find_path(start, goal, strategy='hpa')
+    assert blocked not in path
+    assert is_valid_path(environment, path, start, goal)
+
+def test_invalid_cluster_size():
+    with pytest.raises(ValueError):
+        Environment().build_hierarchy(cluster_size=1)
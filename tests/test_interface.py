@@ -0,0 +1,11 @@
+from interface import Interface, INVALID_DEPARTMENT, UNKNOWN_DEPARTMENT
+
+def test_delivery_menu_tells_bad_input_from_unknown_department(monkeypatch, capsys):
+    answers = iter(["Cargo", "", "9", "", "4"])
+    monkeypatch.setattr('builtins.input', lambda prompt="": next(answers))
+    assert Interface().display_delivery_menu() == "Airlock"
+
+    output = capsys.readouterr().out
+    assert output.count(INVALID_DEPARTMENT) == 1
+    assert output.count(UNKNOWN_DEPARTMENT) == 1
+    assert output.index(INVALID_DEPARTMENT) < output.index(UNKNOWN_DEPARTMENT)
@@ -0,0 +1,66 @@
+import csv
+import json
+import pytest
+from environment import Environment
+from main import format_results, generate_jobs, main, read_jobs, simulate
+
+def test_read_jobs(tmp_path):
+    path = tmp_path / "jobs.csv"
+    path.write_text("# department, type, tick\nAirlock\n\nMedical Bay, Perishable, 4\nCargo,,2\n")
+    assert read_jobs(str(path)) == [("Airlock", None, 0), ("Medical Bay", "Perishable", 4), ("Cargo", None, 2)]
+
+    path.write_text("Airlock, Heavy\n")
+    with pytest.raises(ValueError):
+        read_jobs(str(path))
+
+@pytest.mark.parametrize("cooperative", [False, True])
+def test_simulate_summarises_a_run(cooperative):
+    environment = Environment(strategy='astar')
+    jobs = generate_jobs(environment, 40, seed=3) + [("Engineering", "Fragile", 30), ("Nowhere", None, 5)]
+    summary = simulate(environment, jobs, robots=4, policy='deadline', cooperative=cooperative, engine='astar')
+    assert summary['deliveries'] == 41 and summary['failed'] == 1 and summary['unfinished'] == 0
+    assert summary['engine'] == 'astar'
+    assert 0 < summary['mean_latency'] <= summary['max_latency'] <= summary['makespan']
+    assert summary['makespan'] <= summary['ticks'] * 0.5
+    assert summary['queries'] > 0 and summary['expansions_per_query'] >= 0
+    assert 0 < summary['sla_hit_rate'] <= 1
+    assert environment.telemetry is None
+
+def test_main_runs_a_capacity_sweep(tmp_path):
+    environment = Environment()
+    environment.save(str(tmp_path / "luna.map"))
+    (tmp_path / "jobs.csv").write_text("\n".join(department for department in environment.departments * 5))
+    output = tmp_path / "sweep.csv"
+
+    status = main(['run', '--map', str(tmp_path / "luna.map"), '--jobs', str(tmp_path / "jobs.csv"),
+                   '--robots', '1', '3', '--engine', 'jps', '--format', 'csv', '--output', str(output)])
+    assert status == 0
+    rows = list(csv.DictReader(output.open()))
+    assert [row['robots'] for row in rows] == ['1', '3']
+    assert all(int(row['deliveries']) == 5 * len(environment.departments) for row in rows)
+    assert float(rows[1]['makespan']) < float(rows[0]['makespan'])
+
+    assert main(['run', '--generate', '20', '--robots', '2', '--max-ticks', '5', '--output', str(output)]) == 1
+    assert json.loads(output.read_text())[0]['ticks'] == 5
+    assert 'wall seconds' in format_results([{'wall_seconds': 0.5}], 'text')
+
+def test_engine_searches_every_route():
+    jobs = generate_jobs(Environment(), 30, seed=2)
+    indexed = simulate(Environment(), jobs, robots=3)
+    searched = {engine: simulate(Environment(strategy=engine), jobs, robots=3, engine=engine)
+                for engine in ['bfs', 'jps']}
+    assert indexed['engine'] == 'index' and indexed['expansions_per_query'] == 0
+    assert searched['bfs']['expansions_per_query'] > searched['jps']['expansions_per_query'] > 0
+    assert all(summary['deliveries'] == 30 for summary in searched.values())
+
+def test_run_that_used_to_deadlock_ends(tmp_path, capsys):
+    # Two reactive robots on seed 3 used to circle the station until the run was killed
+    output = tmp_path / "run.json"
+    assert main(['run', '--generate', '150', '--robots', '2', '--seed', '3', '--output', str(output)]) == 0
+    summary = json.loads(output.read_text())[0]
+    assert summary['deliveries'] == 150 and summary['unfinished'] == 0
+
+    assert main(['run', '--generate', '150', '--robots', '2', '--seed', '3', '--max-ticks', '100',
+                 '--output', str(output)]) == 1
+    assert json.loads(output.read_text())[0]['unfinished'] > 0
+    assert "jobs left unfinished" in capsys.readouterr().err
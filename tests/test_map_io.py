@@ -0,0 +1,47 @@
+import pytest
+from environment import Environment
+
+@pytest.fixture
+def environment():
+    return Environment()
+
+def test_load_text_map(tmp_path):
+    # A text map is parsed row by row and its departments discovered
+    path = tmp_path / "station.txt"
+    path.write_text("# Test deck\nE..X\n.X.Q\n")
+    environment = Environment.load(str(path))
+    assert (environment.rows, environment.cols) == (2, 4)
+    assert environment.departments == ['E', 'Q']
+    assert environment.find_path((1, 0), "Q") == [(1, 0), (0, 0), (0, 1), (0, 2), (1, 2), (1, 3)]
+
+@pytest.mark.parametrize("use_mmap", [True, False])
+def test_binary_map_round_trip(environment, tmp_path, use_mmap):
+    # A saved map loads back with the same cells, departments and routes
+    path = tmp_path / "luna9.map"
+    environment.save(str(path))
+    loaded = Environment.load(str(path), use_mmap=use_mmap)
+    assert loaded.map == environment.map
+    assert loaded.departments == environment.departments
+    for department in environment.departments:
+        assert loaded.find_path((6, 0), department) == environment.find_path((6, 0), department)
+    assert loaded.generate_map((6, 0)) == environment.generate_map((6, 0))
+
+def test_memory_mapped_changes_stay_in_memory(environment, tmp_path):
+    # Blocking a cell of a memory-mapped map must not write to the file
+    path = tmp_path / "luna9.map"
+    environment.save(str(path))
+    contents = path.read_bytes()
+    loaded = Environment.load(str(path))
+    loaded.set_cell(7, 0, 'X')
+    assert loaded.find_path((6, 0), "G") is None
+    assert path.read_bytes() == contents
+
+def test_invalid_maps(tmp_path):
+    path = tmp_path / "ragged.txt"
+    path.write_text("...\n..\n")
+    with pytest.raises(ValueError):
+        Environment.load(str(path))
+    path = tmp_path / "truncated.map"
+    path.write_bytes(b"ASTRIDMP" + b"\x00" * 8)
+    with pytest.raises(ValueError):
+        Environment.load(str(path))
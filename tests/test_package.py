@@ -1,5 +1,5 @@
 import pytest
-from package import Package, Perishable, Fragile
+from package import DELIVERY_SPEEDS, PACKAGE_CLASSES, Package, PackageBatch, Perishable, Fragile
 
 def test_package_initialisation():
 		package = Package(package_id="123", destination="Medical Bay")
@@ -13,3 +13,32 @@ def test_perishable_package_speed():
 def test_fragile_package_speed():
 		package = Fragile(package_id="125", destination="Airlock")
 		assert package.get_delivery_speed() == 2.0
+
+def test_packages_are_slotted():
+		package = Perishable(package_id=7, destination="Medical Bay")
+		assert not hasattr(package, '__dict__')
+		with pytest.raises(AttributeError):
+				package.weight = 3
+		assert [cls.DELIVERY_SPEED for cls in PACKAGE_CLASSES] == list(DELIVERY_SPEEDS) == [1.5, 1.0, 2.0]
+
+def test_package_batch_holds_packages_as_arrays():
+		batch = PackageBatch()
+		batch.extend(Fragile, range(1, 3001), ["Airlock", "Cargo", "Engineering"] * 1000)
+		batch.append(Perishable, 5000, "Medical Bay")
+		assert len(batch) == 3001
+		assert batch.nbytes == 3001 * 11
+		assert batch.counts()["Cargo"] == 1000
+		assert list(batch.speeds()[-2:]) == [2.0, 1.0]
+
+		taken = [batch.popleft() for _ in range(2000)]
+		assert [type(package) for package in taken[:2]] == [Fragile, Fragile]
+		assert (taken[1].package_id, taken[1].destination) == (2, "Cargo")
+		assert len(batch) == 1001
+		assert str(batch[1000]) == str(Perishable(5000, "Medical Bay"))
+		assert [package.package_id for package in PackageBatch.from_packages(taken[:3])] == [1, 2, 3]
+
+		with pytest.raises(ValueError):
+				batch.extend(Package, [1, 2], ["Cargo"])
+		assert len(batch) == 1001
+		with pytest.raises(IndexError):
+				batch[1001]
@@ -0,0 +1,45 @@
+import random
+import pytest
+import parallel
+from benchmark import maze_map, open_map
+from environment import Environment
+
+def random_queries(environment, count, seed=0):
+    rng = random.Random(seed)
+    cells = [(row, col) for row in range(environment.rows) for col in range(environment.cols)
+             if environment.is_valid_position(row, col)]
+    return [(rng.choice(cells), rng.choice(cells) if rng.random() < 0.7 else rng.choice("EMCAHGD."))
+            for _ in range(count)]
+
+@pytest.mark.parametrize("strategy", ['bfs', 'astar', 'hpa'])
+def test_parallel_paths_match_serial_paths_in_order(strategy):
+    environment = Environment(maze_map(40, 2), route_cache_size=0)
+    queries = random_queries(environment, 2 * parallel.MIN_QUERIES_PER_WORKER)
+
+    paths = environment.find_paths(queries, strategy=strategy, workers=2)
+    assert paths == [environment.find_path(start, destination, strategy=strategy)
+                     for start, destination in queries]
+
+def test_parallel_paths_on_loaded_binary_map(tmp_path):
+    path = tmp_path / "station.map"
+    Environment(open_map(40, 3)).save(str(path))
+    environment = Environment.load(str(path), route_cache_size=0)
+    queries = random_queries(environment, 2 * parallel.MIN_QUERIES_PER_WORKER, seed=3)
+
+    assert environment.find_paths(queries, workers=2) == [environment.find_path(*query) for query in queries]
+
+def test_small_batches_and_cached_routes_are_not_sent_to_workers(monkeypatch):
+    environment = Environment(open_map(40, 4))
+    queries = random_queries(environment, 2 * parallel.MIN_QUERIES_PER_WORKER, seed=4)
+    expected = [environment.find_path(*query) for query in queries]
+
+    def fail(*args):
+        raise AssertionError("planned in worker processes")
+
+    monkeypatch.setattr(parallel, 'plan_routes', fail)
+    assert environment.find_paths(queries[:10], workers=2) == expected[:10]
+    assert environment.find_paths(queries, workers=2) == expected
+
+def test_unknown_strategy():
+    with pytest.raises(ValueError):
+        Environment().find_paths([((6, 0), 'Cargo')], strategy='dfs')
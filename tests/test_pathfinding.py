@@ -0,0 +1,104 @@
+import random
+import pytest
+from pathfinding import GridSearch
+
+def build_search(grid):
+    # Pad and flatten a list of strings into a GridSearch
+    rows, cols = len(grid), len(grid[0])
+    walkable = bytearray((rows + 2) * (cols + 2))
+    for row, cells in enumerate(grid):
+        for col, cell in enumerate(cells):
+            walkable[(row + 1) * (cols + 2) + col + 1] = cell != 'X'
+    return GridSearch(walkable, rows, cols)
+
+def legacy_find_path(grid, start_position, target):
+    # The original list-based BFS from Environment.find_path
+    rows, cols = len(grid), len(grid[0])
+    queue = [start_position]
+    visited = {start_position}
+    previous = {start_position: None}
+    while queue:
+        current = queue.pop(0)
+        row, col = current
+        if grid[row][col] == target:
+            path = []
+            while current:
+                path.append(current)
+                current = previous[current]
+            path.reverse()
+            return path
+        for move in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
+            new_position = (row + move[0], col + move[1])
+            if (0 <= new_position[0] < rows and 0 <= new_position[1] < cols
+                    and grid[new_position[0]][new_position[1]] != 'X'
+                    and new_position not in visited):
+                queue.append(new_position)
+                visited.add(new_position)
+                previous[new_position] = current
+    return None
+
+@pytest.mark.parametrize("seed", range(20))
+def test_bfs_matches_legacy_paths(seed):
+    # The engine must return exactly the same paths as the original BFS
+    rng = random.Random(seed)
+    grid = [''.join(rng.choice('..X') for _ in range(15)) for _ in range(12)]
+    goal = (rng.randrange(12), rng.randrange(15))
+    grid[goal[0]] = grid[goal[0]][:goal[1]] + 'E' + grid[goal[0]][goal[1] + 1:]
+    search = build_search(grid)
+
+    for row in range(12):
+        for col in range(15):
+            if grid[row][col] == 'X':
+                continue
+            expected = legacy_find_path(grid, (row, col), 'E')
+            path = search.bfs(search.index((row, col)), {search.index(goal)})
+            if expected is None:
+                assert path is None
+            else:
+                assert [search.position(cell) for cell in path] == expected
+
+def test_bfs_budgets():
+    # A corridor route of 9 steps is out of reach of smaller budgets
+    search = build_search(['.' * 10])
+    start, goal = search.index((0, 0)), search.index((0, 9))
+    assert len(search.bfs(start, {goal})) == 10
+    assert search.bfs(start, {goal}, max_depth=8) is None
+    assert len(search.bfs(start, {goal}, max_depth=9)) == 10
+    assert search.bfs(start, {goal}, max_expansions=5) is None
+    assert search.expanded == 5
+
+def is_valid_path(search, grid, path, start, goal):
+    # Consecutive cells must be adjacent and every cell walkable
+    cells = [search.position(cell) for cell in path]
+    if cells[0] != start or cells[-1] != goal:
+        return False
+    for (row, col), (next_row, next_col) in zip(cells, cells[1:]):
+        if abs(row - next_row) + abs(col - next_col) != 1 or grid[next_row][next_col] == 'X':
+            return False
+    return True
+
+@pytest.mark.parametrize("strategy", ["astar", "bidirectional", "jps"])
+@pytest.mark.parametrize("seed", range(10))
+def test_strategies_find_shortest_paths(strategy, seed):
+    # Every strategy must find a valid path as short as the BFS path
+    rng = random.Random(seed)
+    grid = [''.join(rng.choice('...X') for _ in range(20)) for _ in range(15)]
+    search = build_search(grid)
+    cells = [(row, col) for row in range(15) for col in range(20) if grid[row][col] != 'X']
+
+    for _ in range(40):
+        start, goal = rng.choice(cells), rng.choice(cells)
+        expected = search.bfs(search.index(start), {search.index(goal)})
+        path = search.search(strategy, search.index(start), {search.index(goal)})
+        if expected is None:
+            assert path is None
+        else:
+            assert len(path) == len(expected)
+            assert is_valid_path(search, grid, path, start, goal)
+
+def test_unknown_strategy():
+    search = build_search(['..'])
+    with pytest.raises(ValueError):
+        search.search('dfs', search.index((0, 0)), {search.index((0, 1))})
+    for strategy in ('bfs', 'astar', 'bidirectional', 'jps'):
+        assert search.search(strategy, search.index((0, 0)), set()) is None
@@ -0,0 +1,73 @@
+import asyncio
+import pytest
+from clock import SimulatedClock
+from control import Supervisor
+from environment import Environment
+from fleet import Fleet
+from package import Package, Perishable, Fragile
+from registry import IdAllocator, PackageRegistry
+
+def test_ids_are_unique_across_shards_and_blocks():
+    shards = [IdAllocator(start=100, shard=shard, shards=3) for shard in range(3)]
+    ids = []
+    for allocator in shards:
+        ids.append(next(allocator))
+        ids.extend(allocator.allocate(1000))
+        ids.append(next(allocator))
+    assert len(set(ids)) == len(ids) == 3 * 1002
+    assert min(ids) == 100
+    assert list(shards[1].allocate(3)) == [100 + 1 + 3 * 1002, 100 + 1 + 3 * 1003, 100 + 1 + 3 * 1004]
+
+    with pytest.raises(ValueError):
+        IdAllocator(shard=2, shards=2)
+
+def test_registry_tracks_packages_until_delivered():
+    registry = PackageRegistry()
+    first = registry.create(Perishable, "Medical Bay")
+    bulk = registry.create_many(Package, ["Airlock", "Medical Bay"] * 50000)
+    assert first.package_id == 1 and bulk[-1].package_id == 100001
+    assert len(registry) == 100001
+    assert registry.get(bulk[10].package_id) is bulk[10]
+    assert registry.by_destination("Medical Bay")[:2] == [first, bulk[1]]
+
+    for package in bulk:
+        registry.complete(package, 12.5, robot=3)
+    registry.discard(first)
+    assert len(registry) == 0 and registry.discarded == 1
+    assert registry.by_destination("Medical Bay") == []
+
+    history = registry.history
+    assert len(history) == 100000
+    assert history[0] == (2, "Package", "Airlock", 12.5, 3)
+    assert history.counts('destination') == {"Airlock": 50000, "Medical Bay": 50000}
+    assert history.nbytes == 23 * len(history)
+    assert list(history.column('package_id')[:3]) == [2, 3, 4]
+
+    with pytest.raises(ValueError):
+        registry.register(registry.create(Fragile, "Airlock"))
+
+def test_fleet_records_deliveries_in_the_registry():
+    registry = PackageRegistry()
+    fleet = Fleet(Environment(), size=4, registry=registry)
+    for package in registry.create_many(Fragile, ["Engineering", "Docking", "Nowhere"] * 5):
+        fleet.submit(package)
+    fleet.run(max_ticks=5000)
+    assert len(registry.history) == fleet.delivered == 10
+    assert registry.discarded == fleet.failed == 5
+    assert len(registry) == 0
+    assert set(registry.history.column('robot')) <= set(range(4))
+
+def test_supervisor_issues_registry_ids():
+    registry = PackageRegistry(start=1000)
+
+    async def scenario():
+        supervisor = Supervisor(Environment(), SimulatedClock(), registry)
+        supervisor.add_robot("Astrid")
+        ids = [supervisor.submit("Astrid", department).package_id for department in ["Command", "Airlock"]]
+        await supervisor.join()
+        await supervisor.stop()
+        return ids
+
+    assert asyncio.run(scenario()) == [1000, 1001]
+    assert sorted(registry.history.column('package_id')) == [1000, 1001]
+    assert sorted(registry.history.column('package_type')) == ["Fragile", "Package"]
@@ -0,0 +1,38 @@
+import io
+import pytest
+from environment import Environment
+from renderer import MapRenderer, CLEAR_SCREEN
+
+@pytest.fixture
+def environment():
+    return Environment()
+
+@pytest.fixture
+def renderer():
+    return MapRenderer(io.StringIO())
+
+def test_first_frame_is_drawn_in_full(renderer, environment):
+    renderer.draw(environment.frame((6, 0)), header=["Map"], footer=["-"])
+    assert renderer.stream.getvalue() == CLEAR_SCREEN + "Map\n" + environment.generate_map((6, 0)) + "-\n"
+
+def test_next_frame_redraws_changed_cells_only(renderer, environment):
+    renderer.draw(environment.frame((6, 0)), header=["Map"], footer=["-"])
+    renderer.stream.seek(0)
+    renderer.stream.truncate()
+
+    # The robot leaves (6, 0) and enters (6, 1): two cells on screen line 8, then back below the footer
+    assert renderer.draw(environment.frame((6, 1)), header=["Map"], footer=["-"]) == 2
+    output = renderer.stream.getvalue()
+    assert output == "\033[8;1H.    \033[8;6HR    \033[11;1H"
+
+def test_unchanged_frame_writes_nothing(renderer, environment):
+    renderer.draw(environment.frame((6, 0)))
+    renderer.stream.seek(0)
+    renderer.stream.truncate()
+    assert renderer.draw(environment.frame((6, 0))) == 0
+    assert renderer.stream.getvalue() == ""
+
+def test_clear_forces_full_redraw(renderer, environment):
+    renderer.draw(environment.frame((6, 0)))
+    renderer.clear()
+    assert renderer.draw(environment.frame((6, 1))) == environment.rows * environment.cols
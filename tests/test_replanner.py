@@ -0,0 +1,64 @@
+import random
+import pytest
+from benchmark import open_map
+from clock import SimulatedClock
+from environment import Environment
+from package import Package
+from robot import Robot
+
+def test_block_and_unblock_cells():
+    environment = Environment()
+    environment.block_cell(0, 5)  # Seal Engineering
+    assert environment.find_path((6, 0), "Engineering") is None
+    assert environment.changed_cells(0) == [(0, 5)]
+
+    environment.unblock_cell(0, 5)
+    assert environment.cell(0, 5) == 'E'
+    assert environment.find_path((6, 0), "Engineering") is not None
+    assert environment.version == 2
+
+    with pytest.raises(ValueError):
+        environment.unblock_cell(0, 5)
+
+@pytest.mark.parametrize("seed", range(6))
+def test_repaired_route_matches_fresh_search(seed):
+    rng = random.Random(seed)
+    environment = Environment(open_map(20, seed, density=0.25), route_cache_size=0)
+    open_cells = [(row, col) for row in range(20) for col in range(20)
+                  if environment.is_valid_position(row, col)]
+    position, destination = (0, 0), rng.choice(open_cells)
+    planner = environment.replanner(position, destination)
+    version = environment.version
+
+    for _ in range(30):
+        # Toggle a few random cells, then take one step along the repaired route
+        for cell in rng.sample(open_cells, 2):
+            if cell != position:
+                try:
+                    environment.unblock_cell(*cell)
+                except ValueError:
+                    environment.block_cell(*cell)
+
+        path = planner.repair(position, environment.changed_cells(version))
+        version = environment.version
+        expected = environment.find_path(position, destination)
+        assert (path is None) == (expected is None)
+        if path is None or len(path) == 1:
+            break
+        assert len(path) == len(expected)
+        assert all(environment.is_valid_position(*cell) for cell in path)
+        position = path[1]
+
+def test_robot_reroutes_around_sealed_bulkhead(monkeypatch):
+    clock = SimulatedClock()
+    robot = Robot("Astrid", "RX-101", "SpaceCorp", Environment(), clock=clock)
+    visited = []
+    monkeypatch.setattr(robot.interface, 'display_frame', lambda x: visited.append(robot.position))
+    robot.inventory = [Package(1, "Engineering")]
+
+    # While the robot is at (6, 1), the corridor at (4, 4) on its route is sealed
+    clock.schedule(2.5, robot.environment.block_cell, 4, 4)
+    assert len(robot.deliver_inventory()) == 1
+    assert visited[-1] == (0, 5)
+    assert (4, 4) not in visited
+    assert all(abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1 for a, b in zip(visited, visited[1:]))
@@ -39,4 +39,34 @@ def test_delivery_method(robot, environment, monkeypatch):
     assert robot.position == (6, 2)  # Robot should be at the destination
     assert len(robot.inventory) == 0  # Inventory should be cleared after delivery
 
+def test_deliver_batch(robot, environment, monkeypatch):
+    # A batch must never render or sleep
+    monkeypatch.setattr(time, 'sleep', lambda x: pytest.fail("slept during a batch"))
+    monkeypatch.setattr(robot.interface, 'display_frame', lambda x: pytest.fail("rendered during a batch"))
 
+    path = environment.find_path((6, 0), "Engineering")
+    results = robot.deliver_batch([("Fragile", "Engineering"), ("Perishable", "Engineering")])
+
+    assert results[0] == ("Fragile", "Engineering", len(path) - 1, len(path) * 2.0)
+    assert results[1] == ("Perishable", "Engineering", 0, 1.0)  # Already there
+    assert robot.position == path[-1]
+
+def test_deliver_batch_unreachable_and_unknown_type(robot):
+    results = robot.deliver_batch([(None, "Nowhere")])
+    assert results[0].path_length is None
+    assert robot.position == (6, 0)
+
+    with pytest.raises(ValueError):
+        robot.deliver_batch([("Crate", "Engineering")])
+
+def test_deliver_inventory_plans_one_tour(robot, monkeypatch):
+    from package import Package, Perishable
+    monkeypatch.setattr(robot.interface, 'display_frame', lambda x: None)
+    robot.clock.sleep = lambda x: None
+    robot.inventory = [Package(1, "Engineering"), Package(2, "Docking"),
+                       Perishable(3, "Hydroponics"), Package(4, "Nowhere")]
+
+    delivered = robot.deliver_inventory()
+    assert [package.package_id for package in delivered][0] == 3  # Perishable first
+    assert sorted(package.package_id for package in delivered) == [1, 2, 3]
+    assert [package.package_id for package in robot.inventory] == [4]  # Unreachable stays on board
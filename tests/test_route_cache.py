@@ -0,0 +1,41 @@
+import pytest
+from environment import Environment
+from route_cache import RouteCache
+
+def test_least_recently_used_route_is_evicted():
+    cache = RouteCache(2)
+    cache.put("a", 0, (1,))
+    cache.put("b", 0, (2,))
+    assert cache.get("a", 0) == (True, (1,))  # "b" is now the least recently used
+    cache.put("c", 0, (3,))
+
+    assert cache.get("b", 0) == (False, None)
+    assert cache.get("c", 0) == (True, (3,))
+    assert (cache.hits, cache.misses, cache.evictions) == (2, 1, 1)
+
+def test_new_map_version_empties_cache():
+    cache = RouteCache(4)
+    cache.put("a", 0, None)
+    assert cache.get("a", 0) == (True, None)  # A missing route is cached too
+    assert cache.get("a", 1) == (False, None)
+    assert cache.invalidations == 1 and len(cache) == 0
+
+def test_environment_caches_routes():
+    environment = Environment()
+    first = environment.find_path((6, 0), "Engineering")
+    second = environment.find_path((6, 0), "Engineering")
+    assert first == second
+    assert (environment.route_cache.hits, environment.route_cache.misses) == (1, 1)
+
+    # Blocking a cell on the route changes the map version and the cached route with it
+    environment.set_cell(*first[3], 'X')
+    assert first[3] not in environment.find_path((6, 0), "Engineering")
+    assert environment.route_cache.invalidations == 1
+
+def test_budget_failures_are_not_cached():
+    environment = Environment()
+    assert environment.find_path((6, 0), (1, 5), max_depth=3) is None
+    assert environment.find_path((6, 0), (1, 5)) is not None
+
+    with pytest.raises(ValueError):
+        RouteCache(0)
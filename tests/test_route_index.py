@@ -0,0 +1,67 @@
+import random
+import pytest
+from environment import Environment
+
+@pytest.fixture
+def environment():
+    return Environment()
+
+def test_departments_discovered(environment):
+    # Every department letter on the Luna-9 map should be indexed
+    assert environment.route_index.departments == ['A', 'C', 'D', 'E', 'G', 'H', 'M']
+
+def test_index_matches_search(environment):
+    # The indexed route must be as short as the BFS route from every walkable cell
+    index = environment.route_index
+    for row in range(environment.rows):
+        for col in range(environment.cols):
+            if not environment.is_valid_position(row, col):
+                continue
+            for department in index.departments:
+                path = index.path((row, col), department)
+                expected = environment._search_path((row, col), department)
+                assert path[0] == (row, col)
+                assert environment.map[path[-1][0]][path[-1][1]] == department
+                assert len(path) == len(expected)
+                assert index.distance((row, col), department) == len(path) - 1
+
+def test_unreachable_department():
+    # A department walled off from the start cell has no route
+    index = Environment(['.XE']).route_index
+    assert index.covers((0, 0), "Engineering")
+    assert index.path((0, 0), "Engineering") is None
+    assert index.distance((0, 0), "Engineering") is None
+
+def baseline_bfs(rows, start, destination):
+    # The list-based BFS Environment.find_path used before the route index
+    queue = [start]
+    previous = {start: None}
+    while queue:
+        current = queue.pop(0)
+        row, col = current
+        if rows[row][col].upper() == destination[0].upper():
+            path = []
+            while current:
+                path.append(current)
+                current = previous[current]
+            return path[::-1]
+        for move in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
+            cell = (row + move[0], col + move[1])
+            if (0 <= cell[0] < len(rows) and 0 <= cell[1] < len(rows[0])
+                    and rows[cell[0]][cell[1]] != 'X' and cell not in previous):
+                queue.append(cell)
+                previous[cell] = current
+    return None
+
+def test_index_matches_baseline_paths():
+    # Default queries must return the very paths of the old BFS, not just equally short ones
+    rng = random.Random(4)
+    for _ in range(20):
+        rows = [''.join(rng.choice('.....XXAB') for _ in range(12)) for _ in range(9)]
+        environment = Environment(rows)
+        for row in range(9):
+            for col in range(12):
+                if environment.is_valid_position(row, col):
+                    for department in environment.route_index.departments:
+                        expected = baseline_bfs(rows, (row, col), department)
+                        assert environment.find_path((row, col), department) == expected
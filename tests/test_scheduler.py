@@ -0,0 +1,82 @@
+import pytest
+from environment import Environment
+from fleet import Fleet
+from package import Package, Perishable, Fragile
+from registry import PackageRegistry
+from scheduler import Scheduler
+
+@pytest.fixture
+def environment():
+    return Environment()
+
+def test_jobs_are_taken_by_deadline_then_class(environment):
+    scheduler = Scheduler(environment)
+    scheduler.submit(Package(1, "Engineering"), now=0.0)
+    scheduler.submit(Fragile(2, "Airlock"), now=0.0, deadline=50.0)
+    scheduler.submit(Perishable(3, "Medical Bay"), now=0.0, deadline=50.0)
+
+    assert len(scheduler) == 3
+    taken = scheduler.assign({robot: (6, 0) for robot in range(3)})
+    assert [job.package.package_id for _, job in taken] == [3, 2, 1]
+    assert taken[2][1].deadline == 900.0
+
+    fifo = Scheduler(environment, policy='fifo')
+    for number in range(3):
+        fifo.submit(Perishable(number, "Medical Bay") if number else Package(number, "Cargo"), now=0.0)
+    assert [job.package.package_id for _, job in fifo.assign({'a': (6, 0)})] == [0]
+
+    with pytest.raises(ValueError):
+        Scheduler(environment, policy='random')
+
+def test_nearest_free_robot_gets_the_job(environment):
+    scheduler = Scheduler(environment)
+    scheduler.submit(Package(1, "Airlock"), now=0.0)
+    scheduler.submit(Package(2, "Nowhere"), now=0.0)
+    assert [(robot, job.package.package_id) for robot, job in scheduler.assign({'far': (6, 0), 'near': (4, 5)})] \
+        == [('near', 1)]
+    assert scheduler.failed == 1
+
+def test_sla_report(environment):
+    scheduler = Scheduler(environment, sla={"Perishable": 10.0, "Package": 100.0})
+    early = scheduler.submit(Perishable(1, "Medical Bay"), now=0.0)
+    late = scheduler.submit(Perishable(2, "Medical Bay"), now=0.0)
+    cargo = scheduler.submit(Package(3, "Cargo"), now=0.0)
+
+    assert scheduler.complete(early, 10.0)
+    assert not scheduler.complete(late, 14.5)
+    scheduler.fail(cargo)
+
+    report = scheduler.report()
+    assert (report['on_time'], report['late'], report['failed']) == (1, 1, 1)
+    assert report['hit_rate'] == pytest.approx(1 / 3)
+    assert report['max_lateness'] == 4.5
+    assert report['by_type']['Perishable'] == {'on_time': 1, 'late': 1, 'failed': 0}
+
+@pytest.mark.parametrize("policy, perishable_on_time", [('fifo', 0), ('deadline', 1)])
+def test_fleet_serves_perishables_first_under_load(environment, policy, perishable_on_time):
+    scheduler = Scheduler(environment, sla={"Perishable": 12.0, "Package": 600.0}, policy=policy)
+    fleet = Fleet(environment, size=1, scheduler=scheduler)
+    for number in range(3):
+        fleet.submit(Package(number, "Engineering"))
+    fleet.submit(Perishable(3, "Medical Bay"))
+
+    report = fleet.run(max_ticks=500)
+    assert report['deliveries'] == 4
+    assert report['sla']['by_type']['Perishable']['on_time'] == perishable_on_time
+
+def test_failed_jobs_are_counted_once_and_leave_the_registry(environment, monkeypatch):
+    registry = PackageRegistry()
+    scheduler = Scheduler(environment)
+    fleet = Fleet(environment, size=2, scheduler=scheduler, registry=registry)
+    # Docking is assigned from the route index, then fails when the robot plans its route
+    find_path = environment.find_path
+    monkeypatch.setattr(environment, 'find_path',
+                        lambda start, destination, **options: None if destination == "Docking"
+                        else find_path(start, destination, **options))
+    for package in registry.create_many(Package, ["Engineering", "Nowhere", "Docking"] * 3):
+        fleet.submit(package)
+
+    report = fleet.run(max_ticks=2000)
+    assert report['deliveries'] == 3
+    assert fleet.failed == scheduler.failed == report['sla']['failed'] == 6
+    assert registry.discarded == 6 and len(registry) == 0
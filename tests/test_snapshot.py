@@ -0,0 +1,120 @@
+import random
+import pytest
+from environment import Environment
+from fleet import Fleet
+from package import Package, PackageBatch, Perishable, Fragile
+from scheduler import Scheduler
+from snapshot import EventLog, checkpoint, dumps, loads, replay, save_snapshot
+from utils import generate_id
+
+DEPARTMENTS = ["Engineering", "Command", "Medical Bay", "Airlock", "Hydroponics", "Docking"]
+
+def build(kind):
+    environment = Environment()
+    if kind == 'scheduler':
+        return Fleet(environment, size=6, scheduler=Scheduler(environment))
+    return Fleet(environment, size=6, cooperative=kind == 'cooperative')
+
+def submit(fleet, rng, count):
+    for _ in range(count):
+        package_type = rng.choice([Package, Perishable, Fragile])
+        fleet.submit(package_type(rng.randrange(1000), rng.choice(DEPARTMENTS)))
+
+def state(fleet):
+    report = fleet.report()
+    del report['wall_seconds'], report['ticks_per_second']
+    return report, [(robot.position, [str(package) for package in robot.inventory]) for robot in fleet.robots]
+
+@pytest.mark.parametrize('kind', ['reactive', 'cooperative', 'scheduler', 'stalled'])
+def test_restored_fleet_carries_on_exactly(kind):
+    fleet = build(kind)
+    submit(fleet, random.Random(5), 40)
+    fleet.run(max_ticks=60)
+    if kind == 'stalled':
+        # Hand the reactive robots' jobs to the cooperative planner part way through their routes
+        fleet._break_stall()
+
+    restored = loads(dumps(fleet))
+    assert state(restored) == state(fleet)
+    for copy in (fleet, restored):
+        submit(copy, random.Random(9), 10)
+        copy.run(max_ticks=5000)
+    assert state(restored) == state(fleet)
+    assert fleet.queued == 0 and not fleet.busy
+
+def test_snapshot_restores_random_state_and_is_compact(tmp_path):
+    fleet = build('reactive')
+    submit(fleet, random.Random(1), 30)
+    batch = PackageBatch()
+    batch.extend(Package, range(12000), DEPARTMENTS * 2000)
+    fleet.submit_batch(batch)
+    fleet.run(max_ticks=20)
+    random.seed(42)
+    data = dumps(fleet)
+    expected = [generate_id() for _ in range(5)]
+
+    restored = loads(data)
+    assert [generate_id() for _ in range(5)] == expected
+    assert restored.queued == fleet.queued > 12000 - 6
+    assert [str(restored._next_job()) for _ in range(3)] == [str(fleet._next_job()) for _ in range(3)]
+    save_snapshot(fleet, str(tmp_path / 'fleet.snap'))
+    assert (tmp_path / 'fleet.snap').stat().st_size < 32768
+
+    with pytest.raises(ValueError):
+        loads(b'ASTRIDMP' + data[8:])
+    with pytest.raises(ValueError):
+        loads(data[:40])
+
+def test_replay_reproduces_a_logged_run(tmp_path):
+    log_path = str(tmp_path / 'run.log')
+    log = EventLog(log_path, seed=11)
+    fleet = build('cooperative')
+    fleet.event_log = log
+    checkpoint(fleet, str(tmp_path / 'start.snap'))
+    for _ in range(3):
+        for _ in range(8):
+            fleet.submit(Perishable(generate_id(), random.choice(DEPARTMENTS)))
+        fleet.run(max_ticks=fleet.ticks + 25)
+    checkpoint(fleet, str(tmp_path / 'middle.snap'))
+    for _ in range(8):
+        fleet.submit(Fragile(generate_id(), random.choice(DEPARTMENTS)))
+    fleet.run()
+    log.close()
+
+    events = EventLog.read(log_path)
+    assert events[0] == {'event': 'start', 'tick': 0, 'seed': 11}
+    assert [event['event'] for event in events].count('submit') == 32
+    assert state(replay(log_path)) == state(fleet)
+    assert state(replay(log_path, until=40))[0]['ticks'] == 40
+
+    # Reopening the log appends to it and keeps its seed
+    assert EventLog(log_path, seed=3).seed == 11
+
+def test_environment_bytes_round_trip():
+    environment = Environment()
+    environment.block_cell(4, 3)
+    copy = Environment.from_bytes(environment.to_bytes(), strategy='astar')
+    assert copy.strategy == 'astar'
+    assert copy.departments == environment.departments
+    assert not copy.is_valid_position(4, 3)
+    assert copy.find_path((6, 0), "Airlock") == environment.find_path((6, 0), "Airlock")
+    with pytest.raises(ValueError):
+        Environment.from_bytes(b'not a map')
+
+def test_blocked_department_cell_survives_a_round_trip(tmp_path):
+    fleet = build('cooperative')
+    environment = fleet.environment
+    environment.block_cell(0, 5)
+    environment.save(str(tmp_path / "blocked.map"))
+    for copy in (Environment.from_bytes(environment.to_bytes()), Environment.load(str(tmp_path / "blocked.map")),
+                 loads(dumps(fleet)).environment):
+        assert copy.departments == environment.departments
+        assert copy.department_cells("Engineering") == [(0, 5)]
+        assert copy.find_path((6, 0), "Engineering") is None
+        copy.unblock_cell(0, 5)
+        assert copy.find_path((6, 0), "Engineering") is not None
+    assert loads(dumps(fleet))._shared == fleet._shared
+
+    data = environment.to_bytes()
+    with pytest.raises(ValueError):
+        Environment.from_bytes(data[:-1])
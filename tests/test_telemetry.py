@@ -0,0 +1,58 @@
+import json
+import pytest
+from clock import SimulatedClock
+from environment import Environment
+from robot import Robot
+from telemetry import Histogram, JsonLinesSink, MemorySink, Telemetry
+
+def test_histogram_summary():
+    histogram = Histogram()
+    for value in [0, 1, 2, 3, 100]:
+        histogram.add(value)
+    summary = histogram.summary()
+    assert (summary['count'], summary['total'], summary['min'], summary['max']) == (5, 106, 0, 100)
+    assert summary['mean'] == pytest.approx(21.2)
+    assert 2 <= summary['p50'] <= 4
+    assert summary['p99'] == 100
+    assert Histogram().percentile(0.5) == 0.0
+
+def test_find_path_metrics():
+    environment = Environment(strategy='astar')
+    environment.telemetry = Telemetry()
+    environment.find_path((6, 0), 'Engineering')
+    environment.find_path((6, 0), (0, 5))
+    environment.find_path((6, 0), (0, 5))
+    environment.find_path((6, 0), (0, 0))
+    environment.generate_map((6, 0))
+
+    snapshot = environment.telemetry.snapshot()
+    assert snapshot['counters'] == {'find_path.index': 1, 'find_path.search': 2, 'find_path.cache': 1,
+                                    'find_path.no_path': 1}
+    histograms = snapshot['histograms']
+    assert histograms['find_path.length']['count'] == 3
+    assert histograms['find_path.expanded']['count'] == 2 and histograms['find_path.expanded']['max'] > 0
+    assert histograms['find_path.seconds']['count'] == 4
+    assert histograms['generate_map.seconds']['count'] == 1
+
+def test_delivery_metrics_to_json_lines(tmp_path):
+    path = str(tmp_path / "metrics.jsonl")
+    memory = MemorySink()
+    environment = Environment()
+    environment.telemetry = Telemetry(memory, JsonLinesSink(path))
+    robot = Robot("Astrid", "RX-101", "SpaceCorp", environment, SimulatedClock())
+    robot.interface.display_frame = lambda frame: None
+
+    steps = len(environment.find_path((6, 0), 'Docking'))
+    robot.inventory.append(robot._create_package("Docking"))
+    robot.deliver_inventory()
+    environment.telemetry.close()
+
+    assert memory.counters['delivery.steps'] == steps
+    assert memory.counters['delivery.delivered'] == 1
+    assert memory.histograms['render.seconds'].count == steps
+    assert memory.histograms['delivery.sleep_seconds'].count == steps
+
+    with open(path) as metrics:
+        records = [json.loads(line) for line in metrics]
+    assert {'kind': 'counter', 'name': 'delivery.delivered', 'value': 1} in [
+        {key: record[key] for key in ('kind', 'name', 'value')} for record in records]
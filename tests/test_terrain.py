@@ -0,0 +1,77 @@
+import heapq
+import random
+import pytest
+from environment import Environment
+from package import Package, Fragile
+from terrain import CostModel, encode_cost
+
+def reference_cost(environment, start, goal, package):
+    # Plain Dijkstra over (row, col) positions, charging each cell entered
+    best = {start: 0.0}
+    heap = [(0.0, start)]
+    while heap:
+        cost, (row, col) = heapq.heappop(heap)
+        if (row, col) == goal:
+            return cost
+        if cost > best[(row, col)]:
+            continue
+        for neighbour in ((row, col + 1), (row + 1, col), (row, col - 1), (row - 1, col)):
+            if environment.is_valid_position(*neighbour):
+                step = cost + environment.step_time(neighbour, package)
+                if step < best.get(neighbour, float('inf')):
+                    best[neighbour] = step
+                    heapq.heappush(heap, (step, neighbour))
+    return None
+
+def test_cost_model_slows_fragile_packages_on_rough_cells():
+    model = CostModel()
+    assert model.step_seconds(1.0, Package(1, "Engineering")) == 1.5
+    assert model.step_seconds(3.0, Package(1, "Engineering")) == 4.5
+    assert model.step_seconds(3.0, Fragile(2, "Engineering")) == 10.0
+    assert model.step_seconds(0.5, Fragile(2, "Engineering")) == 1.0  # Low gravity helps everyone
+
+    with pytest.raises(ValueError):
+        encode_cost(0)
+
+@pytest.mark.parametrize("seed", range(5))
+def test_fastest_path_matches_dijkstra(seed):
+    rng = random.Random(seed)
+    layout = ['X' if rng.random() < 0.2 else '.' for _ in range(15 * 15)]
+    layout = [''.join(layout[row * 15:row * 15 + 15]) for row in range(15)]
+    terrain = [[rng.choice([0.5, 1.0, 1.0, 2.0, 4.0]) for _ in range(15)] for _ in range(15)]
+    environment = Environment(layout, terrain=terrain)
+    open_cells = [(row, col) for row in range(15) for col in range(15) if environment.is_valid_position(row, col)]
+    package = Fragile(1, "Engineering")
+
+    for _ in range(5):
+        start, goal = rng.sample(open_cells, 2)
+        path = environment.find_fastest_path(start, goal, package)
+        expected = reference_cost(environment, start, goal, package)
+        if expected is None:
+            assert path is None
+        else:
+            assert environment.travel_time(path[1:], package) == pytest.approx(expected)
+
+def test_fastest_route_avoids_ramp():
+    # Straight across the ramp is 2 steps, around it is 4
+    environment = Environment(["...", ".X.", "..."],
+                              terrain=[[1, 5, 1], [1, 1, 1], [1, 1, 1]])
+    assert environment.find_path((0, 0), (0, 2)) == [(0, 0), (0, 1), (0, 2)]
+    assert environment.find_fastest_path((0, 0), (0, 2), Fragile(1, "E")) == [
+        (0, 0), (1, 0), (2, 0), (2, 1), (2, 2), (1, 2), (0, 2)]
+
+@pytest.mark.parametrize("use_mmap", [True, False])
+def test_terrain_is_loaded_and_saved(tmp_path, use_mmap):
+    path = tmp_path / "ramp.txt"
+    path.write_text("E..\n.X.\n...\n---\n1 2.5 1\n1 1 0.5\n1 1 1\n")
+    environment = Environment.load(str(path))
+    assert environment.terrain_cost(0, 1) == 2.5
+    assert environment.terrain_cost(1, 2) == 0.5
+
+    binary = tmp_path / "ramp.map"
+    environment.save(str(binary))
+    loaded = Environment.load(str(binary), use_mmap=use_mmap)
+    assert loaded.has_terrain
+    assert [[loaded.terrain_cost(row, col) for col in range(3)] for row in range(3)] == [
+        [1.0, 2.5, 1.0], [1.0, 1.0, 0.5], [1.0, 1.0, 1.0]]
+    assert loaded.find_fastest_path((2, 2), "E") == environment.find_fastest_path((2, 2), "E")
@@ -0,0 +1,38 @@
+import itertools
+import random
+import pytest
+from tour import plan_tour, tour_length, MAX_EXACT_STOPS
+
+def random_stops(count, seed):
+    # Random points on a grid with Manhattan distances, as between departments
+    rng = random.Random(seed)
+    points = [(rng.randrange(50), rng.randrange(50)) for _ in range(count + 1)]
+    def steps(a, b):
+        return abs(a[0] - b[0]) + abs(a[1] - b[1])
+    start, stops = points[0], points[1:]
+    return [steps(start, stop) for stop in stops], [[steps(a, b) for b in stops] for a in stops]
+
+def is_rank_ordered(order, ranks):
+    return all(ranks[a] <= ranks[b] for a, b in zip(order, order[1:]))
+
+@pytest.mark.parametrize("seed", range(5))
+def test_exact_tour_is_optimal(seed):
+    start_costs, costs = random_stops(7, seed)
+    order = plan_tour(start_costs, costs)
+    best = min(tour_length(list(p), start_costs, costs) for p in itertools.permutations(range(7)))
+    assert sorted(order) == list(range(7))
+    assert tour_length(order, start_costs, costs) == best
+
+@pytest.mark.parametrize("count", [MAX_EXACT_STOPS, MAX_EXACT_STOPS + 15])
+def test_tour_honours_ranks(count):
+    start_costs, costs = random_stops(count, count)
+    ranks = [random.Random(stop).randrange(2) for stop in range(count)]
+    order = plan_tour(start_costs, costs, ranks)
+    assert sorted(order) == list(range(count))
+    assert is_rank_ordered(order, ranks)
+
+def test_heuristic_beats_visiting_in_order():
+    start_costs, costs = random_stops(40, 1)
+    order = plan_tour(start_costs, costs)
+    assert sorted(order) == list(range(40))
+    assert tour_length(order, start_costs, costs) < tour_length(list(range(40)), start_costs, costs) / 2
@@ -0,0 +1,247 @@
+"""
+tour.py
+
+This module plans the order in which a robot visits the departments of the
+packages it carries, so that one multi-stop tour replaces a round of
+separate deliveries.
+
+Stops are numbered 0 to n - 1. The cost of a tour is the number of steps
+from the robot's position to the first stop plus the steps between each
+pair of consecutive stops; the tour ends at its last stop. Each stop has a
+rank, and every stop of a lower rank is visited before any stop of a
+higher rank, so urgent packages are delivered first.
+
+Features:
+- Exact Held-Karp dynamic programming for loads of up to MAX_EXACT_STOPS stops.
+- A nearest-neighbour tour improved with 2-opt and or-opt moves for larger loads.
+- Rank ordering honoured by both the exact and the heuristic planner.
+
+Functions:
+    tour_length: Computes the number of steps of a tour.
+    plan_tour: Plans the order in which to visit a set of stops.
+"""
+
+
+MAX_EXACT_STOPS = 10
+
+
+def tour_length(order, start_costs, costs):
+    """
+    Compute the number of steps of a tour.
+
+    Args:
+        order (list): Stop numbers in visiting order.
+        start_costs (list): Steps from the starting position to each stop.
+        costs (list): Steps between each pair of stops, as a list of rows.
+
+    Returns:
+        int: Total number of steps, 0 for an empty tour.
+    """
+    if not order:
+        return 0
+    total = start_costs[order[0]]
+    for current, following in zip(order, order[1:]):
+        total += costs[current][following]
+    return total
+
+
+def plan_tour(start_costs, costs, ranks=None):
+    """
+    Plan the order in which to visit a set of stops.
+
+    Args:
+        start_costs (list): Steps from the starting position to each stop.
+        costs (list): Steps between each pair of stops, as a list of rows.
+            Costs are expected to be symmetric, as they are on a grid.
+        ranks (list, optional): Rank of each stop. Lower ranks are visited first.
+
+    Returns:
+        list: Stop numbers in visiting order. The order is optimal for up to
+            MAX_EXACT_STOPS stops, and a local optimum beyond that.
+    """
+    count = len(start_costs)
+    if ranks is None:
+        ranks = [0] * count
+    if count <= 1:
+        return list(range(count))
+    if count <= MAX_EXACT_STOPS:
+        return _held_karp(start_costs, costs, ranks)
+    return _improve(_nearest_neighbour(start_costs, costs, ranks), start_costs, costs, ranks)
+
+
+def _held_karp(start_costs, costs, ranks):
+    """
+    Find the shortest rank-ordered tour by dynamic programming over subsets of stops.
+
+    Args:
+        start_costs (list): Steps from the starting position to each stop.
+        costs (list): Steps between each pair of stops.
+        ranks (list): Rank of each stop.
+
+    Returns:
+        list: Stop numbers in visiting order.
+    """
+    count = len(start_costs)
+    full = (1 << count) - 1
+    infinity = float('inf')
+
+    # A stop may join a partial tour only once every lower-ranked stop is in it
+    required = [
+        sum(1 << other for other in range(count) if ranks[other] < ranks[stop])
+        for stop in range(count)
+    ]
+
+    best = [[infinity] * count for _ in range(full + 1)]
+    parent = [[-1] * count for _ in range(full + 1)]
+    for stop in range(count):
+        if not required[stop]:
+            best[1 << stop][stop] = start_costs[stop]
+
+    for visited in range(1, full + 1):
+        row = best[visited]
+        for last in range(count):
+            cost = row[last]
+            if cost == infinity:
+                continue
+            from_last = costs[last]
+            for stop in range(count):
+                bit = 1 << stop
+                if visited & bit or required[stop] & visited != required[stop]:
+                    continue
+                candidate = cost + from_last[stop]
+                if candidate < best[visited | bit][stop]:
+                    best[visited | bit][stop] = candidate
+                    parent[visited | bit][stop] = last
+
+    last = min(range(count), key=best[full].__getitem__)
+    order = []
+    visited = full
+    while last >= 0:
+        order.append(last)
+        last, visited = parent[visited][last], visited & ~(1 << last)
+    order.reverse()
+    return order
+
+
+def _nearest_neighbour(start_costs, costs, ranks):
+    """
+    Build a rank-ordered tour by always moving to the nearest allowed stop.
+
+    Args:
+        start_costs (list): Steps from the starting position to each stop.
+        costs (list): Steps between each pair of stops.
+        ranks (list): Rank of each stop.
+
+    Returns:
+        list: Stop numbers in visiting order.
+    """
+    remaining = set(range(len(start_costs)))
+    order = []
+    from_current = start_costs
+    while remaining:
+        rank = min(ranks[stop] for stop in remaining)
+        stop = min((stop for stop in remaining if ranks[stop] == rank), key=from_current.__getitem__)
+        order.append(stop)
+        remaining.remove(stop)
+        from_current = costs[stop]
+    return order
+
+
+def _improve(order, start_costs, costs, ranks):
+    """
+    Shorten a tour with 2-opt and or-opt moves until neither finds an improvement.
+
+    A 2-opt move reverses a run of stops; an or-opt move relocates a run of
+    up to three stops, possibly reversed. Only moves that keep the tour in
+    rank order are considered.
+
+    Args:
+        order (list): Stop numbers in visiting order, already in rank order.
+        start_costs (list): Steps from the starting position to each stop.
+        costs (list): Steps between each pair of stops.
+        ranks (list): Rank of each stop.
+
+    Returns:
+        list: The improved tour.
+    """
+    def cost(current, following):
+        # None stands for the starting position before a stop, or the end of the tour after one
+        if following is None:
+            return 0
+        if current is None:
+            return start_costs[following]
+        return costs[current][following]
+
+    while _two_opt(order, cost, ranks) or _or_opt(order, cost, ranks):
+        pass
+    return order
+
+
+def _two_opt(order, cost, ranks):
+    """
+    Apply the first improving 2-opt move to a tour.
+
+    Args:
+        order (list): Stop numbers in visiting order, changed in place.
+        cost (callable): Steps between two stops, see `_improve`.
+        ranks (list): Rank of each stop.
+
+    Returns:
+        bool: True if the tour was changed.
+    """
+    count = len(order)
+    for first in range(count - 1):
+        before = order[first - 1] if first else None
+        for last in range(first + 1, count):
+            # Reversing a run that spans two ranks would break the rank order
+            if ranks[order[last]] != ranks[order[first]]:
+                break
+            after = order[last + 1] if last + 1 < count else None
+            change = (cost(before, order[last]) + cost(order[first], after)
+                      - cost(before, order[first]) - cost(order[last], after))
+            if change < 0:
+                order[first:last + 1] = order[first:last + 1][::-1]
+                return True
+    return False
+
+
+def _or_opt(order, cost, ranks):
+    """
+    Apply the first improving or-opt move to a tour.
+
+    Args:
+        order (list): Stop numbers in visiting order, changed in place.
+        cost (callable): Steps between two stops, see `_improve`.
+        ranks (list): Rank of each stop.
+
+    Returns:
+        bool: True if the tour was changed.
+    """
+    count = len(order)
+    for length in (1, 2, 3):
+        for start in range(count - length + 1):
+            run = order[start:start + length]
+            rank = ranks[run[0]]
+            if ranks[run[-1]] != rank:
+                continue
+            before = order[start - 1] if start else None
+            after = order[start + length] if start + length < count else None
+            saving = cost(before, run[0]) + cost(run[-1], after) - cost(before, after)
+
+            rest = order[:start] + order[start + length:]
+            for position in range(len(rest) + 1):
+                if position == start:
+                    continue
+                previous = rest[position - 1] if position else None
+                following = rest[position] if position < len(rest) else None
+                if previous is not None and ranks[previous] > rank:
+                    break
+                if following is not None and ranks[following] < rank:
+                    continue
+                for candidate in (run, run[::-1]):
+                    added = (cost(previous, candidate[0]) + cost(candidate[-1], following)
+                             - cost(previous, following))
+                    if added < saving:
+                        order[:] = rest[:position] + candidate + rest[position:]
+                        return True
+    return False